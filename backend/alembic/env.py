@@ -17,7 +17,17 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
 from app.core.config import settings
 from app.core.database import Base
-from app.models import User, Company, FinancialData, CalculatedMetrics
+from app.models import (
+    User,
+    Company,
+    FinancialData,
+    CalculatedMetrics,
+    RevenueForecast,
+    PeriodComparison,
+    MetricBenchmark,
+    BenchmarkMember,
+    SnapshotTombstone,
+)
 
 # this is the Alembic Config object
 config = context.config
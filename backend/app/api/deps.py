@@ -4,22 +4,74 @@ API dependencies
 Используется для получения current user, db session, и т.д.
 """
 
-from typing import Generator, Optional
+from typing import Any, Dict, Optional
+from uuid import UUID
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
 
+from app.core.config import settings
 from app.core.database import get_db
-from app.core.security import verify_token
+from app.core.local_cache import TTLCache
+from app.core.security import token_cache, verify_token
 from app.models.user import User
 
 # Security scheme для JWT
 security = HTTPBearer()
 
+# Кеш снимков пользователей: user_id -> значения колонок users
+# Сбрасывается при любом ORM update пользователя (в т.ч. is_active) в этом
+# процессе; в остальных процессах снимок устаревает не позже USER_CACHE_TTL
+user_cache: TTLCache[Dict[str, Any]] = TTLCache(
+    max_size=settings.USER_CACHE_SIZE,
+    ttl=settings.USER_CACHE_TTL,
+)
 
-def get_current_user(
+_USER_COLUMNS = tuple(column.key for column in User.__mapper__.column_attrs)
+
+
+def invalidate_user(user_id: UUID) -> None:
+    """Удалить снимок пользователя из кеша"""
+    user_cache.pop(user_id)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_user_snapshot(mapper, connection, target: User) -> None:
+    invalidate_user(target.id)
+
+
+def auth_cache_stats() -> Dict[str, Any]:
+    """Счетчики попаданий кешей аутентификации (для мониторинга)"""
+    return {
+        "tokens": token_cache.stats(),
+        "users": user_cache.stats(),
+    }
+
+
+async def _get_user(db: AsyncSession, user_id: UUID) -> Optional[User]:
+    """
+    Пользователь по id: из кеша снимков или из БД
+
+    Снимок присоединяется к сессии через merge(load=False) - без SQL запроса.
+    """
+    snapshot = user_cache.get(user_id)
+    if snapshot is not None:
+        user = User(**snapshot)
+        make_transient_to_detached(user)
+        return await db.merge(user, load=False)
+
+    user = await db.get(User, user_id)
+    if user is not None:
+        user_cache.set(user_id, {key: getattr(user, key) for key in _USER_COLUMNS})
+    return user
+
+
+async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ) -> User:
     """
     Dependency для получения текущего пользователя из JWT token
@@ -27,7 +79,7 @@ def get_current_user(
     Usage:
     ```python
     @app.get("/protected")
-    def protected_route(current_user: User = Depends(get_current_user)):
+    async def protected_route(current_user: User = Depends(get_current_user)):
         return {"user_id": current_user.id}
     ```
     """
@@ -45,14 +97,16 @@ def get_current_user(
     
     # Получаем user_id из payload
     user_id: str = payload.get("sub")
-    if user_id is None:
+    try:
+        user_uuid = UUID(user_id)
+    except (TypeError, ValueError):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid token payload"
         )
     
     # Загружаем пользователя из БД
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await _get_user(db, user_uuid)
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -68,7 +122,7 @@ def get_current_user(
     return user
 
 
-def get_current_active_superuser(
+async def get_current_active_superuser(
     current_user: User = Depends(get_current_user),
 ) -> User:
     """Dependency для проверки что пользователь - superuser"""
@@ -0,0 +1,90 @@
+"""
+Keyset (cursor) pagination
+
+Страница - строки строго после ключа сортировки последней строки
+предыдущей страницы, например (created_at, id). Выборка идет по
+составному индексу с тем же порядком, поэтому латентность не зависит
+от глубины страницы (в отличие от OFFSET) и в память попадает только
+limit + 1 строк.
+
+Курсор - непрозрачная строка (base64url JSON ключа), следующий курсор
+отдается в заголовке X-Next-Cursor (тело ответа остается списком).
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from fastapi import HTTPException, Query, status
+from sqlalchemy import Select, tuple_
+
+from app.core.config import settings
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# Ключ сортировки: (timestamp, id)
+CursorKey = Tuple[datetime, UUID]
+
+
+def encode_cursor(key: CursorKey) -> str:
+    raw = json.dumps([key[0].isoformat(), str(key[1])], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> CursorKey:
+    """Курсор -> ключ; ValueError если курсор поврежден"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        timestamp, key_id = json.loads(raw)
+        return datetime.fromisoformat(timestamp), UUID(key_id)
+    except (TypeError, ValueError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+class PageParams:
+    """Dependency: ?cursor=...&limit=..."""
+
+    def __init__(
+        self,
+        cursor: Optional[str] = Query(None, description="X-Next-Cursor предыдущей страницы"),
+        limit: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE),
+    ):
+        self.limit = limit
+        self.after: Optional[CursorKey] = None
+        if cursor:
+            try:
+                self.after = decode_cursor(cursor)
+            except ValueError:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Invalid cursor"
+                )
+
+
+def keyset_page(stmt: Select, columns: Sequence[Any], page: PageParams) -> Select:
+    """
+    Страница stmt по убыванию columns (timestamp, id)
+
+    Сравнение кортежей (ROW(a, b) < ROW(x, y)) PostgreSQL выполняет
+    по составному индексу одним range scan.
+    """
+    if page.after is not None:
+        stmt = stmt.where(tuple_(*columns) < tuple_(*page.after))
+    return stmt.order_by(*(column.desc() for column in columns)).limit(page.limit + 1)
+
+
+def split_page(rows: List[Any], page: PageParams, key_attrs: Tuple[str, str]) -> Tuple[List[Any], Dict[str, str]]:
+    """
+    Лишняя (limit + 1) строка означает, что есть следующая страница
+
+    Returns:
+        (строки страницы, заголовки ответа с X-Next-Cursor)
+    """
+    if len(rows) <= page.limit:
+        return rows, {}
+    rows = rows[:page.limit]
+    last = rows[-1]
+    key = (getattr(last, key_attrs[0]), getattr(last, key_attrs[1]))
+    return rows, {NEXT_CURSOR_HEADER: encode_cursor(key)}
@@ -1,11 +1,16 @@
 """API v1 routes"""
 
 from fastapi import APIRouter
-from app.api.v1 import auth, companies
+from app.api.v1 import auth, companies, financial_data, jobs, metrics, uploads
+from app.core.responses import FastJSONResponse
 
-router = APIRouter()
+# Все v1 ответы сериализуются через FastJSONResponse (orjson / pydantic-core)
+router = APIRouter(default_response_class=FastJSONResponse)
 
 # Include sub-routers
 router.include_router(auth.router, prefix="/auth", tags=["auth"])
 router.include_router(companies.router, prefix="/companies", tags=["companies"])
-
+router.include_router(metrics.router, prefix="/companies", tags=["metrics"])
+router.include_router(financial_data.router, prefix="/financial-data", tags=["financial-data"])
+router.include_router(uploads.router, prefix="/uploads", tags=["uploads"])
+router.include_router(jobs.router, prefix="/jobs", tags=["jobs"])
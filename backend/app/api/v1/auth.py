@@ -2,26 +2,60 @@
 Authentication API endpoints
 
 FR-1.1: Telegram OAuth authentication
+
+Горячий путь логина: HMAC ключ из bot token вычисляется один раз при
+импорте, повторно использованные данные виджета отсекаются кешем
+в памяти до обращения к БД, пользователь создается или обновляется
+одним INSERT ... ON CONFLICT ... RETURNING.
 """
 
 import hashlib
 import hmac
-from typing import Dict
+import time
 from datetime import datetime, timedelta
+from typing import Tuple
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
 from app.core.config import settings
+from app.core.local_cache import TTLCache
+from app.core.responses import json_response
 from app.core.security import create_access_token
 from app.models.user import User
 from app.schemas.auth import TelegramAuthData, Token, LoginResponse
 from app.schemas.user import UserResponse
-from app.api.deps import get_current_user
+from app.schemas.serialization import dump_json
+from app.api.deps import get_current_user, invalidate_user
 
 router = APIRouter()
 
+# secret_key = SHA256(bot_token); HMAC с уже загруженным ключом копируется
+# на каждый логин вместо повторной подготовки ключа
+_TELEGRAM_HMAC = hmac.new(
+    hashlib.sha256(settings.TELEGRAM_BOT_TOKEN.encode()).digest(),
+    digestmod=hashlib.sha256,
+)
+
+# Поля data_check_string в алфавитном порядке (все, кроме hash)
+_DATA_CHECK_FIELDS = tuple(sorted(name for name in TelegramAuthData.model_fields if name != "hash"))
+
+# Уже принятые данные виджета (id, auth_date, hash) до истечения их срока
+replay_cache: TTLCache[bool] = TTLCache(
+    max_size=settings.TELEGRAM_REPLAY_CACHE_SIZE,
+    ttl=settings.TELEGRAM_AUTH_MAX_AGE,
+)
+
+
+def _data_check_string(auth_data: TelegramAuthData) -> bytes:
+    return "\n".join(
+        f"{name}={value}"
+        for name in _DATA_CHECK_FIELDS
+        if (value := getattr(auth_data, name)) is not None
+    ).encode()
+
 
 def verify_telegram_auth(auth_data: TelegramAuthData) -> bool:
     """
@@ -32,37 +66,21 @@ def verify_telegram_auth(auth_data: TelegramAuthData) -> bool:
     
     Алгоритм: https://core.telegram.org/widgets/login#checking-authorization
     """
-    bot_token = settings.TELEGRAM_BOT_TOKEN
-    
-    # Создаем data_check_string
-    data_check_arr = []
-    data_dict = auth_data.model_dump(exclude={'hash'})
-    
-    for key in sorted(data_dict.keys()):
-        value = data_dict[key]
-        if value is not None:
-            data_check_arr.append(f"{key}={value}")
-    
-    data_check_string = "\n".join(data_check_arr)
-    
-    # Создаем secret key из bot token
-    secret_key = hashlib.sha256(bot_token.encode()).digest()
-    
-    # Создаем hash
-    calculated_hash = hmac.new(
-        secret_key,
-        data_check_string.encode(),
-        hashlib.sha256
-    ).hexdigest()
-    
-    # Сравниваем с полученным hash
-    return calculated_hash == auth_data.hash
+    mac = _TELEGRAM_HMAC.copy()
+    mac.update(_data_check_string(auth_data))
+    # Сравнение за постоянное время (без утечки совпавшего префикса);
+    # байты, а не str: compare_digest не принимает не-ASCII строки
+    return hmac.compare_digest(mac.hexdigest().encode(), auth_data.hash.encode())
+
+
+def _replay_key(auth_data: TelegramAuthData) -> Tuple[int, int, str]:
+    return auth_data.id, auth_data.auth_date, auth_data.hash
 
 
 @router.post("/telegram", response_model=LoginResponse, status_code=status.HTTP_200_OK)
 async def telegram_login(
     auth_data: TelegramAuthData,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Telegram OAuth login endpoint
@@ -85,41 +103,52 @@ async def telegram_login(
             detail="Invalid Telegram authentication data"
         )
     
-    # 2. Проверяем что данные не устарели (макс 24 часа)
-    auth_timestamp = datetime.fromtimestamp(auth_data.auth_date)
-    if datetime.utcnow() - auth_timestamp > timedelta(hours=24):
+    # 2. Проверяем что данные не устарели (макс TELEGRAM_AUTH_MAX_AGE)
+    # auth_date - unix timestamp, сравниваем с time.time() без часовых поясов
+    age = time.time() - auth_data.auth_date
+    if age > settings.TELEGRAM_AUTH_MAX_AGE:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Authentication data expired"
         )
     
-    # 3. Ищем существующего пользователя
-    user = db.query(User).filter(User.telegram_id == auth_data.id).first()
-    
-    is_new_user = False
-    
-    if user is None:
-        # 4. Создаем нового пользователя
-        user = User(
-            telegram_id=auth_data.id,
-            telegram_username=auth_data.username,
-            telegram_first_name=auth_data.first_name,
-            telegram_last_name=auth_data.last_name,
-            telegram_photo_url=auth_data.photo_url,
-            last_login_at=datetime.utcnow()
+    # 3. Одни и те же данные виджета принимаются один раз (в этом процессе)
+    replay_key = _replay_key(auth_data)
+    if replay_cache.get(replay_key) is not None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Authentication data already used"
         )
-        db.add(user)
-        is_new_user = True
-    else:
-        # 5. Обновляем данные существующего пользователя
-        user.telegram_username = auth_data.username
-        user.telegram_first_name = auth_data.first_name
-        user.telegram_last_name = auth_data.last_name
-        user.telegram_photo_url = auth_data.photo_url
-        user.last_login_at = datetime.utcnow()
-    
-    db.commit()
-    db.refresh(user)
+    replay_cache.set(replay_key, True, ttl=max(settings.TELEGRAM_AUTH_MAX_AGE - age, 1))
+    
+    # 4-5. Создаем или обновляем пользователя одним запросом; новый
+    # пользователь - если created_at совпал с переданным в INSERT
+    now = datetime.utcnow()
+    profile = {
+        "telegram_username": auth_data.username,
+        "telegram_first_name": auth_data.first_name,
+        "telegram_last_name": auth_data.last_name,
+        "telegram_photo_url": auth_data.photo_url,
+        "last_login_at": now,
+        "updated_at": now,
+    }
+    stmt = (
+        pg_insert(User)
+        .values(telegram_id=auth_data.id, created_at=now, **profile)
+        .on_conflict_do_update(index_elements=[User.telegram_id], set_=profile)
+        .returning(User)
+    )
+    try:
+        user = (await db.scalars(stmt)).one()
+        is_new_user = user.created_at == now
+        await db.commit()
+    except Exception:
+        # Логин не состоялся - те же данные виджета можно отправить повторно
+        replay_cache.pop(replay_key)
+        raise
+    
+    # Снимок пользователя в кеше get_current_user (ORM события не срабатывают)
+    invalidate_user(user.id)
     
     # 6. Создаем JWT token
     access_token_expires = timedelta(days=settings.ACCESS_TOKEN_EXPIRE_DAYS)
@@ -157,7 +186,7 @@ async def get_current_user_info(
     
     Требует авторизации (JWT token в header)
     """
-    return UserResponse.model_validate(current_user)
+    return json_response(dump_json(UserResponse, current_user))
 
 
 @router.post("/logout", status_code=status.HTTP_200_OK)
@@ -2,19 +2,36 @@
 Companies API endpoints
 
 FR-1.2: Профиль компании
+
+GET ответы несут ETag (updated_at компаний и расчетов); If-None-Match
+с тем же ETag - 304 после дешевого запроса версий.
 """
 
-from typing import List
+from typing import List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import delete, func, select, true
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.cache import invalidate_company
 from app.core.database import get_db
+from app.core.responses import etag_matches, json_response, make_etag, not_modified
 from app.models.user import User
-from app.models.company import Company
-from app.schemas.company import CompanyCreate, CompanyUpdate, CompanyResponse
+from app.models.company import Company, CompanySizeEnum, IndustryEnum
+from app.models.financial_data import FinancialData
+from app.models.calculated_metrics import CalculatedMetrics
+from app.models.revenue_forecast import RevenueForecast
+from app.models.period_comparison import PeriodComparison
+from app.schemas.company import CompanyCreate, CompanyUpdate, CompanyResponse, CompanyOverview
+from app.schemas.serialization import dump_json, dump_json_list
+from app.services.comparison_service import CHANGE_COLUMNS
+from app.services.snapshot_tombstones import record_tombstones, reexport_companies
+from app.services.metrics_calculator import METRIC_COLUMNS, STATUS_COLUMNS
+from app.tasks.benchmarks import enqueue_benchmarks
 from app.api.deps import get_current_user
+from app.api.pagination import PageParams, keyset_page, split_page
 
 router = APIRouter()
 
@@ -23,7 +40,7 @@ router = APIRouter()
 async def create_company(
     company_in: CompanyCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Создать новую компанию
@@ -32,10 +49,13 @@ async def create_company(
     """
     
     # Проверяем что компания с таким ИНН уже не зарегистрирована этим пользователем
-    existing = db.query(Company).filter(
-        Company.owner_id == current_user.id,
-        Company.inn == company_in.inn
-    ).first()
+    result = await db.execute(
+        select(Company.id).where(
+            Company.owner_id == current_user.id,
+            Company.inn == company_in.inn
+        )
+    )
+    existing = result.first()
     
     if existing:
         raise HTTPException(
@@ -57,40 +77,160 @@ async def create_company(
         )
     
     db.add(company)
-    db.commit()
-    db.refresh(company)
+    await db.commit()
+    await db.refresh(company)
     
-    return CompanyResponse.model_validate(company)
+    return json_response(dump_json(CompanyResponse, company), status_code=status.HTTP_201_CREATED)
 
 
 @router.get("/me", response_model=List[CompanyResponse])
 async def get_my_companies(
+    request: Request,
+    industry: Optional[IndustryEnum] = Query(None),
+    size: Optional[CompanySizeEnum] = Query(None),
+    page: PageParams = Depends(),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
-    Получить все компании текущего пользователя
+    Компании текущего пользователя, новые первыми
+
+    Keyset пагинация по (created_at, id) - индекс ix_companies_owner_created;
+    курсор следующей страницы - в заголовке X-Next-Cursor.
     """
-    companies = db.query(Company).filter(
-        Company.owner_id == current_user.id
-    ).order_by(Company.created_at.desc()).all()
+    result = await db.execute(
+        select(func.count(), func.max(Company.updated_at)).where(
+            Company.owner_id == current_user.id
+        )
+    )
+    etag = make_etag("companies", current_user.id, *result.one())
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    stmt = select(Company).where(Company.owner_id == current_user.id)
+    if industry is not None:
+        stmt = stmt.where(Company.industry == industry)
+    if size is not None:
+        stmt = stmt.where(Company.size == size)
+    
+    result = await db.execute(keyset_page(stmt, (Company.created_at, Company.id), page))
+    companies, headers = split_page(result.scalars().all(), page, ("created_at", "id"))
     
-    return [CompanyResponse.model_validate(c) for c in companies]
+    return json_response(dump_json_list(CompanyResponse, companies), headers=headers, etag=etag)
+
+
+@router.get("/me/overview", response_model=List[CompanyOverview])
+async def get_my_companies_overview(
+    request: Request,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Портфельный дашборд: все компании пользователя с метриками,
+    статусами и изменениями последнего периода
+
+    Один запрос: последний период каждой компании - LATERAL подзапрос
+    с LIMIT 1 по индексу (company_id, period_start), изменения - из
+    period_comparisons.
+    Выбираются только колонки, ORM объекты и relationships не загружаются.
+    ETag - по числу компаний и строк метрик и последним updated_at компаний,
+    метрик и сравнений.
+    """
+    owned = select(Company.id).where(Company.owner_id == current_user.id)
+    versions = select(
+        func.count(),
+        func.max(Company.updated_at),
+        # Число строк метрик: удаление периода не меняет max(updated_at)
+        select(func.count())
+        .select_from(CalculatedMetrics)
+        .where(CalculatedMetrics.company_id.in_(owned))
+        .scalar_subquery(),
+        select(func.max(CalculatedMetrics.updated_at))
+        .where(CalculatedMetrics.company_id.in_(owned))
+        .scalar_subquery(),
+        select(func.max(PeriodComparison.updated_at))
+        .where(PeriodComparison.company_id.in_(owned))
+        .scalar_subquery(),
+    ).where(Company.owner_id == current_user.id)
+    etag = make_etag("overview", current_user.id, *(await db.execute(versions)).one())
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    # LEFT JOIN LATERAL: для каждой компании одна проба индекса
+    # ix_calculated_metrics_company_period (ORDER BY period_start DESC LIMIT 1),
+    # стоимость не зависит от длины истории
+    latest = (
+        select(
+            CalculatedMetrics.financial_data_id,
+            CalculatedMetrics.period_start,
+            *[getattr(CalculatedMetrics, name) for name in METRIC_COLUMNS],
+            *[getattr(CalculatedMetrics, name) for name in STATUS_COLUMNS.values()],
+        )
+        .where(CalculatedMetrics.company_id == Company.id)
+        .order_by(CalculatedMetrics.period_start.desc())
+        .limit(1)
+        .lateral("latest")
+    )
+    stmt = (
+        select(
+            Company.id,
+            Company.name,
+            Company.inn,
+            Company.industry,
+            Company.size,
+            latest,
+            *[getattr(PeriodComparison, name) for name in CHANGE_COLUMNS],
+        )
+        .select_from(Company)
+        .outerjoin(latest, true())
+        .outerjoin(PeriodComparison, PeriodComparison.financial_data_id == latest.c.financial_data_id)
+        .where(Company.owner_id == current_user.id)
+        .order_by(Company.created_at.desc())
+    )
+    rows = (await db.execute(stmt)).all()
+
+    overview = []
+    for row in rows:
+        item = {
+            "id": row.id,
+            "name": row.name,
+            "inn": row.inn,
+            "industry": row.industry,
+            "size": row.size,
+            "financial_data_id": row.financial_data_id,
+            "period_start": row.period_start,
+        }
+        if row.financial_data_id is not None:
+            item["metrics"] = {metric: getattr(row, metric) for metric in METRIC_COLUMNS}
+            item["statuses"] = {
+                metric: getattr(row, column)
+                for metric, column in STATUS_COLUMNS.items()
+                if getattr(row, column) is not None
+            }
+            item["mom"] = {metric: getattr(row, f"mom_{metric}") for metric in METRIC_COLUMNS}
+            item["yoy"] = {metric: getattr(row, f"yoy_{metric}") for metric in METRIC_COLUMNS}
+        overview.append(item)
+
+    return json_response(dump_json_list(CompanyOverview, overview), etag=etag)
 
 
 @router.get("/{company_id}", response_model=CompanyResponse)
 async def get_company(
     company_id: UUID,
+    request: Request,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Получить конкретную компанию по ID
     """
-    company = db.query(Company).filter(
-        Company.id == company_id,
-        Company.owner_id == current_user.id
-    ).first()
+    result = await db.execute(
+        select(Company).where(
+            Company.id == company_id,
+            Company.owner_id == current_user.id
+        )
+    )
+    company = result.scalars().first()
     
     if not company:
         raise HTTPException(
@@ -98,7 +238,11 @@ async def get_company(
             detail="Company not found"
         )
     
-    return CompanyResponse.model_validate(company)
+    etag = make_etag("company", company.id, company.updated_at)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    
+    return json_response(dump_json(CompanyResponse, company), etag=etag)
 
 
 @router.put("/{company_id}", response_model=CompanyResponse)
@@ -106,17 +250,20 @@ async def update_company(
     company_id: UUID,
     company_update: CompanyUpdate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Обновить данные компании
     
     FR-1.2: Редактирование в любое время
     """
-    company = db.query(Company).filter(
-        Company.id == company_id,
-        Company.owner_id == current_user.id
-    ).first()
+    result = await db.execute(
+        select(Company).where(
+            Company.id == company_id,
+            Company.owner_id == current_user.id
+        )
+    )
+    company = result.scalars().first()
     
     if not company:
         raise HTTPException(
@@ -137,27 +284,41 @@ async def update_company(
             detail="Invalid INN format"
         )
     
-    db.commit()
-    db.refresh(company)
+    # Компания переходит в другой сегмент отраслевых бенчмарков
+    # и в другую партицию Parquet снимков
+    segment_changed = 'industry' in update_data or 'size' in update_data
+    if segment_changed:
+        await db.flush()
+        await db.run_sync(reexport_companies, [company.id])
+    
+    await db.commit()
+    await db.refresh(company)
     
-    return CompanyResponse.model_validate(company)
+    if segment_changed:
+        await run_in_threadpool(enqueue_benchmarks, [company.id])
+    
+    etag = make_etag("company", company.id, company.updated_at)
+    return json_response(dump_json(CompanyResponse, company), etag=etag)
 
 
 @router.delete("/{company_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_company(
     company_id: UUID,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Удалить компанию
     
     Осторожно: Удаляются также все финансовые данные и метрики (CASCADE)
     """
-    company = db.query(Company).filter(
-        Company.id == company_id,
-        Company.owner_id == current_user.id
-    ).first()
+    result = await db.execute(
+        select(Company).where(
+            Company.id == company_id,
+            Company.owner_id == current_user.id
+        )
+    )
+    company = result.scalars().first()
     
     if not company:
         raise HTTPException(
@@ -165,8 +326,21 @@ async def delete_company(
             detail="Company not found"
         )
     
-    db.delete(company)
-    db.commit()
+    # Удаляем bulk запросами: каскад через ORM потребовал бы загрузки
+    # всех связанных строк (lazy load недоступен в async сессии)
+    await db.execute(delete(RevenueForecast).where(RevenueForecast.company_id == company.id))
+    await db.execute(delete(PeriodComparison).where(PeriodComparison.company_id == company.id))
+    await db.execute(delete(CalculatedMetrics).where(CalculatedMetrics.company_id == company.id))
+    await db.execute(delete(FinancialData).where(FinancialData.company_id == company.id))
+    await db.run_sync(record_tombstones, [company.id])
+    # Не db.delete(company): каскад ORM загрузил бы каждый relationship
+    # компании отдельным запросом, хотя строки уже удалены
+    await db.execute(delete(Company).where(Company.id == company.id))
+    await db.commit()
+    
+    await invalidate_company(company_id)
+    # Без метрик вклад компании вычитается из скетчей бенчмарков
+    await run_in_threadpool(enqueue_benchmarks, [company_id])
     
     return None
 
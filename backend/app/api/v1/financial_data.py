@@ -0,0 +1,277 @@
+"""
+Financial Data API endpoints
+
+FR-2.1: Загрузка финансовых данных (массовый импорт через API)
+"""
+
+import json
+import time
+from datetime import date, datetime
+from datetime import time as dt_time
+from typing import Any, AsyncIterator, List, Optional, Tuple
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import invalidate_company
+from app.core.config import settings
+from app.core.database import get_db
+from app.core.responses import etag_matches, json_response, make_etag, not_modified
+from app.models.user import User
+from app.models.company import Company
+from app.models.financial_data import FinancialData
+from app.schemas.financial_data import BulkImportResult, FinancialDataCreate, FinancialDataResponse
+from app.schemas.upload import UploadRowError
+from app.schemas.serialization import dump_json, dump_json_list
+from app.services.file_processor import format_validation_error
+from app.services.financial_data_service import import_financial_data
+from app.tasks.benchmarks import enqueue_benchmarks
+from app.tasks.forecasts import enqueue_forecasts
+from app.api.deps import get_current_user
+from app.api.pagination import PageParams, keyset_page, split_page
+
+router = APIRouter()
+
+NDJSON_CONTENT_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+
+
+def _too_many_rows() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"Слишком много периодов в запросе (максимум {settings.BULK_IMPORT_MAX_ROWS})"
+    )
+
+
+def _too_large() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"Тело запроса превышает максимальный размер "
+               f"{settings.BULK_IMPORT_MAX_BYTES // (1024 * 1024)} MB"
+    )
+
+
+async def _iter_body(request: Request) -> AsyncIterator[bytes]:
+    """
+    Тело запроса по частям; размер проверяется по Content-Length
+    и по мере чтения (Content-Length может отсутствовать)
+    """
+    content_length = request.headers.get("content-length", "")
+    if content_length.isdigit() and int(content_length) > settings.BULK_IMPORT_MAX_BYTES:
+        raise _too_large()
+
+    size = 0
+    async for chunk in request.stream():
+        size += len(chunk)
+        if size > settings.BULK_IMPORT_MAX_BYTES:
+            raise _too_large()
+        yield chunk
+
+
+async def _iter_ndjson(chunks: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, Any]]:
+    """Построчный разбор NDJSON потока: (номер строки, объект)"""
+    buffer = b""
+    line_number = 0
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            line_number += 1
+            if line.strip():
+                yield line_number, line
+    if buffer.strip():
+        yield line_number + 1, buffer
+
+
+async def _read_items(request: Request) -> List[Tuple[int, Any]]:
+    """
+    Тело запроса -> [(номер, сырые данные)]
+
+    application/json - массив объектов, application/x-ndjson - объект на строку
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    items: List[Tuple[int, Any]] = []
+
+    if content_type in NDJSON_CONTENT_TYPES:
+        async for line_number, line in _iter_ndjson(_iter_body(request)):
+            items.append((line_number, line))
+            if len(items) > settings.BULK_IMPORT_MAX_ROWS:
+                raise _too_many_rows()
+        return items
+
+    body = b"".join([chunk async for chunk in _iter_body(request)])
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Некорректный JSON"
+        )
+    if not isinstance(payload, list):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Ожидается массив объектов FinancialDataCreate"
+        )
+    if len(payload) > settings.BULK_IMPORT_MAX_ROWS:
+        raise _too_many_rows()
+    return list(enumerate(payload, 1))
+
+
+@router.post("/bulk", response_model=BulkImportResult, status_code=status.HTTP_201_CREATED)
+async def bulk_import(
+    request: Request,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Массовый импорт периодов
+
+    Тело: JSON массив FinancialDataCreate или NDJSON поток
+    (Content-Type: application/x-ndjson), по объекту на строку.
+
+    Импорт атомарный: если хотя бы одна строка не прошла валидацию,
+    ничего не записывается и возвращается 422 со списком ошибок
+    (строки нумеруются с 1). Уже существующие периоды
+    (company_id, period_start) обновляются.
+
+    В запросе пересчитываются метрики и сравнения периодов; бенчмарки
+    и прогноз выручки обновляются фоновыми задачами.
+    """
+    started_at = time.perf_counter()
+
+    items: List[FinancialDataCreate] = []
+    errors: List[UploadRowError] = []
+    for index, raw in await _read_items(request):
+        try:
+            if isinstance(raw, (bytes, str)):
+                items.append(FinancialDataCreate.model_validate_json(raw))
+            else:
+                items.append(FinancialDataCreate.model_validate(raw))
+        except ValueError as e:
+            errors.append(UploadRowError(row=index, message=format_validation_error(e)))
+
+    if errors:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=[error.model_dump() for error in errors[:100]]
+        )
+    if not items:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Нет данных для импорта"
+        )
+
+    company_ids = {item.company_id for item in items}
+    result = await db.execute(
+        select(Company.id).where(
+            Company.id.in_(company_ids),
+            Company.owner_id == current_user.id
+        )
+    )
+    missing = company_ids - set(result.scalars().all())
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Company not found: {', '.join(sorted(str(c) for c in missing))}"
+        )
+
+    imported = await db.run_sync(import_financial_data, items)
+    await db.commit()
+
+    for company_id in imported["company_ids"]:
+        await invalidate_company(company_id)
+    await run_in_threadpool(enqueue_benchmarks, imported["company_ids"])
+    await run_in_threadpool(enqueue_forecasts, imported["company_ids"])
+
+    result = BulkImportResult(
+        **imported,
+        duration_seconds=round(time.perf_counter() - started_at, 4),
+    )
+    return json_response(dump_json(BulkImportResult, result), status_code=status.HTTP_201_CREATED)
+
+
+@router.get("", response_model=List[FinancialDataResponse])
+async def list_financial_data(
+    request: Request,
+    company_id: UUID = Query(...),
+    period_from: Optional[date] = Query(None, description="Периоды, начинающиеся не раньше"),
+    period_to: Optional[date] = Query(None, description="Периоды, начинающиеся не позже"),
+    page: PageParams = Depends(),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Периоды компании, последние первыми
+
+    Keyset пагинация по (period_start, id) - индекс uq_financial_data_company_period;
+    курсор следующей страницы - в заголовке X-Next-Cursor.
+    """
+    result = await db.execute(
+        select(Company.id).where(
+            Company.id == company_id,
+            Company.owner_id == current_user.id
+        )
+    )
+    if result.first() is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Company not found"
+        )
+
+    result = await db.execute(
+        select(func.count(), func.max(FinancialData.updated_at)).where(
+            FinancialData.company_id == company_id
+        )
+    )
+    etag = make_etag("financial_data_list", company_id, *result.one())
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    stmt = select(FinancialData).where(FinancialData.company_id == company_id)
+    if period_from is not None:
+        stmt = stmt.where(FinancialData.period_start >= datetime.combine(period_from, dt_time.min))
+    if period_to is not None:
+        stmt = stmt.where(FinancialData.period_start <= datetime.combine(period_to, dt_time.max))
+
+    result = await db.execute(keyset_page(stmt, (FinancialData.period_start, FinancialData.id), page))
+    periods, headers = split_page(result.scalars().all(), page, ("period_start", "id"))
+
+    return json_response(dump_json_list(FinancialDataResponse, periods), headers=headers, etag=etag)
+
+
+@router.get("/{financial_data_id}", response_model=FinancialDataResponse)
+async def get_financial_data(
+    financial_data_id: UUID,
+    request: Request,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Финансовые данные одного периода
+
+    ETag - по version и updated_at: If-None-Match с тем же ETag - 304
+    после выборки только этих колонок.
+    """
+    result = await db.execute(
+        select(FinancialData.version, FinancialData.updated_at)
+        .join(Company, Company.id == FinancialData.company_id)
+        .where(
+            FinancialData.id == financial_data_id,
+            Company.owner_id == current_user.id
+        )
+    )
+    period = result.first()
+    if period is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Financial data not found"
+        )
+
+    etag = make_etag("financial_data", financial_data_id, *period)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    financial_data = await db.get(FinancialData, financial_data_id)
+    return json_response(dump_json(FinancialDataResponse, financial_data), etag=etag)
@@ -0,0 +1,39 @@
+"""
+Background jobs API endpoints
+
+Статус фоновой обработки загрузок (Celery)
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+
+from app.core.responses import json_response
+from app.models.user import User
+from app.schemas.job import JobStatus
+from app.schemas.serialization import dump_json
+from app.tasks.uploads import get_upload_job
+from app.api.deps import get_current_user
+
+router = APIRouter()
+
+
+@router.get("/{job_id}", response_model=JobStatus)
+async def get_job(
+    job_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Получить статус фоновой задачи
+
+    Возвращает этап обработки, количество прочитанных/сохраненных строк,
+    ошибки и итог загрузки после завершения.
+    """
+    job = await run_in_threadpool(get_upload_job, job_id)
+
+    if job is None or job[0] != str(current_user.id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found"
+        )
+
+    return json_response(dump_json(JobStatus, job[1]))
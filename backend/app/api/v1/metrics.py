@@ -0,0 +1,514 @@
+"""
+Metrics API endpoints
+
+FR-3.1: Калькулятор метрик
+
+Ответы кешируются в Redis уже сериализованными (см. app.core.cache):
+ключ включает financial_data_id и версию FinancialData.
+
+Все ответы несут ETag из версий данных (version, updated_at расчетов);
+If-None-Match с тем же ETag - 304 после дешевого запроса версий.
+"""
+
+from datetime import date, datetime, time
+from typing import List, Optional, Tuple
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import cache_get, cache_set, metrics_key
+from app.core.database import get_db
+from app.core.responses import etag_matches, json_response, make_etag, not_modified
+from app.models.user import User
+from app.models.company import Company
+from app.models.financial_data import FinancialData
+from app.models.calculated_metrics import CalculatedMetrics
+from app.models.metric_benchmark import MetricBenchmark
+from app.models.period_comparison import PeriodComparison
+from app.models.revenue_forecast import RevenueForecast
+from app.schemas.metrics import (
+    CalculatedMetricsResponse,
+    CompanyBenchmarks,
+    MetricPercentile,
+    MetricsChanges,
+    MetricsComparison,
+    MetricsSummary,
+    MetricsTimeseries,
+    RevenueForecastResponse,
+)
+from app.schemas.serialization import dump_json
+from app.services.benchmark_service import segment_sketches
+from app.services.metrics_calculator import METRIC_COLUMNS, metric_change
+from app.api.deps import get_current_user
+
+router = APIRouter()
+
+# (financial_data_id, version, updated_at расчета метрик)
+PeriodRef = Tuple[UUID, int, Optional[datetime]]
+
+# Метрики, доступные во временном ряду
+TIMESERIES_METRICS = METRIC_COLUMNS + ("revenue_forecast",)
+
+
+async def _check_company(db: AsyncSession, company_id: UUID, current_user: User) -> None:
+    """404 если компания не найдена или принадлежит другому пользователю"""
+    result = await db.execute(
+        select(Company.id).where(
+            Company.id == company_id,
+            Company.owner_id == current_user.id
+        )
+    )
+    if result.first() is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Company not found"
+        )
+
+
+async def _latest_periods(db: AsyncSession, company_id: UUID, limit: int) -> List[PeriodRef]:
+    """Последние периоды компании (id и версии) - дешевый запрос для ключа кеша и ETag"""
+    result = await db.execute(
+        select(FinancialData.id, FinancialData.version, CalculatedMetrics.updated_at)
+        .outerjoin(CalculatedMetrics, CalculatedMetrics.financial_data_id == FinancialData.id)
+        .where(FinancialData.company_id == company_id)
+        .order_by(FinancialData.period_start.desc())
+        .limit(limit)
+    )
+    return [(row.id, row.version, row.updated_at) for row in result.all()]
+
+
+async def _get_metrics(db: AsyncSession, financial_data_id: UUID) -> Optional[CalculatedMetrics]:
+    result = await db.execute(
+        select(CalculatedMetrics).where(CalculatedMetrics.financial_data_id == financial_data_id)
+    )
+    return result.scalars().first()
+
+
+def _metrics_not_found() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail="Metrics not found"
+    )
+
+
+def _forecast_not_found() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail="Forecast not found"
+    )
+
+
+def _summary(metrics: CalculatedMetrics) -> MetricsSummary:
+    return MetricsSummary(
+        revenue=metrics.revenue,
+        gross_margin=metrics.gross_margin,
+        ros=metrics.ros,
+        roa=metrics.roa,
+        roe=metrics.roe,
+        current_ratio=metrics.current_ratio,
+        statuses=metrics.assess_status(),
+    )
+
+
+def _comparison(current: CalculatedMetrics, previous: Optional[CalculatedMetrics]) -> MetricsComparison:
+    def change(metric: str) -> Optional[float]:
+        if previous is None:
+            return None
+        return metric_change(metric, getattr(current, metric), getattr(previous, metric))
+
+    return MetricsComparison(
+        current=CalculatedMetricsResponse.model_validate(current),
+        previous=CalculatedMetricsResponse.model_validate(previous) if previous is not None else None,
+        revenue_change=change("revenue"),
+        gross_margin_change=change("gross_margin"),
+        ros_change=change("ros"),
+        roa_change=change("roa"),
+    )
+
+
+@router.get("/{company_id}/metrics/latest", response_model=CalculatedMetricsResponse)
+async def get_latest_metrics(
+    company_id: UUID,
+    request: Request,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Метрики за последний период компании
+    """
+    await _check_company(db, company_id, current_user)
+
+    periods = await _latest_periods(db, company_id, 1)
+    if not periods:
+        raise _metrics_not_found()
+
+    financial_data_id, version, calculated_at = periods[0]
+    etag = make_etag("metrics", financial_data_id, version, calculated_at)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    key = metrics_key(company_id, "metrics", financial_data_id, f"v{version}")
+    cached = await cache_get(key)
+    if cached is not None:
+        return json_response(cached, etag=etag)
+
+    metrics = await _get_metrics(db, financial_data_id)
+    if metrics is None:
+        raise _metrics_not_found()
+
+    payload = dump_json(CalculatedMetricsResponse, metrics)
+    await cache_set(key, payload)
+    return json_response(payload, etag=etag)
+
+
+@router.get("/{company_id}/metrics/summary", response_model=MetricsSummary)
+async def get_metrics_summary(
+    company_id: UUID,
+    request: Request,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Краткая сводка ключевых метрик за последний период (для дашборда)
+    """
+    await _check_company(db, company_id, current_user)
+
+    periods = await _latest_periods(db, company_id, 1)
+    if not periods:
+        raise _metrics_not_found()
+
+    financial_data_id, version, calculated_at = periods[0]
+    etag = make_etag("summary", financial_data_id, version, calculated_at)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    key = metrics_key(company_id, "summary", financial_data_id, f"v{version}")
+    cached = await cache_get(key)
+    if cached is not None:
+        return json_response(cached, etag=etag)
+
+    metrics = await _get_metrics(db, financial_data_id)
+    if metrics is None:
+        raise _metrics_not_found()
+
+    payload = dump_json(MetricsSummary, _summary(metrics))
+    await cache_set(key, payload)
+    return json_response(payload, etag=etag)
+
+
+@router.get("/{company_id}/metrics/comparison", response_model=MetricsComparison)
+async def get_metrics_comparison(
+    company_id: UUID,
+    request: Request,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Сравнение метрик последнего периода с предыдущим
+    """
+    await _check_company(db, company_id, current_user)
+
+    periods = await _latest_periods(db, company_id, 2)
+    if not periods:
+        raise _metrics_not_found()
+
+    etag = make_etag("comparison", *(part for period in periods for part in period))
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    key = metrics_key(
+        company_id, "comparison", *(f"{fd_id}:v{version}" for fd_id, version, _ in periods)
+    )
+    cached = await cache_get(key)
+    if cached is not None:
+        return json_response(cached, etag=etag)
+
+    current = await _get_metrics(db, periods[0][0])
+    if current is None:
+        raise _metrics_not_found()
+    previous = await _get_metrics(db, periods[1][0]) if len(periods) > 1 else None
+
+    payload = dump_json(MetricsComparison, _comparison(current, previous))
+    await cache_set(key, payload)
+    return json_response(payload, etag=etag)
+
+
+@router.get("/{company_id}/metrics/timeseries", response_model=MetricsTimeseries)
+async def get_metrics_timeseries(
+    company_id: UUID,
+    request: Request,
+    date_from: Optional[date] = Query(None, description="Периоды, начинающиеся не раньше"),
+    date_to: Optional[date] = Query(None, description="Периоды, начинающиеся не позже"),
+    metrics: Optional[str] = Query(
+        None,
+        description="Метрики через запятую (по умолчанию все): revenue,gross_margin,ros"
+    ),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Временной ряд метрик за диапазон дат
+
+    Данные отдаются колонками (массив значений на метрику), выборка
+    идет по индексу (company_id, period_start) без загрузки ORM объектов.
+    ETag - по числу строк диапазона и последнему updated_at.
+    """
+    if metrics:
+        names = [name.strip() for name in metrics.split(",") if name.strip()]
+        unknown = [name for name in names if name not in TIMESERIES_METRICS]
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown metrics: {', '.join(unknown)}"
+            )
+    else:
+        names = list(TIMESERIES_METRICS)
+
+    await _check_company(db, company_id, current_user)
+
+    conditions = [CalculatedMetrics.company_id == company_id]
+    if date_from is not None:
+        conditions.append(CalculatedMetrics.period_start >= datetime.combine(date_from, time.min))
+    if date_to is not None:
+        conditions.append(CalculatedMetrics.period_start <= datetime.combine(date_to, time.max))
+
+    rows_count, updated_at = (await db.execute(
+        select(func.count(), func.max(CalculatedMetrics.updated_at)).where(*conditions)
+    )).one()
+    etag = make_etag("timeseries", company_id, rows_count, updated_at)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    stmt = (
+        select(
+            CalculatedMetrics.period_start,
+            *[getattr(CalculatedMetrics, name) for name in names],
+        )
+        .where(*conditions)
+        .order_by(CalculatedMetrics.period_start)
+    )
+    rows = (await db.execute(stmt)).all()
+    columns = list(zip(*rows)) if rows else [()] * (len(names) + 1)
+
+    timeseries = MetricsTimeseries(
+        company_id=company_id,
+        period_start=list(columns[0]),
+        series={name: list(values) for name, values in zip(names, columns[1:])},
+    )
+    return json_response(dump_json(MetricsTimeseries, timeseries), etag=etag)
+
+
+@router.get("/{company_id}/metrics/changes", response_model=MetricsChanges)
+async def get_metrics_changes(
+    company_id: UUID,
+    request: Request,
+    period: Optional[date] = Query(None, description="Последний период, начавшийся не позже даты"),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Изменения всех 13 метрик к предыдущему периоду и к году назад
+
+    Читается готовая строка period_comparisons (одна выборка по индексу
+    (company_id, period_start)); по умолчанию - последний период.
+    """
+    await _check_company(db, company_id, current_user)
+
+    # Сначала только версия строки: для 304 полная строка не читается
+    stmt = (
+        select(PeriodComparison.id, PeriodComparison.financial_data_id, PeriodComparison.updated_at)
+        .where(PeriodComparison.company_id == company_id)
+        .order_by(PeriodComparison.period_start.desc())
+        .limit(1)
+    )
+    if period is not None:
+        stmt = stmt.where(PeriodComparison.period_start <= datetime.combine(period, time.max))
+
+    latest = (await db.execute(stmt)).first()
+    if latest is None:
+        raise _metrics_not_found()
+
+    etag = make_etag("changes", latest.financial_data_id, latest.updated_at)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    comparison = await db.get(PeriodComparison, latest.id)
+    if comparison is None:
+        raise _metrics_not_found()
+    etag = make_etag("changes", comparison.financial_data_id, comparison.updated_at)
+
+    changes = MetricsChanges(
+        financial_data_id=comparison.financial_data_id,
+        period_start=comparison.period_start,
+        previous_period_start=comparison.previous_period_start,
+        year_ago_period_start=comparison.year_ago_period_start,
+        mom={metric: getattr(comparison, f"mom_{metric}") for metric in METRIC_COLUMNS},
+        yoy={metric: getattr(comparison, f"yoy_{metric}") for metric in METRIC_COLUMNS},
+    )
+    return json_response(dump_json(MetricsChanges, changes), etag=etag)
+
+
+@router.get("/{company_id}/metrics/benchmarks", response_model=CompanyBenchmarks)
+async def get_metrics_benchmarks(
+    company_id: UUID,
+    request: Request,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Процентиль каждой метрики последнего периода среди компаний
+    той же отрасли и размера
+
+    Распределения читаются из квантильных скетчей (metric_benchmarks),
+    а не сортировкой calculated_metrics. Если в сегменте меньше
+    MIN_BENCHMARK_SAMPLE компаний, сравнение идет со всей отраслью.
+    ETag проверяется до загрузки скетчей: версия метрик компании и
+    последний updated_at metric_benchmarks.
+    """
+    result = await db.execute(
+        select(Company.industry, Company.size).where(
+            Company.id == company_id,
+            Company.owner_id == current_user.id
+        )
+    )
+    company = result.first()
+    if company is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Company not found"
+        )
+
+    result = await db.execute(
+        select(CalculatedMetrics.financial_data_id, CalculatedMetrics.updated_at)
+        .where(CalculatedMetrics.company_id == company_id)
+        .order_by(CalculatedMetrics.period_start.desc())
+        .limit(1)
+    )
+    latest = result.first()
+    if latest is None:
+        raise _metrics_not_found()
+
+    benchmarks_updated_at = (await db.execute(select(func.max(MetricBenchmark.updated_at)))).scalar()
+    etag = make_etag(
+        "benchmarks",
+        company.industry.value,
+        company.size.value,
+        latest.financial_data_id,
+        latest.updated_at,
+        benchmarks_updated_at,
+    )
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    metrics = await _get_metrics(db, latest.financial_data_id)
+    if metrics is None:
+        raise _metrics_not_found()
+
+    rows = (await db.execute(select(MetricBenchmark))).scalars().all()
+    level, sketches = segment_sketches(rows, company.industry, company.size)
+
+    percentiles = {}
+    for name in METRIC_COLUMNS:
+        sketch = sketches[name]
+        value = getattr(metrics, name)
+        percentiles[name] = MetricPercentile(
+            value=value,
+            percentile=sketch.percentile_of(value),
+            p25=sketch.quantile(0.25),
+            median=sketch.quantile(0.5),
+            p75=sketch.quantile(0.75),
+        )
+
+    benchmarks = CompanyBenchmarks(
+        company_id=company_id,
+        financial_data_id=metrics.financial_data_id,
+        period_start=metrics.period_start,
+        industry=company.industry.value,
+        size=company.size.value,
+        level=level,
+        sample_size=sketches["revenue"].count,
+        metrics=percentiles,
+    )
+    return json_response(dump_json(CompanyBenchmarks, benchmarks), etag=etag)
+
+
+@router.get("/{company_id}/metrics/forecast", response_model=RevenueForecastResponse)
+async def get_revenue_forecast(
+    company_id: UUID,
+    request: Request,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Прогноз выручки на следующие периоды
+
+    Прогноз пересчитывается при загрузке новых данных и ночной задачей,
+    здесь только читается готовый результат.
+    """
+    await _check_company(db, company_id, current_user)
+
+    # Сначала только версия прогноза: для 304 полная строка не читается
+    result = await db.execute(
+        select(RevenueForecast.id, RevenueForecast.updated_at)
+        .where(RevenueForecast.company_id == company_id)
+    )
+    latest = result.first()
+    if latest is None:
+        raise _forecast_not_found()
+
+    etag = make_etag("forecast", latest.id, latest.updated_at)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    forecast = await db.get(RevenueForecast, latest.id)
+    if forecast is None:
+        raise _forecast_not_found()
+    etag = make_etag("forecast", forecast.id, forecast.updated_at)
+
+    return json_response(dump_json(RevenueForecastResponse, forecast), etag=etag)
+
+
+@router.get("/{company_id}/metrics/{financial_data_id}", response_model=CalculatedMetricsResponse)
+async def get_period_metrics(
+    company_id: UUID,
+    financial_data_id: UUID,
+    request: Request,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Метрики за конкретный период
+    """
+    await _check_company(db, company_id, current_user)
+
+    result = await db.execute(
+        select(FinancialData.version, CalculatedMetrics.updated_at)
+        .outerjoin(CalculatedMetrics, CalculatedMetrics.financial_data_id == FinancialData.id)
+        .where(
+            FinancialData.id == financial_data_id,
+            FinancialData.company_id == company_id
+        )
+    )
+    period = result.first()
+    if period is None:
+        raise _metrics_not_found()
+    version, calculated_at = period
+
+    etag = make_etag("metrics", financial_data_id, version, calculated_at)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    key = metrics_key(company_id, "metrics", financial_data_id, f"v{version}")
+    cached = await cache_get(key)
+    if cached is not None:
+        return json_response(cached, etag=etag)
+
+    metrics = await _get_metrics(db, financial_data_id)
+    if metrics is None:
+        raise _metrics_not_found()
+
+    payload = dump_json(CalculatedMetricsResponse, metrics)
+    await cache_set(key, payload)
+    return json_response(payload, etag=etag)
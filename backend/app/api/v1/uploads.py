@@ -0,0 +1,117 @@
+"""
+Uploads API endpoints
+
+FR-2.1: Загрузка Excel/CSV файлов
+"""
+
+import os
+import uuid
+from typing import Optional
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_db
+from app.core.config import settings
+from app.core.responses import json_response
+from app.models.user import User
+from app.models.company import Company
+from app.schemas.job import JobCreated
+from app.schemas.serialization import dump_json
+from app.tasks.uploads import enqueue_upload
+from app.api.deps import get_current_user
+
+router = APIRouter()
+
+
+async def _save_upload(file: UploadFile, extension: str) -> str:
+    """
+    Сохранение загружаемого файла в UPLOAD_DIR по частям
+
+    Файл не читается в память целиком; размер проверяется по мере записи.
+    """
+    os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
+    path = os.path.join(settings.UPLOAD_DIR, f"{uuid.uuid4()}{extension}")
+
+    size = 0
+    try:
+        with open(path, "wb") as destination:
+            while chunk := await file.read(settings.UPLOAD_CHUNK_SIZE):
+                size += len(chunk)
+                if size > settings.MAX_UPLOAD_SIZE:
+                    raise HTTPException(
+                        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                        detail=f"Файл превышает максимальный размер "
+                               f"{settings.MAX_UPLOAD_SIZE // (1024 * 1024)} MB"
+                    )
+                destination.write(chunk)
+    except BaseException:
+        os.remove(path)
+        raise
+
+    return path
+
+
+@router.post("", response_model=JobCreated, status_code=status.HTTP_202_ACCEPTED)
+async def upload_file(
+    file: UploadFile = File(...),
+    company_id: Optional[UUID] = Form(None),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Загрузить Excel/CSV файл с финансовыми данными
+
+    FR-2.1: Загрузка Excel/CSV файлов
+
+    Файл сохраняется и ставится в очередь на обработку (Celery worker),
+    ответ возвращается сразу. Прогресс: GET /api/v1/jobs/{job_id}.
+
+    Данные попадают в компанию company_id, либо (для файлов с колонкой
+    "ИНН") в компанию пользователя с соответствующим ИНН. После загрузки
+    метрики затронутых компаний пересчитываются.
+    """
+    filename = file.filename or "upload"
+    extension = os.path.splitext(filename)[1].lower()
+    if extension not in settings.ALLOWED_EXTENSIONS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Неподдерживаемый формат файла. Допустимые: {', '.join(settings.ALLOWED_EXTENSIONS)}"
+        )
+
+    result = await db.execute(
+        select(Company.id, Company.inn).where(Company.owner_id == current_user.id)
+    )
+    companies = result.all()
+    companies_by_inn = {company.inn: company.id for company in companies}
+
+    if company_id is not None and company_id not in companies_by_inn.values():
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Company not found"
+        )
+
+    path = await _save_upload(file, extension)
+
+    try:
+        job_id = await run_in_threadpool(
+            enqueue_upload,
+            path,
+            filename,
+            extension.lstrip("."),
+            current_user.id,
+            company_id,
+            companies_by_inn,
+        )
+    except Exception:
+        os.remove(path)
+        raise
+
+    created = JobCreated(
+        job_id=job_id,
+        status_url=f"{settings.API_V1_PREFIX}/jobs/{job_id}",
+    )
+    return json_response(dump_json(JobCreated, created), status_code=status.HTTP_202_ACCEPTED)
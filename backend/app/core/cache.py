@@ -0,0 +1,119 @@
+"""
+Redis cache
+
+NFR-4.4: Кеширование расчетов (Redis)
+
+Хранит уже сериализованные JSON ответы (bytes), чтобы при попадании
+в кеш не выполнять запросы к БД и Pydantic сериализацию.
+
+Ключи метрик содержат (company_id, financial_data_id, version), поэтому
+изменение версии FinancialData автоматически дает новый ключ.
+Пересчет метрик и удаление компании явно удаляют все ключи компании
+(invalidate_company). Ошибки Redis не ломают запросы - кеш пропускается.
+"""
+
+import logging
+from typing import Any, Dict, Optional
+
+import redis
+import redis.asyncio as aioredis
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_client: Optional[aioredis.Redis] = None
+_sync_client: Optional[redis.Redis] = None
+
+# Счетчики попаданий (для мониторинга)
+cache_stats: Dict[str, int] = {"hits": 0, "misses": 0, "errors": 0}
+
+
+def get_redis() -> aioredis.Redis:
+    """Async Redis клиент (один пул соединений на процесс)"""
+    global _client
+    if _client is None:
+        _client = aioredis.from_url(
+            settings.REDIS_URL,
+            socket_timeout=settings.CACHE_SOCKET_TIMEOUT,
+            socket_connect_timeout=settings.CACHE_SOCKET_TIMEOUT,
+        )
+    return _client
+
+
+def get_sync_redis() -> redis.Redis:
+    """Sync Redis клиент для Celery worker"""
+    global _sync_client
+    if _sync_client is None:
+        _sync_client = redis.Redis.from_url(
+            settings.REDIS_URL,
+            socket_timeout=settings.CACHE_SOCKET_TIMEOUT,
+            socket_connect_timeout=settings.CACHE_SOCKET_TIMEOUT,
+        )
+    return _sync_client
+
+
+def metrics_key(company_id: Any, kind: str, *parts: Any) -> str:
+    """
+    Ключ кеша метрик компании
+
+    Пример: metrics:{company_id}:summary:{financial_data_id}:v3
+    """
+    return ":".join(["metrics", str(company_id), kind, *(str(part) for part in parts)])
+
+
+def _company_pattern(company_id: Any) -> str:
+    return f"metrics:{company_id}:*"
+
+
+async def cache_get(key: str) -> Optional[bytes]:
+    """Получить значение из кеша (None при промахе или недоступности Redis)"""
+    if not settings.CACHE_ENABLED:
+        return None
+    try:
+        value = await get_redis().get(key)
+    except redis.RedisError as e:
+        cache_stats["errors"] += 1
+        logger.warning("Redis cache get failed: %s", e)
+        return None
+
+    cache_stats["hits" if value is not None else "misses"] += 1
+    return value
+
+
+async def cache_set(key: str, value: bytes, ttl: Optional[int] = None) -> None:
+    """Записать значение в кеш"""
+    if not settings.CACHE_ENABLED:
+        return
+    try:
+        await get_redis().set(key, value, ex=ttl or settings.METRICS_CACHE_TTL)
+    except redis.RedisError as e:
+        cache_stats["errors"] += 1
+        logger.warning("Redis cache set failed: %s", e)
+
+
+async def invalidate_company(company_id: Any) -> None:
+    """Удалить все закешированные ответы компании"""
+    if not settings.CACHE_ENABLED:
+        return
+    try:
+        client = get_redis()
+        keys = [key async for key in client.scan_iter(match=_company_pattern(company_id), count=500)]
+        if keys:
+            await client.delete(*keys)
+    except redis.RedisError as e:
+        cache_stats["errors"] += 1
+        logger.warning("Redis cache invalidation failed: %s", e)
+
+
+def invalidate_company_sync(company_id: Any) -> None:
+    """invalidate_company для sync кода (Celery worker)"""
+    if not settings.CACHE_ENABLED:
+        return
+    try:
+        client = get_sync_redis()
+        keys = list(client.scan_iter(match=_company_pattern(company_id), count=500))
+        if keys:
+            client.delete(*keys)
+    except redis.RedisError as e:
+        logger.warning("Redis cache invalidation failed: %s", e)
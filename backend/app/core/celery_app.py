@@ -0,0 +1,49 @@
+"""
+Celery application
+
+Фоновые задачи (обработка загрузок, пересчет метрик) выполняются
+в отдельном worker процессе, периодические (ночной пересчет прогнозов,
+ежечасная выгрузка Parquet снимков) - по расписанию celery beat:
+
+```bash
+celery -A app.core.celery_app worker --beat --loglevel=info
+```
+"""
+
+from celery import Celery
+from celery.schedules import crontab
+
+from app.core.config import settings
+
+celery_app = Celery(
+    "finreportai",
+    broker=settings.CELERY_BROKER_URL or settings.REDIS_URL,
+    backend=settings.CELERY_RESULT_BACKEND or settings.REDIS_URL,
+    include=[
+        "app.tasks.uploads",
+        "app.tasks.forecasts",
+        "app.tasks.benchmarks",
+        "app.tasks.snapshots",
+    ],
+)
+
+celery_app.conf.update(
+    task_serializer="json",
+    result_serializer="json",
+    accept_content=["json"],
+    result_expires=settings.JOB_RESULT_EXPIRES,
+    task_track_started=True,
+    # Загрузки тяжелые: worker берет следующую задачу только после завершения текущей
+    worker_prefetch_multiplier=1,
+    task_acks_late=True,
+    beat_schedule={
+        "refresh-forecasts": {
+            "task": "forecasts.refresh_all",
+            "schedule": crontab(hour=settings.FORECAST_SCHEDULE_HOUR, minute=0),
+        },
+        "export-snapshots": {
+            "task": "snapshots.export",
+            "schedule": crontab(minute=settings.SNAPSHOT_SCHEDULE_MINUTE),
+        },
+    },
+)
@@ -0,0 +1,173 @@
+"""
+Response compression
+
+Сжатие JSON ответов по Accept-Encoding: zstd и br (если установлены
+zstandard / brotli), иначе gzip. Ответы меньше COMPRESSION_MIN_SIZE
+не сжимаются - выигрыш меньше заголовков и CPU.
+
+- Ответы с Content-Encoding (уже сжатые) отдаются как есть
+- Потоковые ответы (несколько body сообщений) не сжимаются
+- Сжатые варианты ответов с ETag кешируются в памяти процесса по
+  (путь, query, ETag, кодировка): одинаковый payload (кеш Redis,
+  неизменный дашборд) не сжимается повторно. ETag однозначен только
+  в пределах URL, поэтому путь и query входят в ключ
+- Strong ETag становится weak (W/"..."), как в nginx: байты на проводе
+  зависят от кодировки, а If-None-Match сравнивается слабо
+  (app.core.responses.etag_matches). Ослабляется любой JSON ответ и
+  любой 304 при согласованной кодировке, а не только сжатый: 304 не
+  знает размера тела и должен нести тот же валидатор, что и 200
+"""
+
+import gzip
+from typing import Callable, Dict, Optional, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.local_cache import TTLCache
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli опционален
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - zstandard опционален
+    zstandard = None
+
+COMPRESSIBLE_TYPES = ("application/json", "text/")
+
+
+def _weaken_etag(headers: MutableHeaders) -> None:
+    etag = headers.get("etag")
+    if etag and not etag.startswith("W/"):
+        headers["ETag"] = f"W/{etag}"
+
+
+def _gzip(body: bytes) -> bytes:
+    return gzip.compress(body, compresslevel=settings.COMPRESSION_GZIP_LEVEL, mtime=0)
+
+
+def _brotli(body: bytes) -> bytes:
+    return brotli.compress(body, quality=settings.COMPRESSION_BROTLI_QUALITY)
+
+
+def _zstd(body: bytes) -> bytes:
+    return zstandard.ZstdCompressor(level=settings.COMPRESSION_ZSTD_LEVEL).compress(body)
+
+
+def available_encodings() -> Dict[str, Callable[[bytes], bytes]]:
+    """Доступные кодировки в порядке предпочтения сервера"""
+    encoders = {"zstd": _zstd if zstandard else None, "br": _brotli if brotli else None, "gzip": _gzip}
+    return {
+        name: encoders[name]
+        for name in settings.COMPRESSION_ENCODINGS
+        if encoders.get(name) is not None
+    }
+
+
+def choose_encoding(accept_encoding: str, encodings: Dict[str, Callable]) -> Optional[str]:
+    """Первая по предпочтению сервера кодировка, принимаемая клиентом (q > 0)"""
+    accepted = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+
+    for name in encodings:
+        if accepted.get(name, accepted.get("*", 0.0)) > 0:
+            return name
+    return None
+
+
+# (путь, query, ETag, кодировка) -> сжатое тело
+compressed_cache: TTLCache[bytes] = TTLCache(
+    max_size=settings.COMPRESSION_CACHE_SIZE,
+    ttl=settings.COMPRESSION_CACHE_TTL,
+)
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware сжатия ответов
+
+    Чистый ASGI: http.response.start задерживается до первого body
+    сообщения, чтобы знать размер тела и выбрать, сжимать ли его.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        self.encodings = available_encodings()
+        self.min_size = settings.COMPRESSION_MIN_SIZE
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""), self.encodings)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Optional[Message] = None
+        passthrough = False
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                if message["status"] == 304:
+                    headers = MutableHeaders(raw=message["headers"])
+                    headers.add_vary_header("Accept-Encoding")
+                    _weaken_etag(headers)
+                    passthrough = True
+                    await send(message)
+                    return
+                start = message
+                return
+
+            headers = MutableHeaders(raw=start["headers"])
+            body = message.get("body", b"")
+            if (
+                message.get("more_body", False)
+                or "content-encoding" in headers
+                or not headers.get("content-type", "").startswith(COMPRESSIBLE_TYPES)
+            ):
+                passthrough = True
+                await send(start)
+                await send(message)
+                return
+
+            headers.add_vary_header("Accept-Encoding")
+            if len(body) >= self.min_size:
+                body = self._compress(scope, body, encoding, headers.get("etag"))
+                headers["Content-Encoding"] = encoding
+                headers["Content-Length"] = str(len(body))
+                message = {**message, "body": body}
+            _weaken_etag(headers)
+
+            await send(start)
+            await send(message)
+
+        await self.app(scope, receive, send_compressed)
+
+    def _compress(self, scope: Scope, body: bytes, encoding: str, etag: Optional[str]) -> bytes:
+        if etag is None:
+            return self.encodings[encoding](body)
+        key: Tuple[str, bytes, str, str] = (scope["path"], scope["query_string"], etag, encoding)
+        compressed = compressed_cache.get(key)
+        if compressed is None:
+            compressed = self.encodings[encoding](body)
+            compressed_cache.set(key, compressed)
+        return compressed
@@ -4,7 +4,7 @@
 Использует pydantic-settings для загрузки из environment variables
 """
 
-from typing import List
+from typing import List, Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -24,6 +24,10 @@ class Settings(BaseSettings):
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_DAYS: int = 30
+    TOKEN_CACHE_SIZE: int = 10000  # Декодированных JWT в памяти процесса
+    TOKEN_CACHE_TTL: int = 300  # сек
+    USER_CACHE_SIZE: int = 10000  # Снимков пользователей в памяти процесса
+    USER_CACHE_TTL: int = 30  # сек: ограничивает задержку блокировки пользователя
     
     # Database
     DATABASE_URL: str
@@ -31,9 +35,51 @@ class Settings(BaseSettings):
     # Redis
     REDIS_URL: str = "redis://localhost:6379"
     
+    # Cache
+    CACHE_ENABLED: bool = True
+    METRICS_CACHE_TTL: int = 60 * 60  # 1 час (страховка, основная инвалидация - явная)
+    CACHE_SOCKET_TIMEOUT: float = 0.5  # сек: медленный Redis не должен тормозить API
+    
+    # Health Checks
+    HEALTH_CHECK_TIMEOUT: float = 1.0  # сек на SELECT 1 и Redis PING
+    HEALTH_CACHE_TTL: float = 2.0  # сек: результат readiness для повторных проб
+    HEALTH_POOL_SATURATION: float = 0.9  # Доля занятых соединений -> инстанс не готов
+    
+    # Compression
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MIN_SIZE: int = 1024  # байт: меньшие ответы не сжимаются
+    COMPRESSION_ENCODINGS: List[str] = ["zstd", "br", "gzip"]  # Предпочтение сервера
+    COMPRESSION_GZIP_LEVEL: int = 4  # 6 сжимает JSON метрик на ~5% лучше, но вдвое дольше
+    COMPRESSION_BROTLI_QUALITY: int = 4  # 0-11: выше 5 CPU растет быстрее выигрыша
+    COMPRESSION_ZSTD_LEVEL: int = 3
+    COMPRESSION_CACHE_SIZE: int = 1000  # Сжатых ответов (по ETag) в памяти процесса
+    COMPRESSION_CACHE_TTL: int = 300  # сек
+    
+    # HTTP Caching (Cache-Control, см. app.core.http_cache)
+    CACHE_CONTROL_DEFAULT: str = "private, no-cache"
+    CACHE_CONTROL_METRICS: str = "private, max-age=0, stale-while-revalidate=60"
+    CACHE_CONTROL_AGGREGATES: str = "private, max-age=300, stale-while-revalidate=3600"
+    
+    # Rate Limiting (NFR-2.4)
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_PER_MINUTE: int = 100  # Запросов на пользователя (или IP)
+    RATE_LIMIT_SYNC_INTERVAL: float = 1.0  # сек между сверками с Redis; 0 - только локальный лимит
+    
+    # Query Statistics
+    QUERY_STATS_ENABLED: bool = True  # Счетчики SQL запросов на HTTP запрос
+    QUERY_REPEAT_THRESHOLD: int = 5  # Одинаковых запросов за запрос -> подозрение на N+1
+    
+    # Background Jobs (Celery)
+    CELERY_BROKER_URL: Optional[str] = None  # По умолчанию REDIS_URL
+    CELERY_RESULT_BACKEND: Optional[str] = None  # По умолчанию REDIS_URL
+    JOB_RESULT_EXPIRES: int = 24 * 60 * 60  # Статус задачи хранится 24 часа
+    FORECAST_SCHEDULE_HOUR: int = 3  # Ночной пересчет прогнозов (UTC)
+    
     # Telegram
     TELEGRAM_BOT_TOKEN: str
     TELEGRAM_BOT_NAME: str = "FinReportAIBot"
+    TELEGRAM_AUTH_MAX_AGE: int = 24 * 60 * 60  # сек: срок действия данных Login Widget
+    TELEGRAM_REPLAY_CACHE_SIZE: int = 100000  # Принятых данных виджета в памяти процесса
     
     # CORS
     BACKEND_CORS_ORIGINS: List[str] = [
@@ -47,6 +93,15 @@ class Settings(BaseSettings):
     MAX_UPLOAD_SIZE: int = 10 * 1024 * 1024  # 10 MB
     ALLOWED_EXTENSIONS: List[str] = [".xlsx", ".xls", ".csv"]
     UPLOAD_DIR: str = "/tmp/uploads"
+    UPLOAD_BATCH_SIZE: int = 500  # Строк financial_data в одном insert
+    UPLOAD_CHUNK_SIZE: int = 1024 * 1024  # 1 MB
+    BULK_IMPORT_MAX_ROWS: int = 50000  # Периодов в одном запросе /financial-data/bulk
+    BULK_IMPORT_MAX_BYTES: int = 50 * 1024 * 1024  # Тело запроса /financial-data/bulk (50 MB)
+    
+    # Analytics Snapshots (Parquet)
+    SNAPSHOT_DIR: str = "/tmp/snapshots"
+    SNAPSHOT_CHUNK_SIZE: int = 50000  # Строк в одном файле/пачке выгрузки
+    SNAPSHOT_SCHEDULE_MINUTE: int = 30  # Ежечасная выгрузка (минута часа)
     
     # Pagination
     DEFAULT_PAGE_SIZE: int = 20
@@ -1,53 +1,93 @@
 """
 Database configuration and session management
+
+- async_engine / AsyncSessionLocal (asyncpg) - для API routes
+- engine / SessionLocal (psycopg2) - для Alembic и Celery worker
 """
 
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, Session
-from typing import Generator
+from sqlalchemy.orm import sessionmaker
+from typing import AsyncGenerator
 
 from app.core.config import settings
+from app.core.monitoring import TimedAsyncQueuePool
+from app.core.query_stats import instrument_engine
+
+
+def _async_database_url(url: str) -> str:
+    """postgresql://... -> postgresql+asyncpg://..."""
+    for prefix in ("postgresql+psycopg2://", "postgresql://", "postgres://"):
+        if url.startswith(prefix):
+            return "postgresql+asyncpg://" + url[len(prefix):]
+    return url
+
 
-# Create SQLAlchemy engine
+# Размер пула каждого движка (на процесс)
+POOL_SIZE = 10
+POOL_MAX_OVERFLOW = 20
+
+# Create SQLAlchemy engine (sync: Alembic, Celery worker)
 engine = create_engine(
     settings.DATABASE_URL,
     pool_pre_ping=True,
-    pool_size=10,
-    max_overflow=20,
+    pool_size=POOL_SIZE,
+    max_overflow=POOL_MAX_OVERFLOW,
     echo=settings.DEBUG,
 )
 
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Create async engine (API routes)
+async_engine = create_async_engine(
+    _async_database_url(settings.DATABASE_URL),
+    poolclass=TimedAsyncQueuePool,
+    pool_pre_ping=True,
+    pool_size=POOL_SIZE,
+    max_overflow=POOL_MAX_OVERFLOW,
+    echo=settings.DEBUG,
+)
+
+# Подсчет SQL запросов на HTTP запрос (N+1, время в БД)
+instrument_engine(engine)
+instrument_engine(async_engine.sync_engine)
+
+# Create AsyncSessionLocal class
+# expire_on_commit=False: после commit атрибуты остаются загруженными,
+# иначе обращение к ним в async коде требует повторного запроса
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
 # Create Base class for models
 Base = declarative_base()
 
 
-def get_db() -> Generator[Session, None, None]:
+async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """
-    Dependency для получения database session
-    
+    Dependency для получения async database session
+
     Использование:
     ```python
     @app.get("/items")
-    def read_items(db: Session = Depends(get_db)):
-        return db.query(Item).all()
+    async def read_items(db: AsyncSession = Depends(get_db)):
+        result = await db.execute(select(Item))
+        return result.scalars().all()
     ```
     """
-    db = SessionLocal()
-    try:
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 
 def init_db() -> None:
     """
     Создание всех таблиц в БД
-    
+
     Note: В production используем Alembic migrations
     """
     Base.metadata.create_all(bind=engine)
-
@@ -0,0 +1,115 @@
+"""
+Health checks
+
+- Liveness (/api/health/live): процесс отвечает, без обращения к БД и Redis
+- Readiness (/api/health/ready, /api/health): SELECT 1 через пул async
+  движка и Redis PING, каждый с таймаутом HEALTH_CHECK_TIMEOUT
+
+Результат readiness кешируется на HEALTH_CACHE_TTL секунд, одновременные
+пробы ждут одну проверку (lock) - частые пробы не нагружают БД.
+Инстанс не готов, если БД недоступна или пул почти исчерпан
+(HEALTH_POOL_SATURATION): оркестратор перестает направлять на него трафик.
+Недоступный Redis не снимает инстанс с трафика - кеш пропускается,
+статус "degraded".
+"""
+
+import asyncio
+import logging
+from time import monotonic, perf_counter
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import text
+
+from app.core.cache import get_redis
+from app.core.config import settings
+from app.core.database import POOL_MAX_OVERFLOW, POOL_SIZE, async_engine
+
+logger = logging.getLogger(__name__)
+
+_lock = asyncio.Lock()
+_cached: Optional[Tuple[float, bool, Dict[str, Any]]] = None
+
+
+def _pool_status() -> Dict[str, Any]:
+    pool = async_engine.pool
+    checked_out = pool.checkedout()
+    capacity = POOL_SIZE + POOL_MAX_OVERFLOW
+    return {
+        "checked_out": checked_out,
+        "capacity": capacity,
+        "saturation": round(checked_out / capacity, 3),
+    }
+
+
+async def _check(name: str, probe) -> Dict[str, Any]:
+    """Выполнить проверку с таймаутом, вернуть статус и латентность"""
+    start = perf_counter()
+    try:
+        await asyncio.wait_for(probe(), timeout=settings.HEALTH_CHECK_TIMEOUT)
+    except asyncio.TimeoutError:
+        return {"status": "timeout", "latency_ms": round((perf_counter() - start) * 1000, 2)}
+    except Exception as e:
+        logger.warning("Health check %s failed: %s", name, e)
+        return {"status": "error", "error": type(e).__name__}
+    return {"status": "ok", "latency_ms": round((perf_counter() - start) * 1000, 2)}
+
+
+async def _ping_database() -> None:
+    async with async_engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+
+
+async def _ping_redis() -> None:
+    await get_redis().ping()
+
+
+async def _readiness() -> Tuple[bool, Dict[str, Any]]:
+    pool = _pool_status()
+    saturated = pool["saturation"] >= settings.HEALTH_POOL_SATURATION
+
+    # Пул исчерпан - SELECT 1 ждал бы соединение вместе с запросами
+    if saturated:
+        database = {"status": "skipped", "reason": "pool saturated"}
+        redis = await _check("redis", _ping_redis)
+    else:
+        database, redis = await asyncio.gather(
+            _check("database", _ping_database),
+            _check("redis", _ping_redis),
+        )
+
+    ready = database["status"] == "ok" and not saturated
+    if not ready:
+        status = "unavailable"
+    elif redis["status"] != "ok":
+        status = "degraded"
+    else:
+        status = "ok"
+
+    return ready, {
+        "status": status,
+        "service": settings.APP_NAME,
+        "version": settings.APP_VERSION,
+        "database": database,
+        "redis": redis,
+        "pool": pool,
+    }
+
+
+async def readiness() -> Tuple[bool, Dict[str, Any]]:
+    """
+    Готовность инстанса принимать трафик
+
+    Returns:
+        (готов, отчет по проверкам)
+    """
+    global _cached
+    if _cached is not None and monotonic() - _cached[0] < settings.HEALTH_CACHE_TTL:
+        return _cached[1], _cached[2]
+
+    async with _lock:
+        # Пока ждали lock, проверку мог выполнить другой запрос
+        if _cached is not None and monotonic() - _cached[0] < settings.HEALTH_CACHE_TTL:
+            return _cached[1], _cached[2]
+        ready, report = await _readiness()
+        _cached = (monotonic(), ready, report)
+        return ready, report
@@ -0,0 +1,67 @@
+"""
+HTTP caching policies
+
+Cache-Control для маршрутов API по шаблону маршрута. Заголовок,
+выставленный обработчиком, не перезаписывается.
+
+- Изменяющие запросы и ошибки - no-store (в т.ч. JWT из /auth/telegram)
+- Метрики компании - private, max-age=0 + stale-while-revalidate:
+  браузер сразу показывает прошлый ответ и перепроверяет его по ETag
+- Отраслевые бенчмарки и прогноз (пересчет раз в сутки) - private
+  с max-age
+- Остальные GET - private, no-cache (всегда перепроверка по ETag)
+"""
+
+from typing import Dict
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.query_stats import route_template
+
+NO_STORE = "no-store"
+
+_METRICS = f"{settings.API_V1_PREFIX}/companies/{{company_id}}/metrics"
+
+# Шаблон маршрута (GET) -> Cache-Control
+CACHE_POLICIES: Dict[str, str] = {
+    f"{_METRICS}/latest": settings.CACHE_CONTROL_METRICS,
+    f"{_METRICS}/summary": settings.CACHE_CONTROL_METRICS,
+    f"{_METRICS}/comparison": settings.CACHE_CONTROL_METRICS,
+    f"{_METRICS}/timeseries": settings.CACHE_CONTROL_METRICS,
+    f"{_METRICS}/changes": settings.CACHE_CONTROL_METRICS,
+    f"{_METRICS}/{{financial_data_id}}": settings.CACHE_CONTROL_METRICS,
+    f"{_METRICS}/benchmarks": settings.CACHE_CONTROL_AGGREGATES,
+    f"{_METRICS}/forecast": settings.CACHE_CONTROL_AGGREGATES,
+    f"{settings.API_V1_PREFIX}/companies/me/overview": settings.CACHE_CONTROL_METRICS,
+}
+
+
+def cache_control(method: str, route: str, status_code: int) -> str:
+    if method not in ("GET", "HEAD") or status_code >= 400:
+        return NO_STORE
+    return CACHE_POLICIES.get(route, settings.CACHE_CONTROL_DEFAULT)
+
+
+class CacheControlMiddleware:
+    """ASGI middleware: Cache-Control по политике маршрута (только API_V1_PREFIX)"""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not scope["path"].startswith(settings.API_V1_PREFIX):
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_policy(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(raw=message["headers"])
+                if "cache-control" not in headers:
+                    headers["Cache-Control"] = cache_control(
+                        scope["method"], route_template(scope), message["status"]
+                    )
+            await send(message)
+
+        await self.app(scope, receive, send_with_policy)
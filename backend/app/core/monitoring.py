@@ -0,0 +1,275 @@
+"""
+Monitoring
+
+Метрики в текстовом формате Prometheus (GET /metrics):
+
+- finreport_http_request_duration_seconds - гистограмма латентности
+  по шаблону маршрута и статусу ответа
+- finreport_db_pool_* - состояние пула async движка и время ожидания
+  соединения
+- finreport_db_queries_total, finreport_db_query_seconds_total - SQL
+  запросы по маршрутам (app.core.query_stats)
+- finreport_celery_queue_length - задачи в очереди брокера
+- finreport_cache_requests_total, finreport_cache_hit_ratio - Redis кеш
+  ответов и in-process кеши аутентификации
+- finreport_rate_limit_* - решения rate limiter (app.core.rate_limit)
+
+Счетчики хранятся в памяти процесса: при нескольких uvicorn workers
+каждый отдает свои значения (Prometheus суммирует по instance).
+"""
+
+import logging
+from time import perf_counter
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import redis.asyncio as aioredis
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.cache import cache_stats
+from app.core.celery_app import celery_app
+from app.core.config import settings
+from app.core.query_stats import query_stats, route_template
+from app.core.rate_limit import rate_limiter
+
+logger = logging.getLogger(__name__)
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+POOL_WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[Any]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    """Гистограмма Prometheus (кумулятивные корзины, _sum, _count)"""
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        label_names: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> None:
+        self.name = name
+        self.description = description
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets)
+        # значения меток -> [счетчики корзин..., sum, count]
+        self._series: Dict[Tuple[Any, ...], List[float]] = {}
+
+    def observe(self, value: float, *label_values: Any) -> None:
+        series = self._series.get(label_values)
+        if series is None:
+            series = self._series[label_values] = [0] * len(self.buckets) + [0.0, 0]
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[i] += 1
+        series[-2] += value
+        series[-1] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} histogram"]
+        bucket_names = self.label_names + ("le",)
+        for label_values, series in sorted(self._series.items()):
+            for bound, count in zip(self.buckets, series):
+                labels = _labels(bucket_names, label_values + (_number(bound),))
+                lines.append(f"{self.name}_bucket{labels} {count}")
+            labels = _labels(bucket_names, label_values + ("+Inf",))
+            lines.append(f"{self.name}_bucket{labels} {series[-1]}")
+            labels = _labels(self.label_names, label_values)
+            lines.append(f"{self.name}_sum{labels} {_number(series[-2])}")
+            lines.append(f"{self.name}_count{labels} {series[-1]}")
+        return lines
+
+
+def _metric(
+    name: str,
+    kind: str,
+    description: str,
+    samples: Iterable[Tuple[Sequence[Any], float]],
+    label_names: Sequence[str] = (),
+) -> List[str]:
+    """Gauge/counter: samples - пары (значения меток, значение)"""
+    lines = [f"# HELP {name} {description}", f"# TYPE {name} {kind}"]
+    for label_values, value in samples:
+        lines.append(f"{name}{_labels(label_names, label_values)} {_number(value)}")
+    return lines
+
+
+request_latency = Histogram(
+    "finreport_http_request_duration_seconds",
+    "HTTP request latency by route template and status code",
+    ("method", "route", "status"),
+)
+
+pool_wait = Histogram(
+    "finreport_db_pool_wait_seconds",
+    "Time to obtain a connection from the async engine pool",
+    buckets=POOL_WAIT_BUCKETS,
+)
+
+
+class TimedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """Пул async движка, измеряющий ожидание соединения (включая connect)"""
+
+    def _do_get(self):
+        start = perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            pool_wait.observe(perf_counter() - start)
+
+
+class MonitoringMiddleware:
+    """ASGI middleware: латентность запросов по маршруту и статусу"""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = perf_counter()
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            request_latency.observe(
+                perf_counter() - start, scope["method"], route_template(scope), str(status_code)
+            )
+
+
+_broker: Optional[aioredis.Redis] = None
+
+
+def _get_broker() -> aioredis.Redis:
+    global _broker
+    if _broker is None:
+        _broker = aioredis.from_url(
+            settings.CELERY_BROKER_URL or settings.REDIS_URL,
+            socket_timeout=settings.CACHE_SOCKET_TIMEOUT,
+            socket_connect_timeout=settings.CACHE_SOCKET_TIMEOUT,
+        )
+    return _broker
+
+
+async def _celery_queue_lengths() -> List[Tuple[Tuple[str], int]]:
+    """Длина очередей Celery (списки Redis брокера); при ошибке - пусто"""
+    queues = [celery_app.conf.task_default_queue]
+    try:
+        broker = _get_broker()
+        return [((queue,), await broker.llen(queue)) for queue in queues]
+    except Exception as e:
+        logger.warning("Celery queue length unavailable: %s", e)
+        return []
+
+
+def _pool_metrics() -> List[str]:
+    # database импортирует этот модуль (TimedAsyncQueuePool)
+    from app.core.database import POOL_MAX_OVERFLOW, async_engine
+
+    pool = async_engine.pool
+    lines: List[str] = []
+    for name, description, value in (
+        ("size", "Configured pool size", pool.size()),
+        ("checked_out", "Connections currently in use", pool.checkedout()),
+        ("checked_in", "Idle connections in the pool", pool.checkedin()),
+        ("overflow", "Connections opened above pool size", max(pool.overflow(), 0)),
+        ("max_overflow", "Allowed overflow connections", POOL_MAX_OVERFLOW),
+    ):
+        lines += _metric(f"finreport_db_pool_{name}", "gauge", description, [((), value)])
+    return lines
+
+
+def _query_metrics() -> List[str]:
+    queries, seconds = [], []
+    for key, totals in sorted(query_stats.items()):
+        method, _, route = key.partition(" ")
+        queries.append(((method, route), totals["queries"]))
+        seconds.append(((method, route), totals["db_time"]))
+    return (
+        _metric("finreport_db_queries_total", "counter", "SQL statements executed by route",
+                queries, ("method", "route"))
+        + _metric("finreport_db_query_seconds_total", "counter", "Time spent in SQL by route",
+                  seconds, ("method", "route"))
+    )
+
+
+def _cache_metrics(auth_caches: Dict[str, Dict[str, Any]]) -> List[str]:
+    requests = [
+        (("redis", "hit"), cache_stats["hits"]),
+        (("redis", "miss"), cache_stats["misses"]),
+        (("redis", "error"), cache_stats["errors"]),
+    ]
+    ratios = []
+    redis_total = cache_stats["hits"] + cache_stats["misses"]
+    ratios.append((("redis",), cache_stats["hits"] / redis_total if redis_total else 0.0))
+    for name, stats in sorted(auth_caches.items()):
+        requests.append(((name, "hit"), stats["hits"]))
+        requests.append(((name, "miss"), stats["misses"]))
+        ratios.append(((name,), float(stats["hit_ratio"])))
+
+    return (
+        _metric("finreport_cache_requests_total", "counter", "Cache lookups by result",
+                requests, ("cache", "result"))
+        + _metric("finreport_cache_hit_ratio", "gauge", "Cache hit ratio since process start",
+                  ratios, ("cache",))
+    )
+
+
+def _rate_limit_metrics() -> List[str]:
+    stats = rate_limiter.stats()
+    return (
+        _metric("finreport_rate_limit_requests_total", "counter", "Rate limiter decisions",
+                [(("allowed",), stats["allowed"]), (("rejected",), stats["rejected"])], ("result",))
+        + _metric("finreport_rate_limit_blocked_keys", "gauge",
+                  "Users/IPs over the limit across instances", [((), stats["blocked"])])
+        + _metric("finreport_rate_limit_sync_errors_total", "counter",
+                  "Failed Redis synchronizations", [((), stats["sync_errors"])])
+    )
+
+
+async def render_metrics(auth_caches: Dict[str, Dict[str, Any]]) -> str:
+    """
+    Все метрики в текстовом формате Prometheus
+
+    Args:
+        auth_caches: Статистика in-process кешей (app.api.deps.auth_cache_stats)
+    """
+    lines = request_latency.render()
+    lines += _pool_metrics()
+    lines += pool_wait.render()
+    lines += _query_metrics()
+    lines += _metric(
+        "finreport_celery_queue_length", "gauge", "Tasks waiting in the Celery broker queue",
+        await _celery_queue_lengths(), ("queue",),
+    )
+    lines += _cache_metrics(auth_caches)
+    lines += _rate_limit_metrics()
+    return "\n".join(lines) + "\n"
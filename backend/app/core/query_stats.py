@@ -0,0 +1,152 @@
+"""
+SQL query statistics
+
+Счетчики SQL запросов на HTTP запрос (event listeners движков, см.
+app.core.database): количество, время в БД и одинаковые запросы,
+повторенные QUERY_REPEAT_THRESHOLD и более раз - кандидаты на N+1
+(lazy load relationship в цикле).
+
+- Ответ получает заголовки X-DB-Queries и Server-Timing
+- Агрегаты по маршрутам - query_stats (GET /api/metrics/queries в DEBUG, /metrics)
+- Подозрения на N+1 пишутся в лог с текстом запроса
+
+Запросы вне HTTP запроса (Celery, Alembic) не учитываются.
+"""
+
+import logging
+from collections import Counter
+from contextvars import ContextVar
+from time import perf_counter
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class RequestQueryStats:
+    """Запросы одного HTTP запроса"""
+    __slots__ = ("count", "duration", "statements")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.duration = 0.0
+        self.statements: Counter = Counter()
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """Одинаковые запросы, выполненные threshold и более раз"""
+        return [(sql, n) for sql, n in self.statements.most_common() if n >= threshold]
+
+
+_current: ContextVar[Optional[RequestQueryStats]] = ContextVar("query_stats", default=None)
+
+# Агрегаты по маршрутам: "GET /api/v1/companies/{company_id}" -> счетчики
+query_stats: Dict[str, Dict[str, float]] = {}
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    if _current.get() is not None:
+        conn.info["query_start"] = perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    stats = _current.get()
+    if stats is None:
+        return
+    stats.count += 1
+    stats.duration += perf_counter() - conn.info.pop("query_start", perf_counter())
+    stats.statements[statement] += 1
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Подключить подсчет запросов к движку (для async - к engine.sync_engine)"""
+    if not settings.QUERY_STATS_ENABLED:
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def route_template(scope: Scope) -> str:
+    """
+    Шаблон маршрута ("/api/v1/companies/{company_id}") вместо пути:
+    метки и ключи не размножаются по id. Ненайденные пути - "unmatched".
+    """
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+def _record(route: str, stats: RequestQueryStats) -> None:
+    totals = query_stats.get(route)
+    if totals is None:
+        totals = query_stats[route] = {
+            "requests": 0,
+            "queries": 0,
+            "db_time": 0.0,
+            "max_queries": 0,
+            "n_plus_one": 0,
+        }
+    totals["requests"] += 1
+    totals["queries"] += stats.count
+    totals["db_time"] += stats.duration
+    totals["max_queries"] = max(totals["max_queries"], stats.count)
+
+    repeated = stats.repeated(settings.QUERY_REPEAT_THRESHOLD)
+    if repeated:
+        totals["n_plus_one"] += 1
+        for sql, n in repeated:
+            logger.warning("Possible N+1 in %s: %d x %s", route, n, " ".join(sql.split())[:300])
+
+
+def query_stats_snapshot() -> Dict[str, Dict[str, Any]]:
+    """Агрегаты по маршрутам со средними значениями (для /api/metrics/queries)"""
+    snapshot = {}
+    for route, totals in sorted(query_stats.items()):
+        requests = totals["requests"] or 1
+        snapshot[route] = {
+            **totals,
+            "avg_queries": round(totals["queries"] / requests, 2),
+            "avg_db_time_ms": round(totals["db_time"] * 1000 / requests, 3),
+        }
+    return snapshot
+
+
+class QueryStatsMiddleware:
+    """
+    ASGI middleware: счетчик запросов на время HTTP запроса
+
+    Чистый ASGI (не BaseHTTPMiddleware): не создает отдельную задачу
+    и не буферизует ответ. Заголовки добавляются в http.response.start -
+    к этому моменту запросы обработчика уже выполнены.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestQueryStats()
+        token = _current.set(stats)
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"x-db-queries", str(stats.count).encode()))
+                headers.append((
+                    b"server-timing",
+                    f'db;desc="{stats.count} queries";dur={stats.duration * 1000:.2f}'.encode(),
+                ))
+                message["headers"] = headers
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_headers)
+        finally:
+            _current.reset(token)
+            _record(f"{scope['method']} {route_template(scope)}", stats)
@@ -0,0 +1,239 @@
+"""
+Rate limiting
+
+NFR-2.4: не больше RATE_LIMIT_PER_MINUTE запросов в минуту на пользователя
+
+Быстрый путь - token bucket в памяти процесса (словарь и несколько
+арифметических операций, без I/O). Раз в RATE_LIMIT_SYNC_INTERVAL
+накопленные запросы отправляются в Redis одним pipeline: Lua скрипт
+считает скользящее окно (sliding window counter) по всем инстансам,
+и ключи, превысившие лимит глобально, блокируются локально до
+следующей синхронизации. Недоступность Redis не ломает запросы -
+остается только локальный лимит.
+
+Ключ - пользователь из JWT (verify_token с кешем token_cache, без БД),
+для анонимных запросов - IP клиента. Отклонение происходит в
+middleware, до зависимостей FastAPI (get_current_user, сессия БД).
+"""
+
+import asyncio
+import logging
+import math
+import time
+from typing import Any, Dict, List, Optional, Set
+
+import redis
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.cache import get_redis
+from app.core.config import settings
+from app.core.security import verify_token
+
+logger = logging.getLogger(__name__)
+
+# KEYS: счетчик текущего окна, счетчик предыдущего окна
+# ARGV: прирост, TTL счетчика (сек), вес предыдущего окна (0..1)
+# Возвращает оценку числа запросов за последние window секунд
+SLIDING_WINDOW_SCRIPT = """
+local count = redis.call('INCRBY', KEYS[1], ARGV[1])
+if count == tonumber(ARGV[1]) then
+    redis.call('EXPIRE', KEYS[1], ARGV[2])
+end
+local previous = tonumber(redis.call('GET', KEYS[2]) or '0')
+return count + math.floor(previous * tonumber(ARGV[3]))
+"""
+
+# Индексы полей bucket (список, а не объект - быстрее на горячем пути)
+_TOKENS, _UPDATED_AT, _PENDING, _BLOCKED = range(4)
+
+
+class RateLimiter:
+    """
+    Token bucket на ключ (емкость limit, пополнение limit / window в секунду)
+    с периодической сверкой счетчиков через Redis
+
+    Работает в одном event loop, блокировки не нужны.
+    """
+
+    def __init__(
+        self,
+        limit: int,
+        window: float = 60.0,
+        sync_interval: float = 1.0,
+        max_keys: int = 100000,
+    ):
+        self.limit = limit
+        self.window = window
+        self.rate = limit / window
+        self.sync_interval = sync_interval
+        self.max_keys = max_keys
+        self.allowed = 0
+        self.rejected = 0
+        self.sync_errors = 0
+        self._buckets: Dict[str, List[Any]] = {}
+        self._last_sync = time.monotonic()
+        self._sync_task: Optional[asyncio.Task] = None
+
+    def hit(self, key: str) -> float:
+        """
+        Учесть запрос
+
+        Returns:
+            0 - запрос разрешен, иначе секунд до повтора (Retry-After)
+        """
+        now = time.monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            if len(self._buckets) >= self.max_keys:
+                self._prune(now)
+            bucket = self._buckets[key] = [float(self.limit), now, 0, False]
+        else:
+            bucket[_TOKENS] = min(self.limit, bucket[_TOKENS] + (now - bucket[_UPDATED_AT]) * self.rate)
+            bucket[_UPDATED_AT] = now
+
+        if bucket[_BLOCKED] or bucket[_TOKENS] < 1:
+            self.rejected += 1
+            return max((1 - bucket[_TOKENS]) / self.rate, 1 / self.rate)
+
+        bucket[_TOKENS] -= 1
+        bucket[_PENDING] += 1
+        self.allowed += 1
+        return 0.0
+
+    def _prune(self, now: float) -> None:
+        """Удалить полные и давно не использованные buckets"""
+        idle = [
+            key for key, bucket in self._buckets.items()
+            if now - bucket[_UPDATED_AT] > self.window and not bucket[_PENDING] and not bucket[_BLOCKED]
+        ]
+        for key in idle:
+            del self._buckets[key]
+
+    def maybe_sync(self) -> None:
+        """Запустить сверку с Redis в фоне, если подошло время"""
+        now = time.monotonic()
+        if self.sync_interval <= 0 or now - self._last_sync < self.sync_interval:
+            return
+        if self._sync_task is not None and not self._sync_task.done():
+            return
+        self._last_sync = now
+        self._sync_task = asyncio.create_task(self.sync())
+
+    async def sync(self) -> None:
+        """
+        Отправить накопленные запросы в Redis и обновить блокировки
+
+        Сверяются ключи с новыми запросами и уже заблокированные (чтобы
+        снять блокировку, когда окно освободится).
+        """
+        keys = [
+            key for key, bucket in self._buckets.items()
+            if bucket[_PENDING] or bucket[_BLOCKED]
+        ]
+        if not keys:
+            self._prune(time.monotonic())
+            return
+
+        pending = {key: self._buckets[key][_PENDING] for key in keys}
+        for key in keys:
+            self._buckets[key][_PENDING] = 0
+
+        now = time.time()
+        current = int(now // self.window)
+        previous_weight = 1 - (now % self.window) / self.window
+        ttl = int(self.window * 2)
+        try:
+            async with get_redis().pipeline(transaction=False) as pipe:
+                for key in keys:
+                    # EVAL, а не EVALSHA: скрипт короткий, а NOSCRIPT
+                    # после рестарта Redis не нужно обрабатывать
+                    pipe.eval(
+                        SLIDING_WINDOW_SCRIPT,
+                        2,
+                        f"ratelimit:{key}:{current}",
+                        f"ratelimit:{key}:{current - 1}",
+                        pending[key],
+                        ttl,
+                        f"{previous_weight:.4f}",
+                    )
+                counts = await pipe.execute()
+        except (redis.RedisError, OSError) as e:
+            self.sync_errors += 1
+            logger.warning("Rate limit sync failed: %s", e)
+            for key, count in pending.items():
+                if key in self._buckets:
+                    self._buckets[key][_PENDING] += count
+            return
+
+        blocked: Set[str] = {key for key, count in zip(keys, counts) if int(count) >= self.limit}
+        for key in keys:
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket[_BLOCKED] = key in blocked
+        self._prune(time.monotonic())
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "keys": len(self._buckets),
+            "blocked": sum(1 for bucket in self._buckets.values() if bucket[_BLOCKED]),
+            "allowed": self.allowed,
+            "rejected": self.rejected,
+            "sync_errors": self.sync_errors,
+        }
+
+
+rate_limiter = RateLimiter(
+    limit=settings.RATE_LIMIT_PER_MINUTE,
+    sync_interval=settings.RATE_LIMIT_SYNC_INTERVAL,
+)
+
+
+def client_key(scope: Scope) -> str:
+    """
+    user:{id} для запросов с валидным JWT, иначе ip:{адрес}
+
+    Адрес клиента - scope["client"]; за reverse proxy uvicorn заполняет
+    его из X-Forwarded-For (--proxy-headers).
+    """
+    for name, value in scope["headers"]:
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            if scheme.lower() == "bearer" and token:
+                payload = verify_token(token)
+                if payload is not None and payload.get("sub"):
+                    return f"user:{payload['sub']}"
+            break
+    client = scope.get("client")
+    return f"ip:{client[0] if client else 'unknown'}"
+
+
+class RateLimitMiddleware:
+    """
+    ASGI middleware: 429 Too Many Requests до обработчика и зависимостей
+
+    Ограничиваются только маршруты API (API_V1_PREFIX): health checks
+    и /metrics не должны отказывать балансировщику и Prometheus.
+    """
+
+    def __init__(self, app: ASGIApp, limiter: RateLimiter = rate_limiter) -> None:
+        self.app = app
+        self.limiter = limiter
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not scope["path"].startswith(settings.API_V1_PREFIX):
+            await self.app(scope, receive, send)
+            return
+
+        retry_after = self.limiter.hit(client_key(scope))
+        self.limiter.maybe_sync()
+        if retry_after:
+            response = JSONResponse(
+                status_code=429,
+                content={"detail": "Too many requests"},
+                headers={"Retry-After": str(math.ceil(retry_after))},
+            )
+            await response(scope, receive, send)
+            return
+
+        await self.app(scope, receive, send)
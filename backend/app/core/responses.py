@@ -0,0 +1,92 @@
+"""
+Fast JSON responses
+
+FastJSONResponse сериализует ответ через orjson (если установлен) или
+pydantic-core вместо стандартного json.dumps, а уже готовые bytes
+(app.schemas.serialization, кеш Redis) отдает без повторной сериализации.
+
+Conditional GET: маршрут считает ETag по версиям данных (version,
+updated_at) дешевым запросом и при совпадении с If-None-Match отвечает
+304 без выборки и сериализации ответа. Cache-Control выставляет
+app.core.http_cache по маршруту.
+"""
+
+import hashlib
+from typing import Any, Optional
+
+from fastapi import Request, Response, status
+from fastapi.responses import JSONResponse
+from pydantic_core import to_json
+
+from app.core.config import settings
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson опционален
+    orjson = None
+
+_ORJSON_OPTIONS = (
+    orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY if orjson is not None else 0
+)
+
+
+def dumps(content: Any) -> bytes:
+    """Сериализация произвольного JSON-совместимого значения в bytes"""
+    if orjson is not None:
+        try:
+            return orjson.dumps(content, option=_ORJSON_OPTIONS)
+        except TypeError:
+            # Типы, которые orjson не знает (Decimal, pydantic модели)
+            pass
+    return to_json(content)
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON ответ без стандартного json энкодера
+
+    content может быть готовым JSON (bytes) - тогда он отдается как есть.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, (bytes, bytearray, memoryview)):
+            return bytes(content)
+        return dumps(content)
+
+
+def json_response(
+    payload: bytes,
+    status_code: int = 200,
+    headers: Optional[dict] = None,
+    etag: Optional[str] = None,
+) -> FastJSONResponse:
+    """Ответ из уже сериализованного JSON"""
+    if etag is not None:
+        headers = {**(headers or {}), "ETag": etag}
+    return FastJSONResponse(content=payload, status_code=status_code, headers=headers)
+
+
+def make_etag(*parts: Any) -> str:
+    """
+    Strong ETag из версий данных ответа
+
+    В ETag входит версия приложения: после деплоя с другим форматом
+    ответа старые ETag клиентов не совпадут.
+    """
+    source = "|".join([settings.APP_VERSION, *(str(part) for part in parts)])
+    return '"%s"' % hashlib.blake2b(source.encode(), digest_size=16).hexdigest()
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """If-None-Match содержит etag (слабое сравнение, RFC 9110 13.1.2)"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return etag in {tag.strip().removeprefix("W/") for tag in header.split(",")}
+
+
+def not_modified(etag: str) -> Response:
+    """304 Not Modified без тела"""
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
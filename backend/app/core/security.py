@@ -2,16 +2,25 @@
 Security utilities: JWT, password hashing, etc.
 """
 
+import time
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 
 from app.core.config import settings
+from app.core.local_cache import TTLCache
 
 # Password hashing context
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# Кеш декодированных токенов: token -> payload
+# Запись живет не дольше TOKEN_CACHE_TTL и не дольше срока действия токена
+token_cache: TTLCache[Dict[str, Any]] = TTLCache(
+    max_size=settings.TOKEN_CACHE_SIZE,
+    ttl=settings.TOKEN_CACHE_TTL,
+)
+
 
 def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
     """
@@ -47,11 +56,20 @@ def verify_token(token: str) -> Optional[Dict[str, Any]]:
     Returns:
         Payload из токена или None если токен невалиден
     """
+    payload = token_cache.get(token)
+    if payload is not None:
+        return payload
+    
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        return payload
     except JWTError:
         return None
+    
+    exp = payload.get("exp")
+    expires_in = exp - time.time() if exp is not None else None
+    if expires_in is None or expires_in > 0:
+        token_cache.set(token, payload, ttl=expires_in)
+    return payload
 
 
 def get_password_hash(password: str) -> str:
@@ -6,9 +6,16 @@ FastAPI entry point with CORS, middleware, and API routing.
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 
+from app.core.compression import CompressionMiddleware
 from app.core.config import settings
+from app.core.health import readiness
+from app.core.http_cache import CacheControlMiddleware
+from app.core.monitoring import MonitoringMiddleware, PROMETHEUS_CONTENT_TYPE, render_metrics
+from app.core.query_stats import QueryStatsMiddleware, query_stats_snapshot
+from app.core.rate_limit import RateLimitMiddleware
+from app.api.deps import auth_cache_stats
 from app.api.v1 import router as api_v1_router
 
 app = FastAPI(
@@ -20,6 +27,14 @@ app = FastAPI(
     debug=settings.DEBUG
 )
 
+# Rate limiting до зависимостей (auth, БД); добавлен раньше CORS, т.е.
+# внутри него - ответы 429 тоже получают CORS заголовки
+if settings.RATE_LIMIT_ENABLED:
+    app.add_middleware(RateLimitMiddleware)
+
+# Cache-Control по маршруту (scope["route"] известен к началу ответа)
+app.add_middleware(CacheControlMiddleware)
+
 # CORS Configuration
 app.add_middleware(
     CORSMiddleware,
@@ -27,8 +42,20 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor", "X-DB-Queries", "Server-Timing"],
 )
 
+# Сжатие ответов (zstd / br / gzip)
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware)
+
+# Счетчики SQL запросов (заголовки X-DB-Queries, Server-Timing)
+if settings.QUERY_STATS_ENABLED:
+    app.add_middleware(QueryStatsMiddleware)
+
+# Латентность запросов по маршрутам (GET /metrics)
+app.add_middleware(MonitoringMiddleware)
+
 
 @app.get("/")
 async def root():
@@ -42,18 +69,49 @@ async def root():
 
 
 @app.get("/api/health")
-async def health_check():
+@app.get("/api/health/ready")
+async def readiness_check():
     """
-    Health check для Railway и monitoring систем
+    Readiness: БД (SELECT 1), Redis (PING) и загрузка пула соединений
+
+    503 - инстанс не должен получать трафик (см. app.core.health)
     """
-    # TODO: Add actual DB and Redis health checks
-    return {
-        "status": "ok",
-        "service": settings.APP_NAME,
-        "version": settings.APP_VERSION,
-        "database": "connected",
-        "redis": "connected"
-    }
+    ready, report = await readiness()
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content=report,
+        headers={"Cache-Control": "no-store"},
+    )
+
+
+@app.get("/api/health/live")
+async def liveness_check():
+    """Liveness: процесс отвечает (без обращения к БД и Redis)"""
+    return {"status": "ok"}
+
+
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    """
+    Метрики для Prometheus: латентность по маршрутам, пул соединений,
+    SQL запросы, очередь Celery, попадания в кеши (см. app.core.monitoring)
+    """
+    return PlainTextResponse(
+        await render_metrics(auth_caches=auth_cache_stats()),
+        media_type=PROMETHEUS_CONTENT_TYPE,
+    )
+
+
+# Статистика SQL раскрывает устройство запросов - только в DEBUG
+# (в production ее агрегаты доступны через /metrics)
+if settings.DEBUG:
+    @app.get("/api/metrics/queries", include_in_schema=False)
+    async def query_metrics():
+        """
+        SQL запросы по маршрутам: количество, время в БД,
+        запросы с подозрением на N+1 (см. app.core.query_stats)
+        """
+        return query_stats_snapshot()
 
 
 # Include API v1 router
@@ -4,6 +4,20 @@ from app.models.user import User
 from app.models.company import Company
 from app.models.financial_data import FinancialData
 from app.models.calculated_metrics import CalculatedMetrics
+from app.models.revenue_forecast import RevenueForecast
+from app.models.period_comparison import PeriodComparison
+from app.models.metric_benchmark import MetricBenchmark, BenchmarkMember
+from app.models.snapshot_tombstone import SnapshotTombstone
 
-__all__ = ["User", "Company", "FinancialData", "CalculatedMetrics"]
+__all__ = [
+    "User",
+    "Company",
+    "FinancialData",
+    "CalculatedMetrics",
+    "RevenueForecast",
+    "PeriodComparison",
+    "MetricBenchmark",
+    "BenchmarkMember",
+    "SnapshotTombstone",
+]
 
@@ -5,7 +5,7 @@ FR-3.1: Калькулятор метрик
 Хранит рассчитанные финансовые показатели (11 метрик)
 """
 
-from sqlalchemy import Column, DateTime, Float, ForeignKey
+from sqlalchemy import Column, String, DateTime, Float, ForeignKey, Integer, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -32,6 +32,10 @@ class CalculatedMetrics(Base):
     + Коэффициент оборотного капитала
     """
     __tablename__ = "calculated_metrics"
+    __table_args__ = (
+        # Временные ряды метрик компании за диапазон дат (графики дашборда)
+        Index("ix_calculated_metrics_company_period", "company_id", "period_start"),
+    )
     
     # Primary Key
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
@@ -40,6 +44,10 @@ class CalculatedMetrics(Base):
     company_id = Column(UUID(as_uuid=True), ForeignKey("companies.id"), nullable=False, index=True)
     financial_data_id = Column(UUID(as_uuid=True), ForeignKey("financial_data.id"), nullable=False, unique=True)
     
+    # Начало периода (копия financial_data.period_start) - чтобы выборка
+    # временного ряда шла по индексу calculated_metrics без join
+    period_start = Column(DateTime, nullable=False, comment="Начало периода")
+    
     # ============ Метрики ============
     
     # 1. Выручка и прогноз
@@ -89,6 +97,10 @@ class CalculatedMetrics(Base):
     roe_status = Column(String(10), nullable=True)
     liquidity_status = Column(String(10), nullable=True)
     
+    # Версия FinancialData, по которой рассчитаны метрики
+    # (метрики устарели, если не совпадает с financial_data.version)
+    source_version = Column(Integer, nullable=True, comment="Версия исходных данных")
+    
     # Timestamps
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
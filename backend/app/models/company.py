@@ -4,7 +4,7 @@ Company model
 FR-1.2: Профиль компании
 """
 
-from sqlalchemy import Column, String, DateTime, Enum, ForeignKey
+from sqlalchemy import Column, String, DateTime, Enum, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -38,6 +38,10 @@ class Company(Base):
     Связана с пользователем 1:Many (у пользователя может быть несколько компаний)
     """
     __tablename__ = "companies"
+    __table_args__ = (
+        # Список компаний пользователя: keyset пагинация по (created_at, id)
+        Index("ix_companies_owner_created", "owner_id", "created_at", "id"),
+    )
     
     # Primary Key
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
@@ -65,6 +69,8 @@ class Company(Base):
     owner = relationship("User", back_populates="companies")
     financial_data = relationship("FinancialData", back_populates="company", cascade="all, delete-orphan")
     calculated_metrics = relationship("CalculatedMetrics", back_populates="company", cascade="all, delete-orphan")
+    revenue_forecast = relationship("RevenueForecast", back_populates="company", uselist=False, cascade="all, delete-orphan")
+    period_comparisons = relationship("PeriodComparison", back_populates="company", cascade="all, delete-orphan")
     
     def __repr__(self) -> str:
         return f"<Company(id={self.id}, name={self.name}, inn={self.inn})>"
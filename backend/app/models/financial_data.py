@@ -5,7 +5,7 @@ FR-2.1: Загрузка Excel/CSV файлов
 Хранит исходные финансовые данные из загруженных файлов
 """
 
-from sqlalchemy import Column, String, DateTime, Float, ForeignKey, Integer, Text
+from sqlalchemy import Column, String, DateTime, Float, ForeignKey, Integer, Text, UniqueConstraint
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -23,6 +23,12 @@ class FinancialData(Base):
     - Balance Sheet (Баланс)
     """
     __tablename__ = "financial_data"
+    __table_args__ = (
+        # Один период компании - одна строка (повторная загрузка = update + version).
+        # Это же составной индекс (company_id, period_start) для выборок по датам
+        # и keyset пагинации по (period_start, id): period_start уникален в компании
+        UniqueConstraint("company_id", "period_start", name="uq_financial_data_company_period"),
+    )
     
     # Primary Key
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
@@ -0,0 +1,75 @@
+"""
+Metric Benchmark models
+
+FR-3.1: Бенчмарки по отраслям
+Распределения метрик по отрасли и размеру компании (квантильные скетчи)
+"""
+
+from sqlalchemy import Column, DateTime, Enum, Integer, JSON, String, UniqueConstraint
+from sqlalchemy.dialects.postgresql import UUID
+from datetime import datetime
+import uuid
+
+from app.core.database import Base
+from app.models.company import IndustryEnum, CompanySizeEnum
+
+
+class MetricBenchmark(Base):
+    """
+    Квантильный скетч одной метрики в сегменте (отрасль + размер)
+
+    Логарифмическая гистограмма (DDSketch): значение попадает в корзину
+    с относительной точностью 1%, скетчи сегментов складываются
+    (отрасль целиком = сумма размеров), значения можно вычитать.
+    См. app.services.benchmark_service.QuantileSketch.
+    """
+    __tablename__ = "metric_benchmarks"
+    __table_args__ = (
+        UniqueConstraint("industry", "size", "metric", name="uq_metric_benchmarks_segment"),
+    )
+
+    # Primary Key
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
+
+    # Сегмент
+    industry = Column(Enum(IndustryEnum), nullable=False)
+    size = Column(Enum(CompanySizeEnum), nullable=False)
+    metric = Column(String(50), nullable=False, comment="Колонка calculated_metrics")
+
+    # Скетч: количество значений и корзины {индекс: количество}
+    count = Column(Integer, nullable=False, default=0)
+    zero_count = Column(Integer, nullable=False, default=0)
+    positive = Column(JSON, nullable=False, default=dict)
+    negative = Column(JSON, nullable=False, default=dict)
+
+    # Timestamps
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<MetricBenchmark({self.industry}/{self.size}, metric={self.metric}, count={self.count})>"
+
+
+class BenchmarkMember(Base):
+    """
+    Вклад компании в скетчи: метрики последнего периода и сегмент,
+    в который они добавлены (нужны, чтобы вычесть их при обновлении)
+
+    Без FK на companies: строка удаленной компании остается до задачи
+    benchmarks.refresh, которая вычитает ее вклад из скетчей.
+    """
+    __tablename__ = "benchmark_members"
+
+    # Primary Key
+    company_id = Column(UUID(as_uuid=True), primary_key=True)
+
+    financial_data_id = Column(UUID(as_uuid=True), nullable=False)
+    industry = Column(Enum(IndustryEnum), nullable=False)
+    size = Column(Enum(CompanySizeEnum), nullable=False)
+    # {metric: value} - значения, добавленные в скетчи
+    values = Column(JSON, nullable=False)
+
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<BenchmarkMember(company_id={self.company_id}, {self.industry}/{self.size})>"
@@ -0,0 +1,85 @@
+"""
+Period Comparison model
+
+FR-4.1: Дашборд - изменение метрик к прошлому периоду
+Предрассчитанные изменения 13 метрик: к предыдущему периоду (MoM)
+и к тому же месяцу прошлого года (YoY)
+"""
+
+from sqlalchemy import Column, DateTime, Float, ForeignKey, Integer, Index
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import relationship
+from datetime import datetime
+import uuid
+
+from app.core.database import Base
+
+
+class PeriodComparison(Base):
+    """
+    Изменения метрик периода (материализованное сравнение)
+
+    Процентные метрики (маржа, ROS, ROA, ROE) - разница в процентных
+    пунктах, остальные - относительное изменение в %
+    (см. app.services.metrics_calculator.metric_change).
+    Поддерживается app.services.comparison_service при пересчете метрик.
+    """
+    __tablename__ = "period_comparisons"
+    __table_args__ = (
+        Index("ix_period_comparisons_company_period", "company_id", "period_start"),
+    )
+
+    # Primary Key
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
+
+    # Foreign Keys
+    company_id = Column(UUID(as_uuid=True), ForeignKey("companies.id"), nullable=False)
+    financial_data_id = Column(UUID(as_uuid=True), ForeignKey("financial_data.id"), nullable=False, unique=True)
+
+    # Сравниваемые периоды
+    period_start = Column(DateTime, nullable=False, comment="Начало периода")
+    previous_period_start = Column(DateTime, nullable=True, comment="Предыдущий период (MoM)")
+    year_ago_period_start = Column(DateTime, nullable=True, comment="Период год назад (YoY)")
+
+    # ============ К предыдущему периоду (MoM) ============
+    mom_revenue = Column(Float, nullable=True)
+    mom_gross_margin = Column(Float, nullable=True)
+    mom_ros = Column(Float, nullable=True)
+    mom_total_assets = Column(Float, nullable=True)
+    mom_roa = Column(Float, nullable=True)
+    mom_roe = Column(Float, nullable=True)
+    mom_current_ratio = Column(Float, nullable=True)
+    mom_quick_ratio = Column(Float, nullable=True)
+    mom_cash_ratio = Column(Float, nullable=True)
+    mom_autonomy_ratio = Column(Float, nullable=True)
+    mom_asset_turnover = Column(Float, nullable=True)
+    mom_net_working_capital = Column(Float, nullable=True)
+    mom_working_capital_ratio = Column(Float, nullable=True)
+
+    # ============ К тому же периоду год назад (YoY) ============
+    yoy_revenue = Column(Float, nullable=True)
+    yoy_gross_margin = Column(Float, nullable=True)
+    yoy_ros = Column(Float, nullable=True)
+    yoy_total_assets = Column(Float, nullable=True)
+    yoy_roa = Column(Float, nullable=True)
+    yoy_roe = Column(Float, nullable=True)
+    yoy_current_ratio = Column(Float, nullable=True)
+    yoy_quick_ratio = Column(Float, nullable=True)
+    yoy_cash_ratio = Column(Float, nullable=True)
+    yoy_autonomy_ratio = Column(Float, nullable=True)
+    yoy_asset_turnover = Column(Float, nullable=True)
+    yoy_net_working_capital = Column(Float, nullable=True)
+    yoy_working_capital_ratio = Column(Float, nullable=True)
+
+    # Версия FinancialData, по метрикам которой рассчитано сравнение
+    source_version = Column(Integer, nullable=True, comment="Версия исходных данных")
+
+    # Timestamps
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    # Relationships
+    company = relationship("Company", back_populates="period_comparisons")
+
+    def __repr__(self) -> str:
+        return f"<PeriodComparison(financial_data_id={self.financial_data_id}, period_start={self.period_start})>"
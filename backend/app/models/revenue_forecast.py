@@ -0,0 +1,51 @@
+"""
+Revenue Forecast model
+
+FR-3.1: Выручка и прогноз выручки
+Прогноз выручки компании на следующие периоды (см. app.services.forecast_service)
+"""
+
+from sqlalchemy import Column, String, DateTime, Float, ForeignKey, Integer, JSON
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import relationship
+from datetime import datetime
+import uuid
+
+from app.core.database import Base
+
+
+class RevenueForecast(Base):
+    """
+    Прогноз выручки компании
+
+    Одна строка на компанию. Пересчитывается только когда меняются
+    исходные данные (data_fingerprint), до этого служит кешем прогноза.
+    """
+    __tablename__ = "revenue_forecasts"
+
+    # Primary Key
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
+
+    # Foreign Keys
+    company_id = Column(UUID(as_uuid=True), ForeignKey("companies.id"), nullable=False, unique=True)
+
+    # Выбранная модель: moving_average / holt_winters / linear_trend
+    model = Column(String(30), nullable=False)
+    mae = Column(Float, nullable=True, comment="Средняя абсолютная ошибка прогноза на один период вперед")
+    periods_used = Column(Integer, nullable=False, comment="Количество периодов истории")
+
+    # [{"period_start": "2024-11-01T00:00:00", "revenue": 1250000.0}, ...]
+    forecast = Column(JSON, nullable=False, comment="Прогноз на следующие периоды")
+
+    # Отпечаток исходных данных: количество периодов, сумма версий, последний период
+    data_fingerprint = Column(String(100), nullable=False)
+
+    # Timestamps
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    # Relationships
+    company = relationship("Company", back_populates="revenue_forecast")
+
+    def __repr__(self) -> str:
+        return f"<RevenueForecast(company_id={self.company_id}, model={self.model})>"
@@ -0,0 +1,36 @@
+"""
+Snapshot Tombstone model
+
+Удаления для Parquet снимков (app.services.snapshot_exporter): строки
+снимка только дописываются, поэтому удаление и перенос строк компании
+в другую партицию записываются отдельной отметкой
+"""
+
+from sqlalchemy import Column, DateTime, String
+from sqlalchemy.dialects.postgresql import UUID
+from datetime import datetime
+import uuid
+
+from app.core.database import Base
+
+
+class SnapshotTombstone(Base):
+    """
+    Строки компании в таблице снимка с updated_at <= deleted_at устарели
+
+    Пишется при удалении компании, полном пересчете ее метрик (delete +
+    insert с новыми id) и смене отрасли/размера (строки выгружаются
+    заново в партицию новой отрасли).
+    """
+    __tablename__ = "snapshot_tombstones"
+
+    # Primary Key
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+
+    table_name = Column(String(50), nullable=False, comment="Таблица снимка")
+    # Без ForeignKey: компания может быть уже удалена
+    company_id = Column(UUID(as_uuid=True), nullable=False)
+    deleted_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+
+    def __repr__(self) -> str:
+        return f"<SnapshotTombstone({self.table_name}, company_id={self.company_id}, deleted_at={self.deleted_at})>"
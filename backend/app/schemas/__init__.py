@@ -1,10 +1,15 @@
 """Pydantic schemas для валидации API requests/responses"""
 
 from app.schemas.user import UserBase, UserCreate, UserResponse
-from app.schemas.company import CompanyBase, CompanyCreate, CompanyUpdate, CompanyResponse
-from app.schemas.financial_data import PLData, BalanceData, FinancialDataCreate, FinancialDataResponse
-from app.schemas.metrics import CalculatedMetricsResponse
+from app.schemas.company import CompanyBase, CompanyCreate, CompanyUpdate, CompanyResponse, CompanyOverview
+from app.schemas.financial_data import PLData, BalanceData, FinancialDataCreate, FinancialDataResponse, BulkImportResult
+from app.schemas.metrics import CalculatedMetricsResponse, MetricsSummary, MetricsComparison, MetricsTimeseries
+from app.schemas.metrics import ForecastPoint, RevenueForecastResponse, MetricsChanges
+from app.schemas.metrics import MetricPercentile, CompanyBenchmarks
 from app.schemas.auth import Token, TokenData, TelegramAuthData
+from app.schemas.upload import UploadRowError, UploadResult
+from app.schemas.job import JobCreated, JobStatus
+from app.schemas.serialization import dump_json, dump_json_list
 
 __all__ = [
     "UserBase",
@@ -14,13 +19,29 @@ __all__ = [
     "CompanyCreate",
     "CompanyUpdate",
     "CompanyResponse",
+    "CompanyOverview",
     "PLData",
     "BalanceData",
     "FinancialDataCreate",
     "FinancialDataResponse",
+    "BulkImportResult",
     "CalculatedMetricsResponse",
+    "MetricsSummary",
+    "MetricsComparison",
+    "MetricsTimeseries",
+    "ForecastPoint",
+    "RevenueForecastResponse",
+    "MetricsChanges",
+    "MetricPercentile",
+    "CompanyBenchmarks",
     "Token",
     "TokenData",
     "TelegramAuthData",
+    "UploadRowError",
+    "UploadResult",
+    "JobCreated",
+    "JobStatus",
+    "dump_json",
+    "dump_json_list",
 ]
 
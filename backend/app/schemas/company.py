@@ -2,7 +2,7 @@
 
 from pydantic import BaseModel, Field, field_validator
 from datetime import datetime
-from typing import Optional
+from typing import Dict, Optional
 from uuid import UUID
 
 from app.models.company import IndustryEnum, CompanySizeEnum
@@ -80,3 +80,22 @@ class CompanyResponse(CompanyBase):
     class Config:
         from_attributes = True
 
+
+
+class CompanyOverview(BaseModel):
+    """
+    Строка портфельного дашборда: компания и метрики ее последнего периода
+
+    Поля периода пустые, если у компании еще нет данных.
+    """
+    id: UUID
+    name: str
+    inn: str
+    industry: IndustryEnum
+    size: CompanySizeEnum
+    financial_data_id: Optional[UUID] = None
+    period_start: Optional[datetime] = None
+    metrics: Dict[str, float] = Field(default_factory=dict, description="13 метрик последнего периода")
+    statuses: Dict[str, str] = Field(default_factory=dict, description="Статусы: {'gross_margin': 'good', ...}")
+    mom: Dict[str, Optional[float]] = Field(default_factory=dict, description="К предыдущему периоду")
+    yoy: Dict[str, Optional[float]] = Field(default_factory=dict, description="К тому же периоду год назад")
@@ -2,7 +2,7 @@
 
 from pydantic import BaseModel, Field, field_validator
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 from uuid import UUID
 
 
@@ -141,3 +141,11 @@ class FinancialDataResponse(BaseModel):
     class Config:
         from_attributes = True
 
+
+
+class BulkImportResult(BaseModel):
+    """Результат массового импорта финансовых данных"""
+    rows_imported: int = Field(..., description="Записано периодов (новых и обновленных)")
+    metrics_calculated: int = Field(..., description="Пересчитано строк метрик")
+    company_ids: List[UUID] = Field(default_factory=list, description="Затронутые компании")
+    duration_seconds: float = Field(..., description="Время импорта, сек")
@@ -0,0 +1,32 @@
+"""Background job schemas"""
+
+from pydantic import BaseModel, Field
+from typing import Optional
+
+from app.schemas.upload import UploadResult
+
+
+class JobCreated(BaseModel):
+    """Ответ при постановке задачи в очередь"""
+    job_id: str = Field(..., description="ID фоновой задачи")
+    status: str = Field(default="queued", description="queued/processing/completed/failed")
+    status_url: str = Field(..., description="URL для проверки статуса задачи")
+
+
+class JobStatus(BaseModel):
+    """
+    Статус фоновой задачи обработки загрузки
+
+    FR-2.1: Загрузка Excel/CSV файлов
+    """
+    job_id: str
+    status: str = Field(..., description="queued/processing/completed/failed")
+    stage: Optional[str] = Field(None, description="parsing/metrics - текущий этап обработки")
+
+    # Прогресс (обновляется после каждой пачки строк)
+    rows_total: int = Field(0, description="Прочитано периодов")
+    rows_imported: int = Field(0, description="Сохранено периодов")
+    rows_failed: int = Field(0, description="Периодов с ошибками")
+
+    result: Optional[UploadResult] = Field(None, description="Итог загрузки (когда status=completed)")
+    error: Optional[str] = Field(None, description="Причина ошибки (когда status=failed)")
@@ -2,7 +2,7 @@
 
 from pydantic import BaseModel, Field
 from datetime import datetime
-from typing import Optional, Dict
+from typing import Optional, Dict, List
 from uuid import UUID
 
 
@@ -96,3 +96,74 @@ class MetricsComparison(BaseModel):
     ros_change: Optional[float] = None
     roa_change: Optional[float] = None
 
+
+
+class MetricsTimeseries(BaseModel):
+    """
+    Временной ряд метрик компании в колоночном формате (для графиков)
+
+    series[metric][i] - значение метрики за период period_start[i]
+    """
+    company_id: UUID
+    period_start: List[datetime] = Field(..., description="Начала периодов по возрастанию")
+    series: Dict[str, List[Optional[float]]] = Field(
+        ...,
+        description="Метрика -> значения по периодам: {'revenue': [...], 'ros': [...]}"
+    )
+
+
+class ForecastPoint(BaseModel):
+    """Прогноз выручки на один период"""
+    period_start: datetime
+    revenue: float
+
+
+class RevenueForecastResponse(BaseModel):
+    """Прогноз выручки компании на следующие периоды"""
+    company_id: UUID
+    model: str = Field(..., description="moving_average / linear_trend / holt_winters")
+    mae: Optional[float] = Field(None, description="Средняя ошибка прогноза на один период")
+    periods_used: int = Field(..., description="Периодов истории в расчете")
+    forecast: List[ForecastPoint]
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class MetricsChanges(BaseModel):
+    """
+    Изменения всех метрик периода (из period_comparisons)
+
+    Процентные метрики - в процентных пунктах, остальные - в %
+    """
+    financial_data_id: UUID
+    period_start: datetime
+    previous_period_start: Optional[datetime] = None
+    year_ago_period_start: Optional[datetime] = None
+    mom: Dict[str, Optional[float]] = Field(..., description="К предыдущему периоду")
+    yoy: Dict[str, Optional[float]] = Field(..., description="К тому же периоду год назад")
+
+
+class MetricPercentile(BaseModel):
+    """Положение метрики компании в распределении сегмента"""
+    value: float
+    percentile: Optional[float] = Field(None, description="Процентиль компании, 0-100")
+    p25: Optional[float] = None
+    median: Optional[float] = None
+    p75: Optional[float] = None
+
+
+class CompanyBenchmarks(BaseModel):
+    """Сравнение метрик последнего периода с компаниями той же отрасли и размера"""
+    company_id: UUID
+    financial_data_id: UUID
+    period_start: Optional[datetime] = None
+    industry: str
+    size: str
+    level: str = Field(
+        ...,
+        description="С кем сравнивали: segment (отрасль и размер), industry (вся отрасль), all"
+    )
+    sample_size: int = Field(..., description="Количество компаний в выборке")
+    metrics: Dict[str, MetricPercentile]
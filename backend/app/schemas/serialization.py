@@ -0,0 +1,33 @@
+"""
+Serialization helpers
+
+Схема + ORM объект(ы) -> JSON bytes за один проход pydantic-core:
+валидация from_attributes и сериализация выполняются в Rust, без
+промежуточных dict и стандартного json энкодера FastAPI.
+"""
+
+from functools import lru_cache
+from typing import Any, Iterable, List, Type, TypeVar
+
+from pydantic import BaseModel, TypeAdapter
+
+M = TypeVar("M", bound=BaseModel)
+
+
+@lru_cache(maxsize=None)
+def _list_adapter(schema: Type[M]) -> TypeAdapter:
+    return TypeAdapter(List[schema])
+
+
+def dump_json(schema: Type[M], obj: Any) -> bytes:
+    """Один объект (ORM или модель) -> JSON bytes по схеме"""
+    if not isinstance(obj, schema):
+        obj = schema.model_validate(obj, from_attributes=True)
+    return obj.__pydantic_serializer__.to_json(obj)
+
+
+def dump_json_list(schema: Type[M], objects: Iterable[Any]) -> bytes:
+    """Список объектов (ORM или моделей) -> JSON массив bytes по схеме"""
+    adapter = _list_adapter(schema)
+    items = adapter.validate_python(list(objects), from_attributes=True)
+    return adapter.dump_json(items)
@@ -0,0 +1,35 @@
+"""Upload schemas"""
+
+from pydantic import BaseModel, Field
+from typing import List, Optional
+from uuid import UUID
+
+
+class UploadRowError(BaseModel):
+    """Ошибка валидации строки загруженного файла"""
+    row: int = Field(..., description="Номер строки в файле (с учетом заголовка)")
+    sheet: Optional[str] = Field(None, description="Лист, в котором найдена ошибка")
+    period_name: Optional[str] = Field(None, description="Период строки, если удалось прочитать")
+    message: str = Field(..., description="Описание ошибки")
+
+
+class UploadResult(BaseModel):
+    """
+    Результат загрузки Excel/CSV файла
+
+    FR-2.1: Загрузка Excel/CSV файлов
+    """
+    filename: str
+    file_type: str = Field(..., description="xlsx, xls, csv")
+    company_ids: List[UUID] = Field(default_factory=list, description="Компании, в которые загружены данные")
+
+    rows_total: int = Field(0, description="Прочитано периодов")
+    rows_imported: int = Field(0, description="Сохранено периодов")
+    rows_failed: int = Field(0, description="Периодов с ошибками")
+    metrics_calculated: int = Field(0, description="Пересчитано строк метрик")
+    errors: List[UploadRowError] = Field(default_factory=list, description="Первые ошибки валидации")
+
+    # Производительность загрузки
+    duration_seconds: float = Field(0.0, description="Время обработки файла, сек")
+    rows_per_second: float = Field(0.0, description="Скорость обработки, строк/сек")
+    peak_memory_bytes: int = Field(0, description="Пиковый RSS процесса обработки, байт")
@@ -0,0 +1,431 @@
+"""
+Benchmark Service
+
+FR-3.1: Бенчмарки по отраслям
+
+Распределения 13 метрик по сегментам (отрасль x размер компании) по
+последнему периоду каждой компании. Вместо ORDER BY по всей таблице
+calculated_metrics распределение хранится квантильным скетчем
+(QuantileSketch, DDSketch): логарифмическая гистограмма с относительной
+точностью SKETCH_RELATIVE_ACCURACY.
+
+Скетчи обновляются инкрементально после записи метрик короткой задачей
+benchmarks.refresh: вклад компании (benchmark_members) вычитается из старого
+сегмента и добавляется заново.
+Скетчи складываются, поэтому для малых сегментов используется отрасль
+целиком или все компании.
+"""
+
+import math
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.models.calculated_metrics import CalculatedMetrics
+from app.models.company import Company, CompanySizeEnum, IndustryEnum
+from app.models.metric_benchmark import BenchmarkMember, MetricBenchmark
+from app.services.metrics_calculator import METRIC_COLUMNS
+
+SKETCH_RELATIVE_ACCURACY = 0.01
+
+# Значения по модулю меньше считаются нулем
+SKETCH_MIN_VALUE = 1e-9
+
+# Минимальный размер выборки сегмента; меньше - отрасль целиком, затем все компании
+MIN_BENCHMARK_SAMPLE = 10
+
+Segment = Tuple[IndustryEnum, CompanySizeEnum]
+
+
+class QuantileSketch:
+    """
+    Квантильный скетч с относительной точностью (DDSketch)
+
+    Значение x > 0 попадает в корзину ceil(log_gamma(x)), где
+    gamma = (1 + a) / (1 - a); любое значение корзины отличается от
+    ее представителя не больше чем на a. Отрицательные значения - в
+    отдельные корзины по модулю, около нуля - в zero_count.
+
+    Скетчи складываются (merge), значения можно вычитать (weight=-1).
+    """
+
+    def __init__(
+        self,
+        positive: Optional[Mapping[Any, int]] = None,
+        negative: Optional[Mapping[Any, int]] = None,
+        zero_count: int = 0,
+        relative_accuracy: float = SKETCH_RELATIVE_ACCURACY,
+    ):
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.positive: Dict[int, int] = {int(k): int(v) for k, v in (positive or {}).items()}
+        self.negative: Dict[int, int] = {int(k): int(v) for k, v in (negative or {}).items()}
+        self.zero_count = zero_count
+
+    @property
+    def count(self) -> int:
+        return self.zero_count + sum(self.positive.values()) + sum(self.negative.values())
+
+    def _indexes(self, magnitudes: np.ndarray) -> np.ndarray:
+        return np.ceil(np.log(magnitudes) / self._log_gamma).astype(np.int64)
+
+    def _value(self, index: np.ndarray) -> np.ndarray:
+        """Представитель корзины"""
+        return 2 * self.gamma ** index / (self.gamma + 1)
+
+    @staticmethod
+    def _update(store: Dict[int, int], indexes: np.ndarray, weight: int) -> None:
+        keys, counts = np.unique(indexes, return_counts=True)
+        for key, count in zip(keys.tolist(), counts.tolist()):
+            value = store.get(key, 0) + weight * count
+            if value > 0:
+                store[key] = value
+            else:
+                store.pop(key, None)
+
+    def add(self, values: Sequence[float], weight: int = 1) -> None:
+        """Добавить значения (weight=-1 - вычесть ранее добавленные)"""
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        positive = values > SKETCH_MIN_VALUE
+        negative = values < -SKETCH_MIN_VALUE
+
+        self._update(self.positive, self._indexes(values[positive]), weight)
+        self._update(self.negative, self._indexes(-values[negative]), weight)
+        self.zero_count = max(self.zero_count + weight * int((~positive & ~negative).sum()), 0)
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        """Сложить с другим скетчем (той же точности)"""
+        for store, other_store in ((self.positive, other.positive), (self.negative, other.negative)):
+            for key, count in other_store.items():
+                store[key] = store.get(key, 0) + count
+        self.zero_count += other.zero_count
+        return self
+
+    def _sorted_buckets(self) -> Tuple[np.ndarray, np.ndarray]:
+        """(представители по возрастанию, количества)"""
+        negative_keys = np.array(sorted(self.negative, reverse=True), dtype=np.int64)
+        positive_keys = np.array(sorted(self.positive), dtype=np.int64)
+        values = np.concatenate([
+            -self._value(negative_keys),
+            np.zeros(1 if self.zero_count else 0),
+            self._value(positive_keys),
+        ])
+        counts = np.array(
+            [self.negative[k] for k in negative_keys.tolist()]
+            + ([self.zero_count] if self.zero_count else [])
+            + [self.positive[k] for k in positive_keys.tolist()],
+            dtype=np.int64,
+        )
+        return values, counts
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Значение квантиля q (0..1)"""
+        values, counts = self._sorted_buckets()
+        total = counts.sum()
+        if total == 0:
+            return None
+        cumulative = np.cumsum(counts)
+        index = int(np.searchsorted(cumulative, q * (total - 1), side="right"))
+        return float(values[min(index, values.size - 1)])
+
+    def percentile_of(self, value: float) -> Optional[float]:
+        """Процентиль значения: доля значений меньше (+ половина равных), %"""
+        values, counts = self._sorted_buckets()
+        total = counts.sum()
+        if total == 0:
+            return None
+        if value > SKETCH_MIN_VALUE:
+            bucket_value = float(self._value(self._indexes(np.array([value])))[0])
+        elif value < -SKETCH_MIN_VALUE:
+            bucket_value = -float(self._value(self._indexes(np.array([-value])))[0])
+        else:
+            bucket_value = 0.0
+
+        below = counts[values < bucket_value].sum()
+        equal = counts[values == bucket_value].sum()
+        return float((below + equal / 2) / total * 100)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "zero_count": self.zero_count,
+            "positive": {str(k): v for k, v in self.positive.items()},
+            "negative": {str(k): v for k, v in self.negative.items()},
+        }
+
+    @classmethod
+    def from_row(cls, row: MetricBenchmark) -> "QuantileSketch":
+        return cls(row.positive, row.negative, row.zero_count)
+
+
+# ============ Сопровождение скетчей ============
+
+
+def _latest_metrics(db: Session, company_ids: Optional[List[UUID]]) -> List[Any]:
+    """
+    Метрики последнего периода компаний вместе с сегментом
+    (row_number по индексу (company_id, period_start))
+    """
+    ranked = select(
+        CalculatedMetrics.company_id,
+        CalculatedMetrics.financial_data_id,
+        *[getattr(CalculatedMetrics, name) for name in METRIC_COLUMNS],
+        func.row_number().over(
+            partition_by=CalculatedMetrics.company_id,
+            order_by=CalculatedMetrics.period_start.desc(),
+        ).label("position"),
+    )
+    if company_ids is not None:
+        ranked = ranked.where(CalculatedMetrics.company_id.in_(company_ids))
+    ranked = ranked.subquery()
+
+    stmt = (
+        select(ranked, Company.industry, Company.size)
+        .join(Company, Company.id == ranked.c.company_id)
+        .where(ranked.c.position == 1)
+    )
+    return db.execute(stmt).all()
+
+
+def _apply_changes(db: Session, changes: Dict[Tuple[IndustryEnum, CompanySizeEnum, str], List[Tuple[float, int]]]) -> None:
+    """
+    Применить изменения к скетчам: {(отрасль, размер, метрика): [(значение, +1/-1)]}
+
+    Строки скетчей блокируются (FOR UPDATE) в фиксированном порядке:
+    параллельные обновления сегмента не теряются и не взаимоблокируются,
+    но выполняются по очереди до commit. Поэтому слияние идет в отдельной
+    короткой транзакции (задача benchmarks.refresh), а не в транзакции загрузки.
+    Недостающие строки сначала создаются пустыми (ON CONFLICT DO NOTHING):
+    FOR UPDATE блокирует только существующие строки, и две транзакции,
+    впервые заполняющие один сегмент, иначе начали бы с пустого скетча
+    и последняя перезаписала бы вклад первой.
+    """
+    keys = sorted(changes, key=lambda key: (key[0].value, key[1].value, key[2]))
+    if not keys:
+        return
+
+    now = datetime.utcnow()
+    empty = QuantileSketch().to_dict()
+    db.execute(
+        pg_insert(MetricBenchmark).on_conflict_do_nothing(
+            index_elements=[MetricBenchmark.industry, MetricBenchmark.size, MetricBenchmark.metric],
+        ),
+        [
+            {"industry": key[0], "size": key[1], "metric": key[2], **empty, "updated_at": now}
+            for key in keys
+        ],
+    )
+
+    existing = {}
+    for industry, size in sorted({(k[0], k[1]) for k in keys}, key=lambda s: (s[0].value, s[1].value)):
+        stmt = (
+            select(MetricBenchmark)
+            .where(MetricBenchmark.industry == industry, MetricBenchmark.size == size)
+            .order_by(MetricBenchmark.metric)
+            .with_for_update()
+        )
+        for row in db.execute(stmt).scalars():
+            existing[(row.industry, row.size, row.metric)] = row
+
+    records = []
+    for key in keys:
+        sketch = QuantileSketch.from_row(existing[key])
+        for weight in (-1, 1):
+            values = [value for value, w in changes[key] if w == weight]
+            if values:
+                sketch.add(values, weight)
+        records.append({
+            "industry": key[0],
+            "size": key[1],
+            "metric": key[2],
+            **sketch.to_dict(),
+            "updated_at": now,
+        })
+
+    stmt = pg_insert(MetricBenchmark)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[MetricBenchmark.industry, MetricBenchmark.size, MetricBenchmark.metric],
+        set_={
+            name: stmt.excluded[name]
+            for name in ("count", "zero_count", "positive", "negative", "updated_at")
+        },
+    )
+    db.execute(stmt, records)
+
+
+def refresh_benchmarks(db: Session, company_ids: Iterable[UUID]) -> int:
+    """
+    Обновить вклад компаний в скетчи после записи метрик
+    или изменения отрасли/размера компании
+
+    Компания без метрик (или удаленная) убирается из скетчей. Строки
+    companies и benchmark_members блокируются, чтобы две задачи по одной
+    компании не применили ее вклад дважды. Транзакцию коммитит вызывающий код.
+
+    Returns:
+        Количество компаний, вклад которых изменился
+    """
+    company_ids = list(company_ids)
+    if not company_ids:
+        return 0
+
+    # Новая компания еще без benchmark_members, удаленная - без companies
+    db.execute(
+        select(Company.id)
+        .where(Company.id.in_(company_ids))
+        .order_by(Company.id)
+        .with_for_update()
+    )
+    members = {
+        member.company_id: member
+        for member in db.execute(
+            select(BenchmarkMember)
+            .where(BenchmarkMember.company_id.in_(company_ids))
+            .order_by(BenchmarkMember.company_id)
+            .with_for_update()
+        ).scalars()
+    }
+    latest = {row.company_id: row for row in _latest_metrics(db, company_ids)}
+
+    changes: Dict[Tuple[IndustryEnum, CompanySizeEnum, str], List[Tuple[float, int]]] = {}
+    member_records = []
+    removed = []
+    for company_id in company_ids:
+        row = latest.get(company_id)
+        member = members.get(company_id)
+        values = {name: getattr(row, name) for name in METRIC_COLUMNS} if row is not None else None
+
+        if member is not None and row is not None and (
+            member.financial_data_id == row.financial_data_id
+            and member.industry == row.industry
+            and member.size == row.size
+            and member.values == values
+        ):
+            continue
+
+        if member is not None:
+            for name, value in member.values.items():
+                changes.setdefault((member.industry, member.size, name), []).append((value, -1))
+        if row is None:
+            if member is not None:
+                removed.append(company_id)
+            continue
+
+        for name, value in values.items():
+            changes.setdefault((row.industry, row.size, name), []).append((value, 1))
+        member_records.append({
+            "company_id": company_id,
+            "financial_data_id": row.financial_data_id,
+            "industry": row.industry,
+            "size": row.size,
+            "values": values,
+            "updated_at": datetime.utcnow(),
+        })
+
+    _apply_changes(db, changes)
+
+    if removed:
+        db.execute(BenchmarkMember.__table__.delete().where(BenchmarkMember.company_id.in_(removed)))
+    if member_records:
+        stmt = pg_insert(BenchmarkMember)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[BenchmarkMember.company_id],
+            set_={
+                name: stmt.excluded[name]
+                for name in ("financial_data_id", "industry", "size", "values", "updated_at")
+            },
+        )
+        db.execute(stmt, member_records)
+
+    return len(member_records) + len(removed)
+
+
+def rebuild_benchmarks(db: Session) -> int:
+    """
+    Построить все скетчи заново по последним периодам всех компаний
+
+    Нужен при первом развертывании и после изменения SKETCH_RELATIVE_ACCURACY.
+
+    Returns:
+        Количество компаний в скетчах
+    """
+    db.execute(BenchmarkMember.__table__.delete())
+    db.execute(MetricBenchmark.__table__.delete())
+
+    rows = _latest_metrics(db, None)
+    sketches: Dict[Tuple[IndustryEnum, CompanySizeEnum, str], QuantileSketch] = {}
+    segments: Dict[Segment, List[Any]] = {}
+    for row in rows:
+        segments.setdefault((row.industry, row.size), []).append(row)
+
+    for (industry, size), segment_rows in segments.items():
+        for name in METRIC_COLUMNS:
+            sketch = QuantileSketch()
+            sketch.add([getattr(row, name) for row in segment_rows])
+            sketches[(industry, size, name)] = sketch
+
+    now = datetime.utcnow()
+    if sketches:
+        db.execute(MetricBenchmark.__table__.insert(), [
+            {
+                "industry": industry,
+                "size": size,
+                "metric": name,
+                **sketch.to_dict(),
+                "updated_at": now,
+            }
+            for (industry, size, name), sketch in sketches.items()
+        ])
+    if rows:
+        db.execute(BenchmarkMember.__table__.insert(), [
+            {
+                "company_id": row.company_id,
+                "financial_data_id": row.financial_data_id,
+                "industry": row.industry,
+                "size": row.size,
+                "values": {name: getattr(row, name) for name in METRIC_COLUMNS},
+                "updated_at": now,
+            }
+            for row in rows
+        ])
+    return len(rows)
+
+
+# ============ Чтение ============
+
+
+def segment_sketches(
+    rows: Sequence[MetricBenchmark],
+    industry: IndustryEnum,
+    size: CompanySizeEnum,
+) -> Tuple[str, Dict[str, QuantileSketch]]:
+    """
+    Скетчи метрик для сравнения компании: ее сегмент, если в нем не меньше
+    MIN_BENCHMARK_SAMPLE компаний, иначе отрасль целиком, иначе все компании
+
+    Args:
+        rows: Строки metric_benchmarks (все сегменты)
+
+    Returns:
+        (уровень: "segment" / "industry" / "all", {метрика: скетч})
+    """
+    levels = (
+        ("segment", lambda row: row.industry == industry and row.size == size),
+        ("industry", lambda row: row.industry == industry),
+        ("all", lambda row: True),
+    )
+    merged: Dict[str, QuantileSketch] = {}
+    for level, matches in levels:
+        merged = {name: QuantileSketch() for name in METRIC_COLUMNS}
+        for row in rows:
+            if matches(row) and row.metric in merged:
+                merged[row.metric].merge(QuantileSketch.from_row(row))
+        if merged["revenue"].count >= MIN_BENCHMARK_SAMPLE:
+            return level, merged
+    return "all", merged
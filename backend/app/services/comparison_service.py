@@ -0,0 +1,248 @@
+"""
+Comparison Service
+
+FR-4.1: Дашборд - изменение метрик к прошлому периоду
+
+Материализованное сравнение периодов (period_comparisons): для каждого
+периода изменения 13 метрик к предыдущему периоду (MoM) и к тому же
+месяцу год назад (YoY). Считается векторизованно по строкам
+calculated_metrics и обновляется инкрементально - начиная с самого
+раннего периода, метрики которого изменились.
+"""
+
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Mapping, Sequence
+from uuid import UUID
+
+import numpy as np
+from dateutil.relativedelta import relativedelta
+from sqlalchemy import func, or_, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.models.calculated_metrics import CalculatedMetrics
+from app.models.period_comparison import PeriodComparison
+from app.services.metrics_calculator import (
+    METRIC_COLUMNS,
+    PERCENT_METRICS,
+    _same_company_as_previous,
+)
+
+# Сколько месяцев назад искать период для YoY
+YEAR_MONTHS = 12
+
+# Колонки изменений в period_comparisons
+CHANGE_COLUMNS = tuple(
+    f"{prefix}_{metric}" for prefix in ("mom", "yoy") for metric in METRIC_COLUMNS
+)
+
+
+def _vector_change(metric: str, current: np.ndarray, previous: np.ndarray) -> np.ndarray:
+    """Векторизованная версия metric_change (NaN - изменение не определено)"""
+    if metric in PERCENT_METRICS:
+        return current - previous
+    result = np.full(current.shape, np.nan)
+    np.divide((current - previous) * 100, np.abs(previous), out=result, where=previous != 0)
+    return np.where(np.isnan(previous), np.nan, result)
+
+
+def _year_ago_indexes(company_ids: Sequence[Any], period_starts: Sequence[datetime]) -> np.ndarray:
+    """
+    Индекс строки того же месяца год назад (-1 если такой нет)
+
+    Строки отсортированы по (company_id, period_start), поэтому ключи
+    (номер компании, номер месяца) возрастают и ищутся через searchsorted.
+    """
+    size = len(period_starts)
+    ids = np.asarray(company_ids, dtype=object)
+    is_start = np.ones(size, dtype=bool)
+    is_start[1:] = ids[1:] != ids[:-1]
+    company_number = np.cumsum(is_start) - 1
+
+    months = np.array([p.year * 12 + p.month - 1 for p in period_starts], dtype=np.int64)
+    keys = company_number * 1_000_000 + months
+    targets = keys - YEAR_MONTHS
+
+    found = np.searchsorted(keys, targets)
+    found_clipped = np.minimum(found, size - 1)
+    return np.where(keys[found_clipped] == targets, found_clipped, -1)
+
+
+def calculate_changes_batch(
+    metrics: Mapping[str, Sequence[float]],
+    company_ids: Sequence[Any],
+    period_starts: Sequence[datetime],
+) -> Dict[str, Any]:
+    """
+    Изменения метрик по N периодам
+
+    Args:
+        metrics: METRIC_COLUMNS -> массивы длины N
+        company_ids, period_starts: по строкам, отсортированным по (company_id, period_start)
+
+    Returns:
+        dict: mom_<metric>, yoy_<metric> (NaN где сравнения нет),
+        previous_period_start, year_ago_period_start (списки, None где нет)
+    """
+    size = len(period_starts)
+    result: Dict[str, Any] = {}
+    if size == 0:
+        for metric in METRIC_COLUMNS:
+            result[f"mom_{metric}"] = np.empty(0)
+            result[f"yoy_{metric}"] = np.empty(0)
+        result["previous_period_start"] = []
+        result["year_ago_period_start"] = []
+        return result
+
+    has_previous = _same_company_as_previous(company_ids, size)
+    previous_index = np.where(has_previous, np.arange(size) - 1, -1)
+    year_ago_index = _year_ago_indexes(company_ids, period_starts)
+
+    def shifted(values: np.ndarray, indexes: np.ndarray) -> np.ndarray:
+        return np.where(indexes >= 0, values[np.maximum(indexes, 0)], np.nan)
+
+    for metric in METRIC_COLUMNS:
+        values = np.asarray(metrics[metric], dtype=np.float64)
+        result[f"mom_{metric}"] = _vector_change(metric, values, shifted(values, previous_index))
+        result[f"yoy_{metric}"] = _vector_change(metric, values, shifted(values, year_ago_index))
+
+    result["previous_period_start"] = [
+        period_starts[i] if i >= 0 else None for i in previous_index.tolist()
+    ]
+    result["year_ago_period_start"] = [
+        period_starts[i] if i >= 0 else None for i in year_ago_index.tolist()
+    ]
+    return result
+
+
+def _load_metrics(db: Session, company_id: UUID, period_start: datetime) -> Dict[str, Any]:
+    """Метрики компании начиная с period_start, по возрастанию периода"""
+    stmt = (
+        select(
+            CalculatedMetrics.financial_data_id,
+            CalculatedMetrics.company_id,
+            CalculatedMetrics.period_start,
+            CalculatedMetrics.source_version,
+            *[getattr(CalculatedMetrics, name) for name in METRIC_COLUMNS],
+        )
+        .where(
+            CalculatedMetrics.company_id == company_id,
+            CalculatedMetrics.period_start >= period_start,
+        )
+        .order_by(CalculatedMetrics.period_start, CalculatedMetrics.financial_data_id)
+    )
+    rows = db.execute(stmt).all()
+    names = ("financial_data_id", "company_id", "period_start", "source_version") + METRIC_COLUMNS
+    if not rows:
+        return {name: [] for name in names}
+    return dict(zip(names, map(list, zip(*rows))))
+
+
+def _window_start(db: Session, company_id: UUID, since: datetime) -> datetime:
+    """
+    Начало окна для пересчета с since: год назад (YoY)
+    или предыдущий период, если он еще раньше (MoM)
+    """
+    year_ago = since - relativedelta(months=YEAR_MONTHS)
+    previous = db.execute(
+        select(func.max(CalculatedMetrics.period_start)).where(
+            CalculatedMetrics.company_id == company_id,
+            CalculatedMetrics.period_start < since,
+        )
+    ).scalar()
+    return min(year_ago, previous) if previous is not None else year_ago
+
+
+def _stale_period_starts(
+    db: Session,
+    company_ids: List[UUID],
+    force: bool,
+) -> Dict[UUID, datetime]:
+    """
+    Самый ранний период каждой компании, сравнение которого устарело:
+    сравнения нет или оно рассчитано по другой версии метрик
+    """
+    stmt = (
+        select(CalculatedMetrics.company_id, func.min(CalculatedMetrics.period_start))
+        .where(CalculatedMetrics.company_id.in_(company_ids))
+        .group_by(CalculatedMetrics.company_id)
+    )
+    if not force:
+        stmt = stmt.outerjoin(
+            PeriodComparison,
+            PeriodComparison.financial_data_id == CalculatedMetrics.financial_data_id,
+        ).where(
+            or_(
+                PeriodComparison.id.is_(None),
+                PeriodComparison.source_version.is_(None),
+                PeriodComparison.source_version != CalculatedMetrics.source_version,
+            )
+        )
+    return dict(db.execute(stmt).all())
+
+
+def _write_comparisons(db: Session, columns: Dict[str, Any], since: datetime) -> int:
+    changes = calculate_changes_batch(columns, columns["company_id"], columns["period_start"])
+    indexes = [i for i, start in enumerate(columns["period_start"]) if start >= since]
+    if not indexes:
+        return 0
+
+    now = datetime.utcnow()
+    records = []
+    for i in indexes:
+        record = {
+            "financial_data_id": columns["financial_data_id"][i],
+            "company_id": columns["company_id"][i],
+            "period_start": columns["period_start"][i],
+            "previous_period_start": changes["previous_period_start"][i],
+            "year_ago_period_start": changes["year_ago_period_start"][i],
+            "source_version": columns["source_version"][i],
+            "updated_at": now,
+        }
+        for name in CHANGE_COLUMNS:
+            value = changes[name][i]
+            record[name] = None if np.isnan(value) else float(value)
+        records.append(record)
+
+    stmt = pg_insert(PeriodComparison)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[PeriodComparison.financial_data_id],
+        set_={
+            name: stmt.excluded[name]
+            for name in records[0]
+            if name not in ("financial_data_id", "company_id")
+        },
+    )
+    db.execute(stmt, records)
+    return len(records)
+
+
+def refresh_comparisons(
+    db: Session,
+    company_ids: Iterable[UUID],
+    force: bool = False,
+) -> int:
+    """
+    Инкрементальное обновление period_comparisons после пересчета метрик
+
+    Для каждой компании пересчитываются периоды начиная с самого раннего
+    устаревшего: изменение периода влияет на MoM следующего периода и на
+    YoY периода через год, поэтому переписывается весь хвост. При добавлении
+    нового месяца это одна строка (плюс год истории для чтения).
+
+    Args:
+        force: Пересчитать все периоды (после recalculate_company_metrics)
+
+    Returns:
+        Количество записанных строк period_comparisons
+    """
+    company_ids = list(company_ids)
+    if not company_ids:
+        return 0
+
+    updated = 0
+    for company_id, since in _stale_period_starts(db, company_ids, force).items():
+        columns = _load_metrics(db, company_id, _window_start(db, company_id, since))
+        updated += _write_comparisons(db, columns, since)
+    return updated
+
@@ -0,0 +1,446 @@
+"""
+File Processor Service
+
+FR-2.1: Загрузка Excel/CSV файлов
+
+Потоковая загрузка финансовых данных с ограниченным потреблением памяти:
+- .xlsx читается через openpyxl в режиме read_only (строка за строкой)
+- .csv читается инкрементально через csv.reader
+- строки сохраняются в financial_data пачками по UPLOAD_BATCH_SIZE
+  (повторно загруженный период обновляется, version увеличивается)
+
+Формат файла: одна строка = один период, первая непустая строка - заголовок.
+Excel: лист "P&L" (ОПиУ) и лист "Баланс", строки сопоставляются по периоду
+(и ИНН, если указан). Если лист один или это CSV - все колонки в одной строке.
+Колонка "ИНН" позволяет загрузить в одном файле данные нескольких компаний.
+"""
+
+import csv
+import resource
+import sys
+import time
+from datetime import date, datetime
+from itertools import zip_longest
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional, Tuple
+from uuid import UUID
+
+from pydantic import ValidationError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.schemas.financial_data import FinancialDataCreate
+from app.schemas.upload import UploadResult, UploadRowError
+from app.services.financial_data_service import financial_data_to_record, upsert_financial_data
+
+# Сколько ошибок возвращать в ответе (остальные только считаются)
+MAX_REPORTED_ERRORS = 100
+
+PERIOD_FIELDS = ("period_name", "period_start", "period_end")
+
+PL_FIELDS = ("revenue", "cogs", "gross_profit", "operating_expenses", "ebit", "net_profit")
+
+BALANCE_FIELDS = (
+    "current_assets",
+    "non_current_assets",
+    "current_liabilities",
+    "non_current_liabilities",
+    "equity",
+    "cash",
+    "receivables",
+    "inventory",
+)
+
+# Допустимые названия колонок (без учета регистра)
+COLUMN_ALIASES: Dict[str, Tuple[str, ...]] = {
+    "inn": ("инн",),
+    "period_name": ("период", "period", "название периода"),
+    "period_start": ("начало периода", "дата начала"),
+    "period_end": ("конец периода", "дата окончания"),
+    "revenue": ("выручка",),
+    "cogs": ("себестоимость",),
+    "gross_profit": ("валовая прибыль",),
+    "operating_expenses": ("операционные расходы",),
+    "ebit": ("прибыль до налогообложения",),
+    "net_profit": ("чистая прибыль",),
+    "current_assets": ("оборотные активы",),
+    "non_current_assets": ("внеоборотные активы",),
+    "current_liabilities": ("краткосрочные обязательства",),
+    "non_current_liabilities": ("долгосрочные обязательства",),
+    "equity": ("собственный капитал", "капитал"),
+    "cash": ("денежные средства",),
+    "receivables": ("дебиторская задолженность",),
+    "inventory": ("запасы",),
+}
+
+PL_SHEET_NAMES = ("p&l", "pl", "опиу", "отчет о прибылях и убытках")
+BALANCE_SHEET_NAMES = ("баланс", "balance", "balance sheet")
+
+DATE_FORMATS = ("%Y-%m-%d", "%d.%m.%Y", "%Y-%m-%d %H:%M:%S", "%d/%m/%Y")
+
+# Строка источника: (номер строки, лист, значения по полям)
+SourceRow = Tuple[int, Optional[str], Dict[str, Any]]
+
+
+def _normalize_header(value: Any) -> str:
+    return " ".join(str(value).strip().lower().replace("ё", "е").split())
+
+
+_HEADER_LOOKUP: Dict[str, str] = {}
+for _field, _aliases in COLUMN_ALIASES.items():
+    _HEADER_LOOKUP[_field] = _field
+    for _alias in _aliases:
+        _HEADER_LOOKUP[_normalize_header(_alias)] = _field
+
+
+class FileFormatError(ValueError):
+    """Файл не соответствует ожидаемой структуре"""
+
+
+def _parse_number(value: Any) -> Optional[float]:
+    """Число из ячейки: 1 234 567,89 -> 1234567.89"""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+
+    text = str(value).strip().replace("\xa0", "").replace(" ", "").replace(",", ".")
+    if not text:
+        return None
+    if text.startswith("(") and text.endswith(")"):
+        text = "-" + text[1:-1]
+    try:
+        return float(text)
+    except ValueError:
+        raise ValueError(f"Некорректное число: {value}")
+
+
+def _parse_date(value: Any) -> Optional[datetime]:
+    """Дата из ячейки (datetime Excel или строка CSV)"""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day)
+
+    text = str(value).strip()
+    if not text:
+        return None
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+    raise ValueError(f"Неверный формат даты: {text}")
+
+
+def _iter_table(rows: Iterator[Tuple[Any, ...]], sheet: Optional[str]) -> Iterator[SourceRow]:
+    """
+    Строки таблицы -> dict по полям
+
+    Первая непустая строка считается заголовком, неизвестные колонки
+    пропускаются. Значения не конвертируются (это делает build_financial_data).
+    """
+    columns: Optional[List[Tuple[int, str]]] = None
+
+    for row_number, row in enumerate(rows, start=1):
+        if not row or all(cell is None or str(cell).strip() == "" for cell in row):
+            continue
+
+        if columns is None:
+            columns = [
+                (index, _HEADER_LOOKUP[_normalize_header(cell)])
+                for index, cell in enumerate(row)
+                if cell is not None and _normalize_header(cell) in _HEADER_LOOKUP
+            ]
+            if not any(field == "period_name" for _, field in columns):
+                raise FileFormatError(
+                    f"Не найдена колонка 'Период' в заголовке{f' листа {sheet}' if sheet else ''}"
+                )
+            continue
+
+        yield row_number, sheet, {
+            field: row[index] for index, field in columns if index < len(row)
+        }
+
+
+def _row_key(values: Mapping[str, Any]) -> Tuple[str, str]:
+    inn = values.get("inn")
+    return (str(inn).strip() if inn is not None else "", str(values.get("period_name") or "").strip())
+
+
+def _merge_sheets(
+    pl_rows: Iterator[SourceRow],
+    balance_rows: Iterator[SourceRow],
+) -> Iterator[SourceRow]:
+    """
+    Сопоставление строк P&L и Баланса по (ИНН, период)
+
+    Листы читаются параллельно, поэтому при одинаковом порядке периодов
+    (типичная выгрузка 1С) в памяти держится O(1) строк. Несовпавшие
+    строки ждут пару в буфере.
+    """
+    pending_pl: Dict[Tuple[str, str], SourceRow] = {}
+    pending_balance: Dict[Tuple[str, str], SourceRow] = {}
+
+    for pl_row, balance_row in zip_longest(pl_rows, balance_rows):
+        for row, own, other, own_first in (
+            (pl_row, pending_pl, pending_balance, True),
+            (balance_row, pending_balance, pending_pl, False),
+        ):
+            if row is None:
+                continue
+            key = _row_key(row[2])
+            match = other.pop(key, None)
+            if match is None:
+                own[key] = row
+                continue
+
+            first, second = (row, match) if own_first else (match, row)
+            yield first[0], first[1], {**second[2], **first[2]}
+
+    for row_number, sheet, values in pending_pl.values():
+        yield row_number, sheet, {**values, "_error": "Нет данных баланса для периода"}
+    for row_number, sheet, values in pending_balance.values():
+        yield row_number, sheet, {**values, "_error": "Нет данных P&L для периода"}
+
+
+def _find_sheet(names: List[str], candidates: Tuple[str, ...]) -> Optional[str]:
+    for name in names:
+        if _normalize_header(name) in candidates:
+            return name
+    return None
+
+
+def _iter_xlsx(path: str) -> Iterator[SourceRow]:
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        names = workbook.sheetnames
+        if len(names) == 1:
+            yield from _iter_table(workbook[names[0]].iter_rows(values_only=True), names[0])
+            return
+
+        pl_name = _find_sheet(names, PL_SHEET_NAMES) or names[0]
+        balance_name = _find_sheet(names, BALANCE_SHEET_NAMES) or names[1]
+        yield from _merge_sheets(
+            _iter_table(workbook[pl_name].iter_rows(values_only=True), pl_name),
+            _iter_table(workbook[balance_name].iter_rows(values_only=True), balance_name),
+        )
+    finally:
+        workbook.close()
+
+
+def _iter_xls(path: str) -> Iterator[SourceRow]:
+    # Формат .xls не поддерживает потоковое чтение: xlrd загружает лист целиком,
+    # on_demand позволяет хотя бы не загружать неиспользуемые листы
+    import xlrd
+
+    workbook = xlrd.open_workbook(path, on_demand=True)
+    try:
+        names = workbook.sheet_names()
+
+        def sheet_rows(name: str) -> Iterator[Tuple[Any, ...]]:
+            sheet = workbook.sheet_by_name(name)
+            for index in range(sheet.nrows):
+                row = []
+                for cell in sheet.row(index):
+                    if cell.ctype == xlrd.XL_CELL_DATE:
+                        row.append(xlrd.xldate.xldate_as_datetime(cell.value, workbook.datemode))
+                    else:
+                        row.append(cell.value)
+                yield tuple(row)
+
+        if len(names) == 1:
+            yield from _iter_table(sheet_rows(names[0]), names[0])
+            return
+
+        pl_name = _find_sheet(names, PL_SHEET_NAMES) or names[0]
+        balance_name = _find_sheet(names, BALANCE_SHEET_NAMES) or names[1]
+        yield from _merge_sheets(
+            _iter_table(sheet_rows(pl_name), pl_name),
+            _iter_table(sheet_rows(balance_name), balance_name),
+        )
+    finally:
+        workbook.release_resources()
+
+
+def _detect_encoding(path: str) -> str:
+    """UTF-8 или cp1251 (выгрузки 1С)"""
+    with open(path, "rb") as f:
+        sample = f.read(64 * 1024)
+    try:
+        sample.decode("utf-8-sig")
+        return "utf-8-sig"
+    except UnicodeDecodeError as e:
+        # Обрезанный в конце выборки многобайтный символ - это все еще UTF-8
+        if e.start >= len(sample) - 3:
+            return "utf-8-sig"
+        return "cp1251"
+
+
+def _iter_csv(path: str) -> Iterator[SourceRow]:
+    encoding = _detect_encoding(path)
+    with open(path, "r", encoding=encoding, newline="") as f:
+        sample = f.read(8 * 1024)
+        f.seek(0)
+        try:
+            dialect = csv.Sniffer().sniff(sample, delimiters=";,\t")
+        except csv.Error:
+            dialect = csv.excel
+        yield from _iter_table((tuple(row) for row in csv.reader(f, dialect)), None)
+
+
+READERS: Dict[str, Callable[[str], Iterator[SourceRow]]] = {
+    "xlsx": _iter_xlsx,
+    "xls": _iter_xls,
+    "csv": _iter_csv,
+}
+
+
+def iter_source_rows(path: str, file_type: str) -> Iterator[SourceRow]:
+    """Потоковое чтение строк файла (по одному периоду)"""
+    reader = READERS.get(file_type)
+    if reader is None:
+        raise FileFormatError(f"Неподдерживаемый формат файла: {file_type}")
+    return reader(path)
+
+
+def build_financial_data(
+    values: Mapping[str, Any],
+    company_id: UUID,
+    filename: Optional[str] = None,
+    file_type: Optional[str] = None,
+) -> FinancialDataCreate:
+    """
+    Строка файла -> FinancialDataCreate
+
+    Raises:
+        ValueError: некорректные значения или не сходится баланс
+    """
+    error = values.get("_error")
+    if error:
+        raise ValueError(error)
+
+    missing = [
+        field for field in PERIOD_FIELDS + PL_FIELDS + BALANCE_FIELDS
+        if values.get(field) is None or str(values.get(field)).strip() == ""
+    ]
+    if missing:
+        raise ValueError(f"Не заполнены колонки: {', '.join(missing)}")
+
+    return FinancialDataCreate(
+        company_id=company_id,
+        period_name=str(values["period_name"]).strip(),
+        period_start=_parse_date(values["period_start"]),
+        period_end=_parse_date(values["period_end"]),
+        pl_data={field: _parse_number(values[field]) for field in PL_FIELDS},
+        balance_data={field: _parse_number(values[field]) for field in BALANCE_FIELDS},
+        source_filename=filename,
+        source_file_type=file_type,
+    )
+
+
+def format_validation_error(exc: Exception) -> str:
+    """Текст ошибки валидации строки (pydantic или ValueError)"""
+    if isinstance(exc, ValidationError):
+        messages = []
+        for error in exc.errors():
+            location = ".".join(str(part) for part in error["loc"])
+            messages.append(f"{location}: {error['msg']}" if location else error["msg"])
+        return "; ".join(messages)
+    return str(exc)
+
+
+def _peak_rss_bytes() -> int:
+    """
+    Пиковый RSS процесса (getrusage, без накладных расходов tracemalloc
+    на каждую аллокацию и без глобального состояния между потоками)
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux - килобайты, macOS - байты
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def ingest_file(
+    db: Session,
+    path: str,
+    *,
+    filename: str,
+    file_type: str,
+    default_company_id: Optional[UUID] = None,
+    companies_by_inn: Optional[Mapping[str, UUID]] = None,
+    batch_size: Optional[int] = None,
+    on_progress: Optional[Callable[[UploadResult], None]] = None,
+) -> UploadResult:
+    """
+    Потоковая загрузка файла в financial_data
+
+    Args:
+        db: Сессия БД (транзакцию коммитит вызывающий код)
+        path: Путь к сохраненному файлу
+        filename: Исходное имя файла
+        file_type: xlsx, xls или csv
+        default_company_id: Компания для строк без ИНН
+        companies_by_inn: ИНН -> company_id для файлов с несколькими компаниями
+        batch_size: Размер пачки для insert (по умолчанию UPLOAD_BATCH_SIZE)
+        on_progress: Вызывается после записи каждой пачки
+
+    Returns:
+        UploadResult со статистикой и ошибками по строкам
+    """
+    batch_size = batch_size or settings.UPLOAD_BATCH_SIZE
+    companies_by_inn = companies_by_inn or {}
+    result = UploadResult(filename=filename, file_type=file_type)
+    company_ids = set()
+    batch: List[Dict[str, Any]] = []
+
+    def flush() -> None:
+        if batch:
+            result.rows_imported += upsert_financial_data(db, batch)
+            batch.clear()
+        if on_progress is not None:
+            on_progress(result)
+
+    started_at = time.perf_counter()
+    for row_number, sheet, values in iter_source_rows(path, file_type):
+        result.rows_total += 1
+        try:
+            inn = values.get("inn")
+            if inn is not None and str(inn).strip():
+                company_id = companies_by_inn.get(str(inn).strip())
+                if company_id is None:
+                    raise ValueError(f"Компания с ИНН {inn} не найдена")
+            elif default_company_id is not None:
+                company_id = default_company_id
+            else:
+                raise ValueError("Не указана компания (колонка 'ИНН' или параметр company_id)")
+
+            data = build_financial_data(values, company_id, filename, file_type)
+        except ValueError as e:
+            result.rows_failed += 1
+            if len(result.errors) < MAX_REPORTED_ERRORS:
+                period_name = values.get("period_name")
+                result.errors.append(UploadRowError(
+                    row=row_number,
+                    sheet=sheet,
+                    period_name=str(period_name) if period_name is not None else None,
+                    message=format_validation_error(e),
+                ))
+            continue
+
+        company_ids.add(company_id)
+        batch.append(financial_data_to_record(data))
+        if len(batch) >= batch_size:
+            flush()
+
+    flush()
+    result.peak_memory_bytes = _peak_rss_bytes()
+
+    result.duration_seconds = round(time.perf_counter() - started_at, 4)
+    if result.duration_seconds > 0:
+        result.rows_per_second = round(result.rows_total / result.duration_seconds, 1)
+    result.company_ids = sorted(company_ids, key=str)
+    return result
+
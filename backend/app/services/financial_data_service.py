@@ -0,0 +1,141 @@
+"""
+Financial Data Service
+
+Массовая запись financial_data и метрик:
+multi-row INSERT ... ON CONFLICT (company_id, period_start) DO UPDATE.
+Повторная загрузка периода обновляет строку и увеличивает version,
+после чего refresh_derived_data пересчитывает только затронутые метрики,
+сравнения периодов и прогнозы выручки. Отраслевые бенчмарки обновляет
+задача benchmarks.refresh после commit (app.tasks.benchmarks.enqueue_benchmarks).
+"""
+
+from typing import Any, Dict, Iterable, List, Sequence
+from uuid import UUID
+
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.models.financial_data import FinancialData
+from app.schemas.financial_data import FinancialDataCreate
+from app.services.comparison_service import refresh_comparisons
+from app.services.forecast_service import refresh_forecasts
+from app.services.metrics_calculator import recalculate_company_metrics, refresh_stale_metrics
+
+# Колонки, которые обновляются при повторной загрузке периода
+_UPSERT_COLUMNS = (
+    "period_end",
+    "period_name",
+    "revenue",
+    "cogs",
+    "gross_profit",
+    "operating_expenses",
+    "ebit",
+    "net_profit",
+    "current_assets",
+    "non_current_assets",
+    "current_liabilities",
+    "non_current_liabilities",
+    "equity",
+    "cash",
+    "receivables",
+    "inventory",
+    "source_filename",
+    "source_file_type",
+    "upload_notes",
+)
+
+
+def financial_data_to_record(data: FinancialDataCreate) -> Dict[str, Any]:
+    """FinancialDataCreate -> dict для bulk insert в financial_data"""
+    return {
+        "company_id": data.company_id,
+        "period_start": data.period_start,
+        "period_end": data.period_end,
+        "period_name": data.period_name,
+        **data.pl_data.model_dump(),
+        **data.balance_data.model_dump(),
+        "source_filename": data.source_filename,
+        "source_file_type": data.source_file_type,
+        "upload_notes": data.upload_notes,
+    }
+
+
+def upsert_financial_data(db: Session, records: Sequence[Dict[str, Any]]) -> int:
+    """
+    Массовая запись периодов
+
+    Один период компании в одной пачке может встретиться только раз
+    (ограничение ON CONFLICT), поэтому дубликаты схлопываются - побеждает
+    последний. Транзакцию коммитит вызывающий код.
+
+    Returns:
+        Количество записанных строк
+    """
+    unique = list({(r["company_id"], r["period_start"]): r for r in records}.values())
+    if not unique:
+        return 0
+
+    stmt = pg_insert(FinancialData)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[FinancialData.company_id, FinancialData.period_start],
+        set_={
+            **{name: stmt.excluded[name] for name in _UPSERT_COLUMNS},
+            "version": FinancialData.version + 1,
+            "updated_at": stmt.excluded.updated_at,
+        },
+    )
+    db.execute(stmt, unique)
+    return len(unique)
+
+
+def refresh_derived_data(db: Session, company_ids: Iterable[UUID]) -> int:
+    """
+    Инкрементальный пересчет всего, что зависит от financial_data:
+    метрики -> сравнения периодов, прогноз выручки (бенчмарки - отдельной задачей)
+
+    Returns:
+        Количество пересчитанных строк calculated_metrics
+    """
+    company_ids = list(company_ids)
+    metrics_calculated = refresh_stale_metrics(db, company_ids)
+    refresh_comparisons(db, company_ids)
+    refresh_forecasts(db, company_ids)
+    return metrics_calculated
+
+
+def rebuild_derived_data(db: Session, company_ids: Iterable[UUID]) -> int:
+    """
+    Полный пересчет метрик, сравнений и прогнозов компаний
+    (после изменения формул)
+
+    Returns:
+        Количество записанных строк calculated_metrics
+    """
+    company_ids = list(company_ids)
+    metrics_calculated = recalculate_company_metrics(db, company_ids)
+    refresh_comparisons(db, company_ids, force=True)
+    refresh_forecasts(db, company_ids, force=True)
+    return metrics_calculated
+
+
+def import_financial_data(db: Session, items: Iterable[FinancialDataCreate]) -> Dict[str, Any]:
+    """
+    Импорт уже провалидированных периодов, пересчет метрик и сравнений
+    в одной транзакции (commit выполняет вызывающий код). Прогнозы и
+    бенчмарки вызывающий код ставит в очередь после commit.
+
+    Returns:
+        dict: rows_imported, metrics_calculated, company_ids
+    """
+    records = [financial_data_to_record(item) for item in items]
+    rows_imported = upsert_financial_data(db, records)
+
+    company_ids: List[UUID] = sorted({r["company_id"] for r in records}, key=str)
+    metrics_calculated = refresh_stale_metrics(db, company_ids)
+    refresh_comparisons(db, company_ids)
+
+    return {
+        "rows_imported": rows_imported,
+        "metrics_calculated": metrics_calculated,
+        "company_ids": company_ids,
+    }
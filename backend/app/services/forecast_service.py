@@ -0,0 +1,434 @@
+"""
+Forecast Service
+
+FR-3.1: Выручка и прогноз выручки
+
+Модели прогноза выручки по истории FinancialData.revenue:
+- moving_average - среднее за MA_WINDOW последних периодов
+- linear_trend - линейный тренд (МНК) по TREND_WINDOW последним периодам
+- holt_winters - аддитивное сглаживание Хольта-Винтерса с сезонностью
+  SEASON_LENGTH (при истории короче двух сезонов - модель Хольта без сезонности)
+
+Все модели считаются сразу для пачки компаний: история компаний
+раскладывается в матрицу (компания x период), циклы идут только по
+периодам, а параметры Хольта-Винтерса подбираются перебором сетки
+в том же проходе. Для каждой компании выбирается модель с наименьшей
+ошибкой прогноза на один период вперед.
+
+Результат:
+- calculated_metrics.revenue_forecast - прогноз периода по предыдущим
+  (план/факт на графиках)
+- revenue_forecasts - прогноз на FORECAST_HORIZON следующих периодов
+
+Прогноз пересчитывается только для компаний, у которых изменились
+исходные данные (отпечаток: количество периодов, сумма версий, последний период).
+"""
+
+import itertools
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+from uuid import UUID
+
+import numpy as np
+from dateutil.relativedelta import relativedelta
+from sqlalchemy import bindparam, func, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.models.calculated_metrics import CalculatedMetrics
+from app.models.financial_data import FinancialData
+from app.models.revenue_forecast import RevenueForecast
+
+MODELS = ("moving_average", "linear_trend", "holt_winters")
+
+MA_WINDOW = 3
+TREND_WINDOW = 12
+SEASON_LENGTH = 12
+FORECAST_HORIZON = 3
+
+# Сетка параметров Хольта-Винтерса (alpha - уровень, beta - тренд, gamma - сезонность)
+HOLT_WINTERS_GRID = tuple(itertools.product((0.2, 0.5, 0.8), (0.05, 0.2), (0.1, 0.3)))
+
+# Компаний в одной пачке (ограничивает размер матриц)
+FORECAST_BATCH_SIZE = 2000
+
+
+def _company_matrix(revenue: np.ndarray, company_ids: Sequence[Any]) -> Dict[str, Any]:
+    """
+    Строки (отсортированные по company_id, period_start) -> матрица
+    компания x период, выровненная по первому периоду (хвост - NaN)
+    """
+    size = revenue.shape[0]
+    ids = np.asarray(company_ids, dtype=object)
+    is_start = np.ones(size, dtype=bool)
+    is_start[1:] = ids[1:] != ids[:-1]
+
+    starts = np.flatnonzero(is_start)
+    lengths = np.diff(np.append(starts, size))
+    row_company = np.cumsum(is_start) - 1
+    row_position = np.arange(size) - starts[row_company]
+
+    matrix = np.full((starts.size, int(lengths.max())), np.nan)
+    matrix[row_company, row_position] = revenue
+
+    return {
+        "matrix": matrix,
+        "lengths": lengths,
+        "company_ids": [ids[start] for start in starts],
+        "row_company": row_company,
+        "row_position": row_position,
+    }
+
+
+def _moving_average(values: np.ndarray, lengths: np.ndarray, horizon: int) -> Dict[str, np.ndarray]:
+    """Прогноз на шаг вперед (C x T) и на horizon периодов (C x horizon)"""
+    companies, periods = values.shape
+    cumulative = np.zeros((companies, periods + 1))
+    np.cumsum(np.nan_to_num(values), axis=1, out=cumulative[:, 1:])
+
+    # Прогноз периода t - среднее периодов [t - MA_WINDOW, t)
+    t = np.arange(periods)
+    window_start = np.maximum(t - MA_WINDOW, 0)
+    count = np.maximum(t - window_start, 1)
+    one_step = (cumulative[:, t] - cumulative[:, window_start]) / count
+    one_step[:, 0] = np.nan
+
+    rows = np.arange(companies)
+    last_start = np.maximum(lengths - MA_WINDOW, 0)
+    last_mean = (cumulative[rows, lengths] - cumulative[rows, last_start]) / (lengths - last_start)
+    return {"one_step": one_step, "future": np.repeat(last_mean[:, None], horizon, axis=1)}
+
+
+def _linear_trend(values: np.ndarray, lengths: np.ndarray, horizon: int) -> Dict[str, np.ndarray]:
+    """МНК по скользящему окну TREND_WINDOW через кумулятивные суммы"""
+    companies, periods = values.shape
+    y = np.nan_to_num(values)
+    x = np.arange(periods, dtype=np.float64)
+
+    def cumulative(a: np.ndarray) -> np.ndarray:
+        result = np.zeros(a.shape[:-1] + (a.shape[-1] + 1,))
+        np.cumsum(a, axis=-1, out=result[..., 1:])
+        return result
+
+    sum_x, sum_xx = cumulative(x), cumulative(x * x)
+    sum_y, sum_xy = cumulative(y), cumulative(y * x)
+
+    def fit(end: np.ndarray, start: np.ndarray, rows=slice(None)):
+        n = end - start
+        sx = sum_x[end] - sum_x[start]
+        sxx = sum_xx[end] - sum_xx[start]
+        sy = sum_y[rows, end] - sum_y[rows, start]
+        sxy = sum_xy[rows, end] - sum_xy[rows, start]
+        denominator = n * sxx - sx * sx
+        slope = np.divide(
+            n * sxy - sx * sy, denominator,
+            out=np.zeros(np.broadcast(sy, denominator).shape), where=denominator != 0,
+        )
+        intercept = (sy - slope * sx) / np.maximum(n, 1)
+        return slope, intercept
+
+    # Прогноз периода t по окну [t - TREND_WINDOW, t)
+    t = np.arange(periods)
+    start = np.maximum(t - TREND_WINDOW, 0)
+    slope, intercept = fit(t, start)
+    one_step = intercept + slope * t
+    one_step[:, 0] = np.nan
+
+    rows = np.arange(companies)
+    last_start = np.maximum(lengths - TREND_WINDOW, 0)
+    slope, intercept = fit(lengths, last_start, rows)
+    steps = lengths[:, None] - 1 + np.arange(1, horizon + 1)
+    future = intercept[:, None] + slope[:, None] * steps
+    return {"one_step": one_step, "future": future}
+
+
+def _holt_winters(values: np.ndarray, lengths: np.ndarray, horizon: int) -> Dict[str, np.ndarray]:
+    """
+    Аддитивный Хольт-Винтерс для всех компаний и всех параметров сетки сразу
+
+    Состояние - массивы (параметры x компании); для каждой компании
+    выбираются параметры с наименьшей суммой квадратов ошибок.
+    """
+    companies, periods = values.shape
+    m = SEASON_LENGTH
+    grid = np.array(HOLT_WINTERS_GRID)
+    alpha, beta, gamma = (grid[:, i, None] for i in range(3))
+
+    seasonal = lengths >= 2 * m
+    season = np.zeros((companies, m))
+    level = values[:, 0].copy()
+    trend = np.zeros(companies)
+    if periods > 1:
+        trend = np.where(lengths >= 2, values[:, 1] - values[:, 0], 0.0)
+    if seasonal.any():
+        # Начальные значения по двум первым сезонам: тренд - по разнице
+        # средних, сезонность - отклонения от линии тренда
+        first, second = values[seasonal, :m], values[seasonal, m:2 * m]
+        first_mean = first.mean(axis=1, keepdims=True)
+        second_mean = second.mean(axis=1, keepdims=True)
+        slope = (second_mean - first_mean) / m
+        offset = slope * (np.arange(m) - (m - 1) / 2)
+        season[seasonal] = ((first - first_mean - offset) + (second - second_mean - offset)) / 2
+        trend[seasonal] = slope[:, 0]
+        level[seasonal] = (first_mean - slope * (m - 1) / 2)[:, 0]
+
+    # Без сезонности gamma = 0 - сезонная компонента остается нулевой
+    gamma = np.where(seasonal[None, :], gamma, 0.0)
+
+    shape = (grid.shape[0], companies)
+    level = np.broadcast_to(level, shape).copy()
+    trend = np.broadcast_to(trend, shape).copy()
+    season = np.broadcast_to(season, shape + (m,)).copy()
+    one_step = np.full(shape + (periods,), np.nan)
+    squared_error = np.zeros(shape)
+
+    for t in range(1, periods):
+        index = t % m
+        forecast = level + trend + season[:, :, index]
+        one_step[:, :, t] = forecast
+
+        y = values[:, t]
+        observed = ~np.isnan(y)
+        y = np.where(observed, y, 0.0)
+
+        new_level = alpha * (y - season[:, :, index]) + (1 - alpha) * (level + trend)
+        new_trend = beta * (new_level - level) + (1 - beta) * trend
+        new_season = gamma * (y - new_level) + (1 - gamma) * season[:, :, index]
+
+        squared_error += np.where(observed, (y - forecast) ** 2, 0.0)
+        level = np.where(observed, new_level, level)
+        trend = np.where(observed, new_trend, trend)
+        season[:, :, index] = np.where(observed, new_season, season[:, :, index])
+
+    best = np.argmin(squared_error, axis=0)
+    rows = np.arange(companies)
+    steps = np.arange(1, horizon + 1)
+    season_index = (lengths[:, None] - 1 + steps) % m
+    future = (
+        level[best, rows][:, None]
+        + trend[best, rows][:, None] * steps
+        + season[best, rows][rows[:, None], season_index]
+    )
+    return {"one_step": one_step[best, rows], "future": future}
+
+
+def forecast_revenue_batch(
+    revenue: Sequence[float],
+    company_ids: Sequence[Any],
+    horizon: int = FORECAST_HORIZON,
+) -> Dict[str, Any]:
+    """
+    Прогноз выручки для пачки компаний
+
+    Args:
+        revenue: Выручка по периодам, строки отсортированы по (company_id, period_start)
+        company_ids: company_id каждой строки
+        horizon: Количество будущих периодов
+
+    Returns:
+        dict:
+            one_step - прогноз каждой строки по предыдущим периодам выбранной
+                моделью (NaN для первого периода компании), длина N
+            company_ids, model, mae - по компаниям
+            future - прогноз на horizon периодов (компании x horizon)
+    """
+    revenue = np.asarray(revenue, dtype=np.float64)
+    if revenue.shape[0] == 0:
+        return {
+            "one_step": np.empty(0),
+            "company_ids": [],
+            "model": [],
+            "mae": np.empty(0),
+            "future": np.empty((0, horizon)),
+        }
+
+    layout = _company_matrix(revenue, company_ids)
+    values, lengths = layout["matrix"], layout["lengths"]
+    results = [
+        _moving_average(values, lengths, horizon),
+        _linear_trend(values, lengths, horizon),
+        _holt_winters(values, lengths, horizon),
+    ]
+
+    # Ошибка на один период вперед (только наблюдаемые периоды, кроме первого)
+    observed = ~np.isnan(values)
+    observed[:, 0] = False
+    counts = observed.sum(axis=1)
+    mae = np.stack([
+        np.where(observed, np.abs(np.nan_to_num(r["one_step"]) - np.nan_to_num(values)), 0.0).sum(axis=1)
+        / np.maximum(counts, 1)
+        for r in results
+    ])
+
+    # Короткая история: тренду и сезонности не на чем учиться
+    chosen = np.argmin(mae, axis=0)
+    chosen[lengths < MA_WINDOW] = MODELS.index("moving_average")
+
+    rows = np.arange(values.shape[0])
+    one_step_matrix = np.stack([r["one_step"] for r in results])[chosen, rows]
+    future = np.stack([r["future"] for r in results])[chosen, rows]
+
+    one_step = one_step_matrix[layout["row_company"], layout["row_position"]]
+    return {
+        "one_step": np.maximum(one_step, 0.0),
+        "company_ids": layout["company_ids"],
+        "model": [MODELS[i] for i in chosen],
+        "mae": np.where(counts > 0, mae[chosen, rows], np.nan),
+        "future": np.maximum(future, 0.0),
+    }
+
+
+# ============ Запись и кеш прогнозов ============
+
+
+def _fingerprints(db: Session, company_ids: Optional[List[UUID]]) -> Dict[UUID, str]:
+    """Отпечаток данных компании: количество периодов, сумма версий, последний период"""
+    stmt = select(
+        FinancialData.company_id,
+        func.count(),
+        func.sum(FinancialData.version),
+        func.max(FinancialData.period_start),
+    ).group_by(FinancialData.company_id)
+    if company_ids is not None:
+        stmt = stmt.where(FinancialData.company_id.in_(company_ids))
+
+    return {
+        company_id: f"{count}:{versions}:{last.isoformat()}"
+        for company_id, count, versions, last in db.execute(stmt).all()
+    }
+
+
+def _stale_companies(
+    db: Session,
+    company_ids: Optional[List[UUID]],
+    fingerprints: Dict[UUID, str],
+) -> List[UUID]:
+    """Компании, прогноз которых отсутствует или рассчитан по другим данным"""
+    stmt = select(RevenueForecast.company_id, RevenueForecast.data_fingerprint)
+    if company_ids is not None:
+        stmt = stmt.where(RevenueForecast.company_id.in_(company_ids))
+    stored = dict(db.execute(stmt).all())
+
+    stale = [cid for cid, fingerprint in fingerprints.items() if stored.get(cid) != fingerprint]
+    return sorted(stale, key=str)
+
+
+def _load_revenue(db: Session, company_ids: List[UUID]) -> Dict[str, List[Any]]:
+    stmt = (
+        select(
+            FinancialData.id,
+            FinancialData.company_id,
+            FinancialData.period_start,
+            FinancialData.revenue,
+        )
+        .where(FinancialData.company_id.in_(company_ids))
+        .order_by(FinancialData.company_id, FinancialData.period_start, FinancialData.id)
+    )
+    rows = db.execute(stmt).all()
+    names = ("id", "company_id", "period_start", "revenue")
+    if not rows:
+        return {name: [] for name in names}
+    return dict(zip(names, map(list, zip(*rows))))
+
+
+def _future_periods(period_starts: Sequence[datetime], horizon: int) -> List[datetime]:
+    """Начала следующих периодов: шаг - разница между двумя последними периодами"""
+    last = period_starts[-1]
+    step = 1
+    if len(period_starts) > 1:
+        previous = period_starts[-2]
+        step = max((last.year - previous.year) * 12 + last.month - previous.month, 1)
+    return [last + relativedelta(months=step * h) for h in range(1, horizon + 1)]
+
+
+def _write_forecasts(
+    db: Session,
+    columns: Dict[str, List[Any]],
+    result: Dict[str, Any],
+    fingerprints: Dict[UUID, str],
+) -> None:
+    one_step = result["one_step"]
+    db.execute(
+        update(CalculatedMetrics.__table__)
+        .where(CalculatedMetrics.__table__.c.financial_data_id == bindparam("b_financial_data_id"))
+        .values(revenue_forecast=bindparam("b_revenue_forecast")),
+        [
+            {
+                "b_financial_data_id": fd_id,
+                "b_revenue_forecast": None if np.isnan(value) else float(value),
+            }
+            for fd_id, value in zip(columns["id"], one_step.tolist())
+        ],
+    )
+
+    period_starts: Dict[UUID, List[datetime]] = {}
+    for company_id, period_start in zip(columns["company_id"], columns["period_start"]):
+        period_starts.setdefault(company_id, []).append(period_start)
+
+    now = datetime.utcnow()
+    records = []
+    for index, company_id in enumerate(result["company_ids"]):
+        starts = period_starts[company_id]
+        future = result["future"][index].tolist()
+        mae = result["mae"][index]
+        records.append({
+            "company_id": company_id,
+            "model": result["model"][index],
+            "mae": None if np.isnan(mae) else float(mae),
+            "periods_used": len(starts),
+            "forecast": [
+                {"period_start": start.isoformat(), "revenue": round(value, 2)}
+                for start, value in zip(_future_periods(starts, len(future)), future)
+            ],
+            "data_fingerprint": fingerprints[company_id],
+            "updated_at": now,
+        })
+
+    stmt = pg_insert(RevenueForecast)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[RevenueForecast.company_id],
+        set_={
+            name: stmt.excluded[name]
+            for name in ("model", "mae", "periods_used", "forecast", "data_fingerprint", "updated_at")
+        },
+    )
+    db.execute(stmt, records)
+
+
+def refresh_forecasts(
+    db: Session,
+    company_ids: Optional[Iterable[UUID]] = None,
+    force: bool = False,
+) -> List[UUID]:
+    """
+    Пересчет прогнозов компаний, у которых изменились данные
+
+    Вызывается после записи метрик (refresh_stale_metrics) и ночной
+    задачей по всем компаниям. Транзакцию коммитит вызывающий код.
+
+    Args:
+        company_ids: Компании (None - все)
+        force: Пересчитать даже если данные не менялись
+            (например после recalculate_company_metrics)
+
+    Returns:
+        Компании с пересчитанным прогнозом
+    """
+    if company_ids is not None:
+        company_ids = list(company_ids)
+        if not company_ids:
+            return []
+
+    fingerprints = _fingerprints(db, company_ids)
+    if force:
+        stale = sorted(fingerprints, key=str)
+    else:
+        stale = _stale_companies(db, company_ids, fingerprints)
+
+    for offset in range(0, len(stale), FORECAST_BATCH_SIZE):
+        batch = stale[offset:offset + FORECAST_BATCH_SIZE]
+        columns = _load_revenue(db, batch)
+        result = forecast_revenue_batch(columns["revenue"], columns["company_id"])
+        _write_forecasts(db, columns, result, fingerprints)
+
+    return stale
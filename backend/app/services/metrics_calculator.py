@@ -0,0 +1,575 @@
+"""
+Metrics Calculator Service
+
+FR-3.1: Калькулятор метрик
+
+Два режима расчета:
+- MetricsCalculator - расчет по одному периоду (один объект FinancialData)
+- calculate_metrics_batch - векторизованный расчет по N периодам сразу
+  (колонки FinancialData загружаются в NumPy массивы, все 13 метрик
+  считаются за один проход без ORM объектов)
+"""
+
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import delete, insert, or_, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.models.financial_data import FinancialData
+from app.models.calculated_metrics import CalculatedMetrics
+from app.services.snapshot_tombstones import record_tombstones
+
+# Колонки FinancialData, необходимые для расчета метрик
+FINANCIAL_COLUMNS = (
+    "revenue",
+    "cogs",
+    "gross_profit",
+    "operating_expenses",
+    "ebit",
+    "net_profit",
+    "current_assets",
+    "non_current_assets",
+    "current_liabilities",
+    "non_current_liabilities",
+    "equity",
+    "cash",
+    "receivables",
+    "inventory",
+)
+
+# Рассчитываемые метрики (колонки calculated_metrics)
+METRIC_COLUMNS = (
+    "revenue",
+    "gross_margin",
+    "ros",
+    "total_assets",
+    "roa",
+    "roe",
+    "current_ratio",
+    "quick_ratio",
+    "cash_ratio",
+    "autonomy_ratio",
+    "asset_turnover",
+    "net_working_capital",
+    "working_capital_ratio",
+)
+
+# Значение коэффициентов ликвидности при нулевых краткосрочных обязательствах
+# (практически бесконечная ликвидность)
+LIQUIDITY_CAP = 999.0
+
+# Пороги статусов: (good >=, warning >=), иначе "bad"
+# Совпадают с CalculatedMetrics._assess_* методами
+STATUS_THRESHOLDS = {
+    "gross_margin": (30.0, 20.0),
+    "ros": (10.0, 5.0),
+    "roa": (5.0, 2.0),
+    "roe": (15.0, 10.0),
+    "current_ratio": (1.5, 1.0),
+}
+
+# Колонка статуса в calculated_metrics для каждой оцениваемой метрики
+STATUS_COLUMNS = {
+    "gross_margin": "gross_margin_status",
+    "ros": "ros_status",
+    "roa": "roa_status",
+    "roe": "roe_status",
+    "current_ratio": "liquidity_status",
+}
+
+
+# Метрики в процентах: изменение между периодами считается в процентных пунктах,
+# для остальных - относительное изменение в %
+PERCENT_METRICS = ("gross_margin", "ros", "roa", "roe")
+
+
+def metric_change(metric: str, current: Optional[float], previous: Optional[float]) -> Optional[float]:
+    """Изменение метрики относительно предыдущего периода"""
+    if current is None or previous is None:
+        return None
+    if metric in PERCENT_METRICS:
+        return current - previous
+    if previous == 0:
+        return None
+    return (current - previous) / abs(previous) * 100
+
+
+def _safe_div(numerator: float, denominator: float, default: float = 0.0) -> float:
+    """Деление с защитой от нулевого знаменателя"""
+    if denominator == 0:
+        return default
+    return numerator / denominator
+
+
+def _assess(metric: str, value: float) -> str:
+    """Статус метрики по порогам STATUS_THRESHOLDS"""
+    good, warning = STATUS_THRESHOLDS[metric]
+    if value >= good:
+        return "good"
+    elif value >= warning:
+        return "warning"
+    return "bad"
+
+
+class MetricsCalculator:
+    """
+    Расчет финансовых показателей по одному периоду
+
+    Реализует все 11 метрик (+2 дополнительные) согласно requirements.md.
+    Если передан предыдущий период той же компании, ROA, ROE и
+    оборачиваемость активов считаются по средним значениям
+    (начало + конец) / 2.
+    """
+
+    def __init__(self, data: Any, previous: Optional[Any] = None):
+        self.data = data
+        self.previous = previous
+
+    def calculate_all(self) -> Dict[str, Any]:
+        """Рассчитывает все показатели и их статусы"""
+        data = self.data
+        total_assets = data.current_assets + data.non_current_assets
+        average_assets = total_assets
+        average_equity = data.equity
+
+        if self.previous is not None:
+            previous_assets = self.previous.current_assets + self.previous.non_current_assets
+            average_assets = (previous_assets + total_assets) / 2
+            average_equity = (self.previous.equity + data.equity) / 2
+
+        current_ratio = _safe_div(data.current_assets, data.current_liabilities, LIQUIDITY_CAP)
+
+        metrics = {
+            "revenue": data.revenue,
+            "gross_margin": _safe_div(data.gross_profit, data.revenue) * 100,
+            "ros": _safe_div(data.net_profit, data.revenue) * 100,
+            "total_assets": total_assets,
+            "roa": _safe_div(data.net_profit, average_assets) * 100,
+            "roe": _safe_div(data.net_profit, average_equity) * 100,
+            "current_ratio": current_ratio,
+            "quick_ratio": _safe_div(
+                data.current_assets - data.inventory, data.current_liabilities, LIQUIDITY_CAP
+            ),
+            "cash_ratio": _safe_div(data.cash, data.current_liabilities, LIQUIDITY_CAP),
+            "autonomy_ratio": _safe_div(data.equity, total_assets),
+            "asset_turnover": _safe_div(data.revenue, average_assets),
+            "net_working_capital": data.current_assets - data.current_liabilities,
+            "working_capital_ratio": current_ratio,
+        }
+
+        for metric, status_column in STATUS_COLUMNS.items():
+            metrics[status_column] = _assess(metric, metrics[metric])
+
+        return metrics
+
+
+def _vector_div(
+    numerator: np.ndarray,
+    denominator: np.ndarray,
+    default: float = 0.0,
+) -> np.ndarray:
+    """Поэлементное деление, default там где знаменатель равен нулю"""
+    result = np.full(numerator.shape, default, dtype=np.float64)
+    np.divide(numerator, denominator, out=result, where=denominator != 0)
+    return result
+
+
+def _vector_assess(metric: str, values: np.ndarray) -> np.ndarray:
+    """Векторизованная версия _assess"""
+    good, warning = STATUS_THRESHOLDS[metric]
+    return np.select(
+        [values >= good, values >= warning],
+        ["good", "warning"],
+        default="bad",
+    )
+
+
+def _same_company_as_previous(company_ids: Optional[Sequence[Any]], size: int) -> np.ndarray:
+    """
+    Маска: True если у строки i есть предыдущий период той же компании
+
+    Строки должны быть отсортированы по (company_id, period_start).
+    """
+    mask = np.zeros(size, dtype=bool)
+    if size < 2:
+        return mask
+
+    if company_ids is None:
+        # Все строки - одна компания
+        mask[1:] = True
+        return mask
+
+    ids = np.asarray(company_ids, dtype=object)
+    mask[1:] = ids[1:] == ids[:-1]
+    return mask
+
+
+def _average_with_previous(values: np.ndarray, has_previous: np.ndarray) -> np.ndarray:
+    """
+    Среднее значение за период: (начало + конец) / 2
+
+    Началом периода считается конец предыдущего периода той же компании
+    (сдвинутый массив). Для первого периода компании берется текущее значение.
+    """
+    shifted = np.empty_like(values)
+    shifted[0] = values[0]
+    shifted[1:] = values[:-1]
+    return np.where(has_previous, (shifted + values) / 2, values)
+
+
+def calculate_metrics_batch(
+    columns: Mapping[str, Sequence[float]],
+    company_ids: Optional[Sequence[Any]] = None,
+) -> Dict[str, np.ndarray]:
+    """
+    Векторизованный расчет метрик по N периодам
+
+    Args:
+        columns: Колонки FinancialData (FINANCIAL_COLUMNS) - массивы длины N
+        company_ids: company_id каждой строки. Строки должны быть
+            отсортированы по (company_id, period_start), чтобы средние
+            активы/капитал брались по соседним периодам одной компании.
+            None - все строки относятся к одной компании.
+
+    Returns:
+        dict: метрика -> массив длины N (METRIC_COLUMNS + колонки статусов)
+    """
+    data = {name: np.asarray(columns[name], dtype=np.float64) for name in FINANCIAL_COLUMNS}
+    size = data["revenue"].shape[0]
+    if size == 0:
+        empty = {name: np.empty(0, dtype=np.float64) for name in METRIC_COLUMNS}
+        empty.update({column: np.empty(0, dtype=object) for column in STATUS_COLUMNS.values()})
+        return empty
+
+    revenue = data["revenue"]
+    net_profit = data["net_profit"]
+    current_assets = data["current_assets"]
+    current_liabilities = data["current_liabilities"]
+    equity = data["equity"]
+
+    total_assets = current_assets + data["non_current_assets"]
+    has_previous = _same_company_as_previous(company_ids, size)
+    average_assets = _average_with_previous(total_assets, has_previous)
+    average_equity = _average_with_previous(equity, has_previous)
+
+    current_ratio = _vector_div(current_assets, current_liabilities, LIQUIDITY_CAP)
+
+    metrics = {
+        "revenue": revenue,
+        "gross_margin": _vector_div(data["gross_profit"], revenue) * 100,
+        "ros": _vector_div(net_profit, revenue) * 100,
+        "total_assets": total_assets,
+        "roa": _vector_div(net_profit, average_assets) * 100,
+        "roe": _vector_div(net_profit, average_equity) * 100,
+        "current_ratio": current_ratio,
+        "quick_ratio": _vector_div(
+            current_assets - data["inventory"], current_liabilities, LIQUIDITY_CAP
+        ),
+        "cash_ratio": _vector_div(data["cash"], current_liabilities, LIQUIDITY_CAP),
+        "autonomy_ratio": _vector_div(equity, total_assets),
+        "asset_turnover": _vector_div(revenue, average_assets),
+        "net_working_capital": current_assets - current_liabilities,
+        "working_capital_ratio": current_ratio,
+    }
+
+    for metric, status_column in STATUS_COLUMNS.items():
+        metrics[status_column] = _vector_assess(metric, metrics[metric])
+
+    return metrics
+
+
+def metrics_to_records(
+    metrics: Mapping[str, np.ndarray],
+    keys: Mapping[str, Sequence[Any]],
+) -> List[Dict[str, Any]]:
+    """
+    Преобразование результата calculate_metrics_batch в список dict
+    для bulk insert в calculated_metrics
+
+    Args:
+        metrics: Результат calculate_metrics_batch
+        keys: Остальные колонки calculated_metrics по строкам
+            (financial_data_id, company_id, source_version, period_start)
+    """
+    names = list(METRIC_COLUMNS) + list(STATUS_COLUMNS.values()) + list(keys)
+    values = [metrics[name].tolist() for name in METRIC_COLUMNS]
+    values += [metrics[name].tolist() for name in STATUS_COLUMNS.values()]
+    values += [list(column) for column in keys.values()]
+
+    return [dict(zip(names, row)) for row in zip(*values)]
+
+
+def _record_keys(columns: Mapping[str, Any], indexes: Optional[Sequence[int]] = None) -> Dict[str, List[Any]]:
+    """Ключевые колонки calculated_metrics из колонок FinancialData"""
+    mapping = {
+        "financial_data_id": "id",
+        "company_id": "company_id",
+        "source_version": "version",
+        "period_start": "period_start",
+    }
+    if indexes is None:
+        return {target: list(columns[source]) for target, source in mapping.items()}
+    return {
+        target: [columns[source][i] for i in indexes]
+        for target, source in mapping.items()
+    }
+
+
+def _financial_columns_select():
+    return select(
+        FinancialData.id,
+        FinancialData.company_id,
+        FinancialData.version,
+        FinancialData.period_start,
+        *[getattr(FinancialData, name) for name in FINANCIAL_COLUMNS],
+    )
+
+
+def _rows_to_columns(rows: Sequence[Any]) -> Dict[str, Any]:
+    """Строки _financial_columns_select -> колонки"""
+    if not rows:
+        result: Dict[str, Any] = {"id": [], "company_id": [], "version": [], "period_start": []}
+        result.update({name: np.empty(0, dtype=np.float64) for name in FINANCIAL_COLUMNS})
+        return result
+
+    transposed = list(zip(*rows))
+    result = {
+        "id": list(transposed[0]),
+        "company_id": list(transposed[1]),
+        "version": list(transposed[2]),
+        "period_start": list(transposed[3]),
+    }
+    for index, name in enumerate(FINANCIAL_COLUMNS, start=4):
+        result[name] = np.array(transposed[index], dtype=np.float64)
+    return result
+
+
+def load_financial_columns(
+    db: Session,
+    company_ids: Optional[Iterable[UUID]] = None,
+) -> Dict[str, Any]:
+    """
+    Загрузка колонок FinancialData без создания ORM объектов
+
+    Returns:
+        dict с ключами "id", "company_id", "version", "period_start" (списки) и
+        FINANCIAL_COLUMNS (NumPy массивы), отсортированный по
+        (company_id, period_start)
+    """
+    stmt = _financial_columns_select().order_by(
+        FinancialData.company_id, FinancialData.period_start, FinancialData.id
+    )
+
+    if company_ids is not None:
+        stmt = stmt.where(FinancialData.company_id.in_(list(company_ids)))
+
+    return _rows_to_columns(db.execute(stmt).all())
+
+
+def _upsert_metrics(db: Session, records: List[Dict[str, Any]]) -> None:
+    """
+    Insert или update calculated_metrics по financial_data_id
+
+    revenue_forecast не перезаписывается (его считает отдельный сервис).
+    """
+    if not records:
+        return
+
+    stmt = pg_insert(CalculatedMetrics)
+    updated = [name for name in records[0] if name not in ("financial_data_id", "company_id")]
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[CalculatedMetrics.financial_data_id],
+        set_={name: stmt.excluded[name] for name in updated + ["updated_at"]},
+    )
+    db.execute(stmt, records)
+
+
+def recalculate_company_metrics(db: Session, company_ids: Iterable[UUID]) -> int:
+    """
+    Полный пересчет calculated_metrics для компаний одним проходом
+
+    Старые метрики компаний удаляются и записываются заново bulk insert'ом
+    (с новыми id - старые строки отмечаются для снимков, см.
+    app.services.snapshot_tombstones). Нужен после изменения формул; при
+    изменении отдельных периодов достаточно refresh_stale_metrics.
+    Транзакцию коммитит вызывающий код.
+
+    Returns:
+        Количество записанных строк calculated_metrics
+    """
+    company_ids = list(company_ids)
+    if not company_ids:
+        return 0
+
+    columns = load_financial_columns(db, company_ids)
+    metrics = calculate_metrics_batch(columns, columns["company_id"])
+    records = metrics_to_records(metrics, _record_keys(columns))
+
+    updated_at = record_tombstones(db, company_ids, ("calculated_metrics",))
+    db.execute(delete(CalculatedMetrics).where(CalculatedMetrics.company_id.in_(company_ids)))
+    if records:
+        for record in records:
+            record["updated_at"] = updated_at
+        db.execute(insert(CalculatedMetrics), records)
+
+    return len(records)
+
+
+# ============ Инкрементальный пересчет ============
+#
+# Метрики периода зависят от соседних периодов той же компании:
+# ROA, ROE, оборачиваемость активов - от предыдущего периода (средние значения),
+# поэтому изменение периода затрагивает его метрики и метрики
+# DEPENDENT_PERIODS следующих периодов.
+# revenue_forecast зависит от всей истории компании и пересчитывается
+# отдельно (app.services.forecast_service.refresh_forecasts).
+
+AVERAGE_DEPENDENCY_DEPTH = 1
+DEPENDENT_PERIODS = AVERAGE_DEPENDENCY_DEPTH
+
+
+def _load_window(
+    db: Session,
+    company_id: UUID,
+    period_start: datetime,
+    limit: int,
+) -> Dict[str, Any]:
+    """
+    Колонки limit периодов компании начиная с period_start плюс один
+    предыдущий период - для средних активов/капитала
+
+    Обе выборки - range scan по uq_financial_data_company_period
+    с LIMIT, объем чтения не зависит от длины истории.
+    Первая строка результата - предыдущий период, если он есть
+    (отмечен в "has_previous").
+    """
+    previous_stmt = (
+        _financial_columns_select()
+        .where(FinancialData.company_id == company_id, FinancialData.period_start < period_start)
+        .order_by(FinancialData.period_start.desc(), FinancialData.id.desc())
+        .limit(1)
+    )
+    window_stmt = (
+        _financial_columns_select()
+        .where(FinancialData.company_id == company_id, FinancialData.period_start >= period_start)
+        .order_by(FinancialData.period_start, FinancialData.id)
+        .limit(limit)
+    )
+
+    previous = db.execute(previous_stmt).all()
+    columns = _rows_to_columns(previous + db.execute(window_stmt).all())
+    columns["has_previous"] = bool(previous)
+    return columns
+
+
+def _write_window(db: Session, columns: Dict[str, Any], affected: np.ndarray) -> int:
+    """Пересчет окна и upsert метрик только затронутых строк"""
+    metrics = calculate_metrics_batch(columns)
+    indexes = np.flatnonzero(affected)
+    if indexes.size == 0:
+        return 0
+
+    records = metrics_to_records(
+        {name: values[indexes] for name, values in metrics.items()},
+        _record_keys(columns, indexes),
+    )
+    _upsert_metrics(db, records)
+    return len(records)
+
+
+def _stale_periods(db: Session, company_ids: List[UUID]) -> Dict[UUID, List[Any]]:
+    """
+    Периоды компаний (id, period_start по возрастанию), у которых метрики
+    устарели: метрик нет или они рассчитаны по другой версии FinancialData
+
+    Читаются только ключевые колонки (без финансовых показателей).
+    """
+    stmt = (
+        select(FinancialData.company_id, FinancialData.id, FinancialData.period_start)
+        .outerjoin(CalculatedMetrics, CalculatedMetrics.financial_data_id == FinancialData.id)
+        .where(
+            FinancialData.company_id.in_(company_ids),
+            or_(
+                CalculatedMetrics.id.is_(None),
+                CalculatedMetrics.source_version.is_(None),
+                CalculatedMetrics.source_version != FinancialData.version,
+            ),
+        )
+        .order_by(FinancialData.company_id, FinancialData.period_start, FinancialData.id)
+    )
+    stale: Dict[UUID, List[Any]] = {}
+    for company_id, fd_id, period_start in db.execute(stmt).all():
+        stale.setdefault(company_id, []).append((fd_id, period_start))
+    return stale
+
+
+def _with_dependents(stale: np.ndarray) -> np.ndarray:
+    """Добавить к устаревшим строкам DEPENDENT_PERIODS следующих за каждой"""
+    affected = stale.copy()
+    for shift in range(1, DEPENDENT_PERIODS + 1):
+        affected[shift:] |= stale[:-shift]
+    return affected
+
+
+def _refresh_company(db: Session, company_id: UUID, periods: List[Any]) -> int:
+    """
+    Пересчет устаревших периодов компании окнами ограниченного размера
+
+    Окно начинается с первого необработанного устаревшего периода и
+    вмещает все оставшиеся устаревшие периоды плюс DEPENDENT_PERIODS
+    (при добавлении месяцев в конец истории - одно окно). Если последние
+    DEPENDENT_PERIODS строк полного окна устарели, окно расширяется, чтобы
+    их зависимые периоды тоже попали в пересчет. Периоды между
+    разнесенными по истории изменениями не читаются.
+    """
+    stale_ids = {fd_id for fd_id, _ in periods}
+    starts = [period_start for _, period_start in periods]
+    updated = 0
+    position = 0
+    while position < len(starts):
+        limit = len(starts) - position + DEPENDENT_PERIODS
+        while True:
+            columns = _load_window(db, company_id, starts[position], limit)
+            stale = np.array([fd_id in stale_ids for fd_id in columns["id"]], dtype=bool)
+            window = stale[1:] if columns["has_previous"] else stale
+            tail = np.flatnonzero(window[-DEPENDENT_PERIODS:])
+            if len(window) < limit or tail.size == 0:
+                break
+            limit += int(tail[-1]) + 1
+
+        affected = _with_dependents(stale)
+        if columns["has_previous"]:
+            affected[0] = False
+        updated += _write_window(db, columns, affected)
+
+        last_start = columns["period_start"][-1]
+        while position < len(starts) and starts[position] <= last_start:
+            position += 1
+    return updated
+
+
+def refresh_stale_metrics(db: Session, company_ids: Iterable[UUID]) -> int:
+    """
+    Инкрементальный пересчет после загрузки новых/измененных периодов
+
+    Устаревшие строки определяются по FinancialData.version (source_version
+    в calculated_metrics). Финансовые колонки читаются только для устаревших
+    периодов, предыдущего к ним и DEPENDENT_PERIODS следующих
+    (см. _refresh_company) - объем чтения растет с числом изменений,
+    а не с длиной истории.
+
+    Returns:
+        Количество обновленных строк calculated_metrics
+    """
+    company_ids = list(company_ids)
+    if not company_ids:
+        return 0
+
+    return sum(
+        _refresh_company(db, company_id, periods)
+        for company_id, periods in _stale_periods(db, company_ids).items()
+    )
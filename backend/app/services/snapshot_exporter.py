@@ -0,0 +1,320 @@
+"""
+Snapshot Exporter
+
+Колоночные снимки financial_data и calculated_metrics (Parquet) для
+аналитики, чтобы тяжелые сканы по всем компаниям не шли в PostgreSQL.
+
+Структура SNAPSHOT_DIR (hive партиционирование):
+
+    financial_data/industry=trade/period_month=2024-10/part-<run>-<chunk>-0.parquet
+    calculated_metrics/industry=it/period_month=2024-10/...
+    _tombstones/part-<run>-0.parquet - удаления (SnapshotTombstone)
+    _snapshot_state.json   - граница последней выгрузки по таблицам
+
+Каждый запуск дописывает только строки с updated_at новее прошлой
+выгрузки, поэтому обновленная строка может встречаться в нескольких
+файлах - актуальная версия: последняя по updated_at для данного id.
+Удаление компании, полный пересчет ее метрик и смена отрасли
+записываются отметкой (table_name, company_id, deleted_at): строки
+компании с updated_at <= deleted_at устарели. read_snapshot применяет
+оба правила.
+
+Граница выгрузки (until) - по коммитам, а не по времени запуска:
+updated_at выставляется при flush, а транзакция (загрузка файла,
+пересчет метрик) может закоммитить его намного позже. Поэтому until не
+позже начала самой старой незавершенной пишущей транзакции
+(pg_stat_activity) - все строки с updated_at <= until уже видны.
+
+Чтение:
+    from app.services.snapshot_exporter import read_snapshot
+    read_snapshot("calculated_metrics", "/data/snapshots")
+"""
+
+import json
+import os
+import uuid
+from datetime import datetime, timedelta
+from enum import Enum
+from typing import Any, Dict, List, Optional, Sequence
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as pa_dataset
+from sqlalchemy import DateTime, Float, Integer, select, text
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.company import Company
+from app.models.snapshot_tombstone import SnapshotTombstone
+from app.services.snapshot_tombstones import SNAPSHOT_TABLES
+
+STATE_FILE = "_snapshot_state.json"
+
+TOMBSTONES = "_tombstones"
+
+PARTITION_COLUMNS = ["industry", "period_month"]
+
+# Запас на расхождение часов API/worker и PostgreSQL и на время между
+# вычислением updated_at и первой записью транзакции
+SNAPSHOT_SAFETY_LAG = timedelta(minutes=1)
+
+# Начало самой старой транзакции, уже записавшей строки (backend_xid),
+# кроме текущей; UTC без часового пояса, как updated_at
+_OLDEST_WRITER_SQL = text(
+    "SELECT min(xact_start) AT TIME ZONE 'UTC' FROM pg_stat_activity "
+    "WHERE datname = current_database() AND backend_xid IS NOT NULL "
+    "AND pid <> pg_backend_pid()"
+)
+
+TOMBSTONE_SCHEMA = pa.schema([
+    pa.field("table_name", pa.string()),
+    pa.field("company_id", pa.string()),
+    pa.field("deleted_at", pa.timestamp("us")),
+])
+
+
+def _arrow_type(column) -> pa.DataType:
+    if isinstance(column.type, UUID):
+        return pa.string()
+    if isinstance(column.type, DateTime):
+        return pa.timestamp("us")
+    if isinstance(column.type, Float):
+        return pa.float64()
+    if isinstance(column.type, Integer):
+        return pa.int64()
+    return pa.string()
+
+
+def _arrow_schema(columns: Sequence[Any]) -> pa.Schema:
+    fields = [pa.field(column.name, _arrow_type(column)) for column in columns]
+    fields += [
+        pa.field("size", pa.string()),
+        pa.field("industry", pa.string()),
+        pa.field("period_month", pa.string()),
+    ]
+    return pa.schema(fields)
+
+
+def _to_arrow(value: Any) -> Any:
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, Enum):
+        return value.value
+    return value
+
+
+def _chunk_to_table(rows: Sequence[Any], names: List[str], schema: pa.Schema) -> pa.Table:
+    """Строки запроса -> Arrow таблица (по колонкам, без промежуточных dict на строку)"""
+    transposed = list(zip(*rows))
+    data = {}
+    for name, values in zip(names + ["industry", "size"], transposed):
+        data[name] = [_to_arrow(value) for value in values]
+
+    data["period_month"] = [
+        start.strftime("%Y-%m") if start is not None else "unknown"
+        for start in data["period_start"]
+    ]
+    return pa.Table.from_pydict({field.name: data[field.name] for field in schema}, schema=schema)
+
+
+def _load_state(directory: str) -> Dict[str, str]:
+    path = os.path.join(directory, STATE_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _save_state(directory: str, state: Dict[str, str]) -> None:
+    """Атомарная запись состояния (через временный файл)"""
+    path = os.path.join(directory, STATE_FILE)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def export_table(
+    db: Session,
+    name: str,
+    directory: str,
+    since: Optional[datetime],
+    until: datetime,
+    chunk_size: int,
+) -> int:
+    """
+    Выгрузка строк таблицы с since < updated_at <= until
+
+    Строки читаются потоково (yield_per) и пишутся пачками по chunk_size,
+    память не зависит от размера таблицы.
+
+    Returns:
+        Количество выгруженных строк
+    """
+    model = SNAPSHOT_TABLES[name]
+    columns = list(model.__table__.columns)
+    names = [column.name for column in columns]
+    schema = _arrow_schema(columns)
+
+    stmt = (
+        select(*columns, Company.industry, Company.size)
+        .join(Company, Company.id == model.company_id)
+        .where(model.updated_at <= until)
+        .order_by(model.updated_at)
+    )
+    if since is not None:
+        stmt = stmt.where(model.updated_at > since)
+
+    run_id = until.strftime("%Y%m%dT%H%M%S%f")
+    exported = 0
+    result = db.execute(stmt, execution_options={"yield_per": chunk_size})
+    for chunk_number, rows in enumerate(result.partitions()):
+        pa_dataset.write_dataset(
+            _chunk_to_table(rows, names, schema),
+            base_dir=os.path.join(directory, name),
+            format="parquet",
+            partitioning=PARTITION_COLUMNS,
+            partitioning_flavor="hive",
+            basename_template=f"part-{run_id}-{chunk_number}-{{i}}.parquet",
+            existing_data_behavior="overwrite_or_ignore",
+        )
+        exported += len(rows)
+    return exported
+
+
+def export_tombstones(db: Session, directory: str, since: Optional[datetime], until: datetime) -> int:
+    """Выгрузка отметок об удалении с since < deleted_at <= until"""
+    stmt = (
+        select(SnapshotTombstone.table_name, SnapshotTombstone.company_id, SnapshotTombstone.deleted_at)
+        .where(SnapshotTombstone.deleted_at <= until)
+        .order_by(SnapshotTombstone.deleted_at)
+    )
+    if since is not None:
+        stmt = stmt.where(SnapshotTombstone.deleted_at > since)
+
+    rows = db.execute(stmt).all()
+    if not rows:
+        return 0
+    table_names, company_ids, deleted_at = zip(*rows)
+    table = pa.Table.from_pydict(
+        {
+            "table_name": list(table_names),
+            "company_id": [str(company_id) for company_id in company_ids],
+            "deleted_at": list(deleted_at),
+        },
+        schema=TOMBSTONE_SCHEMA,
+    )
+    pa_dataset.write_dataset(
+        table,
+        base_dir=os.path.join(directory, TOMBSTONES),
+        format="parquet",
+        basename_template=f"part-{until.strftime('%Y%m%dT%H%M%S%f')}-{{i}}.parquet",
+        existing_data_behavior="overwrite_or_ignore",
+    )
+    return len(rows)
+
+
+def commit_watermark(db: Session) -> datetime:
+    """
+    Граница выгрузки: все строки с updated_at <= результата закоммичены
+
+    Незакоммиченная строка принадлежит транзакции, начатой не позже ее
+    updated_at, поэтому граница - начало самой старой пишущей транзакции.
+    pg_stat_activity показывает xact_start сессий той же роли, что у
+    API и worker (общая роль БД).
+    """
+    watermark = datetime.utcnow()
+    oldest_writer = db.execute(_OLDEST_WRITER_SQL).scalar()
+    if oldest_writer is not None:
+        watermark = min(watermark, oldest_writer)
+    return watermark - SNAPSHOT_SAFETY_LAG
+
+
+def export_snapshots(
+    db: Session,
+    directory: Optional[str] = None,
+    full: bool = False,
+) -> Dict[str, int]:
+    """
+    Инкрементальная выгрузка всех таблиц снимка и отметок об удалении
+
+    Args:
+        directory: Каталог снимков (по умолчанию settings.SNAPSHOT_DIR)
+        full: Игнорировать состояние и выгрузить все строки
+
+    Returns:
+        dict: таблица -> количество выгруженных строк
+    """
+    directory = directory or settings.SNAPSHOT_DIR
+    os.makedirs(directory, exist_ok=True)
+
+    state = {} if full else _load_state(directory)
+    until = commit_watermark(db)
+
+    exported = {}
+    for name in (*SNAPSHOT_TABLES, TOMBSTONES):
+        since = datetime.fromisoformat(state[name]) if name in state else None
+        if since is not None and until <= since:
+            # Граница не сдвинулась (долгая незавершенная транзакция)
+            exported[name] = 0
+            continue
+        if name == TOMBSTONES:
+            exported[name] = export_tombstones(db, directory, since, until)
+        else:
+            exported[name] = export_table(
+                db, name, directory, since, until, settings.SNAPSHOT_CHUNK_SIZE
+            )
+        # Состояние сохраняется после каждой таблицы: при сбое следующий
+        # запуск продолжит с нее, не повторяя уже выгруженные
+        state[name] = until.isoformat()
+        _save_state(directory, state)
+
+    return exported
+
+
+def _latest_versions(table: pa.Table) -> pa.Table:
+    """Последняя по updated_at версия каждой строки (по id)"""
+    if table.num_rows == 0:
+        return table
+    table = table.sort_by([("id", "ascending"), ("updated_at", "descending")])
+    ids = table["id"].combine_chunks()
+    first = pa.concat_arrays([pa.array([True]), pc.not_equal(ids[1:], ids[:-1])])
+    return table.filter(first)
+
+
+def read_snapshot(
+    name: str,
+    directory: Optional[str] = None,
+    filter: Optional[pc.Expression] = None,
+) -> pa.Table:
+    """
+    Актуальные строки таблицы снимка
+
+    Отбрасываются строки, устаревшие по отметкам об удалении (в том числе
+    копии в партиции прежней отрасли), из оставшихся версий строки берется
+    последняя по updated_at.
+
+    Args:
+        filter: Фильтр pyarrow.dataset (например, по industry - партиции)
+    """
+    directory = directory or settings.SNAPSHOT_DIR
+    table = pa_dataset.dataset(
+        os.path.join(directory, name), format="parquet", partitioning="hive"
+    ).to_table(filter=filter)
+
+    tombstones_dir = os.path.join(directory, TOMBSTONES)
+    if os.path.isdir(tombstones_dir):
+        tombstones = (
+            pa_dataset.dataset(tombstones_dir, format="parquet", schema=TOMBSTONE_SCHEMA)
+            .to_table(filter=pc.field("table_name") == name)
+            .group_by("company_id")
+            .aggregate([("deleted_at", "max")])
+        )
+        if tombstones.num_rows:
+            joined = table.join(tombstones, "company_id", join_type="left outer")
+            deleted_at = joined["deleted_at_max"]
+            keep = pc.or_kleene(pc.is_null(deleted_at), pc.greater(joined["updated_at"], deleted_at))
+            table = joined.filter(keep).drop_columns(["deleted_at_max"])
+
+    return _latest_versions(table)
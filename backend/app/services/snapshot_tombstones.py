@@ -0,0 +1,69 @@
+"""
+Snapshot Tombstones
+
+Отметки об удалении строк для Parquet снимков (см. app.services.snapshot_exporter
+и SnapshotTombstone). Без pyarrow - вызывается из API и пересчета метрик.
+
+Для AsyncSession: await db.run_sync(record_tombstones, company_ids)
+"""
+
+from datetime import datetime, timedelta
+from typing import Iterable, Sequence
+from uuid import UUID
+
+from sqlalchemy import insert, update
+from sqlalchemy.orm import Session
+
+from app.models.calculated_metrics import CalculatedMetrics
+from app.models.financial_data import FinancialData
+from app.models.snapshot_tombstone import SnapshotTombstone
+
+# Таблицы снимка (с company_id и updated_at); при выгрузке к строкам
+# добавляются industry и size компании
+SNAPSHOT_TABLES = {
+    "financial_data": FinancialData,
+    "calculated_metrics": CalculatedMetrics,
+}
+
+
+def record_tombstones(
+    db: Session,
+    company_ids: Iterable[UUID],
+    tables: Sequence[str] = tuple(SNAPSHOT_TABLES),
+) -> datetime:
+    """
+    Отметить все текущие строки компаний в таблицах снимка как устаревшие
+
+    Returns:
+        Время, строго после которого должны быть updated_at строк,
+        записанных заново в той же транзакции
+    """
+    deleted_at = datetime.utcnow()
+    records = [
+        {"table_name": table, "company_id": company_id, "deleted_at": deleted_at}
+        for company_id in company_ids
+        for table in tables
+    ]
+    if records:
+        db.execute(insert(SnapshotTombstone), records)
+    return deleted_at + timedelta(microseconds=1)
+
+
+def reexport_companies(db: Session, company_ids: Iterable[UUID]) -> None:
+    """
+    После смены отрасли/размера: старые строки компаний в снимке устарели,
+    текущие получают новый updated_at и выгружаются заново в партицию новой
+    отрасли (version не меняется - метрики не пересчитываются)
+    """
+    company_ids = list(company_ids)
+    if not company_ids:
+        return
+
+    updated_at = record_tombstones(db, company_ids)
+    for model in SNAPSHOT_TABLES.values():
+        db.execute(
+            update(model)
+            .where(model.company_id.in_(company_ids))
+            .values(updated_at=updated_at)
+            .execution_options(synchronize_session=False)
+        )
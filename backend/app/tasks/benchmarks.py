@@ -0,0 +1,69 @@
+"""
+Benchmark tasks
+
+FR-3.1: Бенчмарки по отраслям
+
+Скетчи обновляются инкрементально задачей benchmarks.refresh после записи
+метрик, изменения или удаления компании: строки скетчей блокируются
+только на время короткой транзакции задачи, а не загрузки целиком.
+
+Полная перестройка нужна при первом развертывании или после изменения
+точности скетча:
+
+```bash
+celery -A app.core.celery_app call benchmarks.rebuild
+```
+"""
+
+from typing import Dict, Iterable, List
+from uuid import UUID
+
+from celery.utils.log import get_task_logger
+
+from app.core.celery_app import celery_app
+from app.core.database import SessionLocal
+from app.services.benchmark_service import rebuild_benchmarks, refresh_benchmarks
+
+logger = get_task_logger(__name__)
+
+
+@celery_app.task(name="benchmarks.refresh")
+def refresh_company_benchmarks(company_ids: List[str]) -> Dict[str, int]:
+    """Обновить вклад компаний в скетчи"""
+    db = SessionLocal()
+    try:
+        companies = refresh_benchmarks(db, [UUID(company_id) for company_id in company_ids])
+        db.commit()
+    except Exception:
+        db.rollback()
+        logger.exception("Benchmark refresh failed")
+        raise
+    finally:
+        db.close()
+
+    return {"companies_updated": companies}
+
+
+def enqueue_benchmarks(company_ids: Iterable[UUID]) -> None:
+    """Поставить обновление скетчей в очередь (после commit данных компаний)"""
+    company_ids = sorted(str(company_id) for company_id in company_ids)
+    if company_ids:
+        refresh_company_benchmarks.delay(company_ids)
+
+
+@celery_app.task(name="benchmarks.rebuild")
+def rebuild_all_benchmarks() -> Dict[str, int]:
+    """Перестроить скетчи всех сегментов по последним периодам компаний"""
+    db = SessionLocal()
+    try:
+        companies = rebuild_benchmarks(db)
+        db.commit()
+    except Exception:
+        db.rollback()
+        logger.exception("Benchmark rebuild failed")
+        raise
+    finally:
+        db.close()
+
+    logger.info("Benchmarks rebuilt: %d companies", companies)
+    return {"companies": companies}
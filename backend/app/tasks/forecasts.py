@@ -0,0 +1,61 @@
+"""
+Forecast tasks
+
+FR-3.1: Выручка и прогноз выручки
+
+Ночной пересчет прогнозов выручки (celery beat, см. app.core.celery_app)
+и пересчет после массового импорта (forecasts.refresh).
+Пересчитываются только компании, у которых изменились данные.
+"""
+
+from typing import Dict, Iterable, List, Optional
+from uuid import UUID
+
+from celery.utils.log import get_task_logger
+
+from app.core.cache import invalidate_company_sync
+from app.core.celery_app import celery_app
+from app.core.database import SessionLocal
+from app.services.forecast_service import refresh_forecasts
+
+logger = get_task_logger(__name__)
+
+
+def _refresh(company_ids: Optional[List[UUID]]) -> List[UUID]:
+    db = SessionLocal()
+    try:
+        company_ids = refresh_forecasts(db, company_ids)
+        db.commit()
+    except Exception:
+        db.rollback()
+        logger.exception("Forecast refresh failed")
+        raise
+    finally:
+        db.close()
+
+    # revenue_forecast входит в закешированные ответы метрик
+    for company_id in company_ids:
+        invalidate_company_sync(company_id)
+    return company_ids
+
+
+@celery_app.task(name="forecasts.refresh")
+def refresh_company_forecasts(company_ids: List[str]) -> Dict[str, int]:
+    """Пересчет устаревших прогнозов компаний"""
+    company_ids = _refresh([UUID(company_id) for company_id in company_ids])
+    return {"companies_updated": len(company_ids)}
+
+
+def enqueue_forecasts(company_ids: Iterable[UUID]) -> None:
+    """Поставить пересчет прогнозов в очередь (после commit данных компаний)"""
+    company_ids = sorted(str(company_id) for company_id in company_ids)
+    if company_ids:
+        refresh_company_forecasts.delay(company_ids)
+
+
+@celery_app.task(name="forecasts.refresh_all")
+def refresh_all_forecasts() -> Dict[str, int]:
+    """Пересчет устаревших прогнозов всех компаний"""
+    company_ids = _refresh(None)
+    logger.info("Forecasts refreshed: %d companies", len(company_ids))
+    return {"companies_updated": len(company_ids)}
@@ -0,0 +1,33 @@
+"""
+Snapshot tasks
+
+Ежечасная инкрементальная выгрузка financial_data и calculated_metrics
+в Parquet (celery beat, см. app.core.celery_app и
+app.services.snapshot_exporter).
+"""
+
+from typing import Dict
+
+from celery.utils.log import get_task_logger
+
+from app.core.celery_app import celery_app
+from app.core.database import SessionLocal
+from app.services.snapshot_exporter import export_snapshots
+
+logger = get_task_logger(__name__)
+
+
+@celery_app.task(name="snapshots.export")
+def export_snapshots_task(full: bool = False) -> Dict[str, int]:
+    """Выгрузка строк, измененных после прошлого снимка (full - всех строк)"""
+    db = SessionLocal()
+    try:
+        exported = export_snapshots(db, full=full)
+    except Exception:
+        logger.exception("Snapshot export failed")
+        raise
+    finally:
+        db.close()
+
+    logger.info("Snapshots exported: %s", exported)
+    return exported
@@ -0,0 +1,188 @@
+"""
+Upload processing tasks
+
+FR-2.1: Загрузка Excel/CSV файлов
+
+Парсинг файла, валидация строк (FinancialDataCreate) и пересчет метрик
+выполняются в Celery worker, API только ставит задачу в очередь.
+"""
+
+import os
+import uuid
+from typing import Any, Dict, Mapping, Optional, Tuple
+from uuid import UUID
+
+from celery import states
+from celery.exceptions import Ignore
+from celery.result import AsyncResult
+from celery.utils.log import get_task_logger
+
+from app.core.cache import get_sync_redis, invalidate_company_sync
+from app.core.celery_app import celery_app
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.schemas.job import JobStatus
+from app.schemas.upload import UploadResult
+from app.services.file_processor import FileFormatError, ingest_file
+from app.services.financial_data_service import refresh_derived_data
+from app.tasks.benchmarks import enqueue_benchmarks
+
+logger = get_task_logger(__name__)
+
+# Собственные состояния задачи (в дополнение к стандартным Celery)
+QUEUED = "QUEUED"
+PROGRESS = "PROGRESS"
+FAILED = "FAILED"
+
+# Состояние Celery -> статус задачи в API
+JOB_STATUSES = {
+    QUEUED: "queued",
+    states.PENDING: "queued",
+    states.RECEIVED: "queued",
+    states.STARTED: "processing",
+    PROGRESS: "processing",
+    states.SUCCESS: "completed",
+    FAILED: "failed",
+    states.FAILURE: "failed",
+    states.REVOKED: "failed",
+}
+
+
+def _owner_key(job_id: str) -> str:
+    return f"job-owner:{job_id}"
+
+
+def _progress(result: UploadResult) -> Dict[str, int]:
+    return {
+        "rows_total": result.rows_total,
+        "rows_imported": result.rows_imported,
+        "rows_failed": result.rows_failed,
+    }
+
+
+@celery_app.task(bind=True, name="uploads.process_upload")
+def process_upload(
+    self,
+    path: str,
+    filename: str,
+    file_type: str,
+    company_id: Optional[str] = None,
+    companies_by_inn: Optional[Mapping[str, str]] = None,
+) -> Dict[str, Any]:
+    """
+    Обработка загруженного файла
+
+    Прогресс (количество строк) публикуется в result backend после
+    каждой пачки, его отдает GET /api/v1/jobs/{job_id}.
+    """
+    meta: Dict[str, Any] = {"stage": "parsing"}
+
+    def report(result: UploadResult) -> None:
+        meta.update(_progress(result))
+        self.update_state(state=PROGRESS, meta=meta)
+
+    db = SessionLocal()
+    try:
+        result = ingest_file(
+            db,
+            path,
+            filename=filename,
+            file_type=file_type,
+            default_company_id=UUID(company_id) if company_id else None,
+            companies_by_inn={inn: UUID(cid) for inn, cid in (companies_by_inn or {}).items()},
+            on_progress=report,
+        )
+
+        meta["stage"] = "metrics"
+        self.update_state(state=PROGRESS, meta=meta)
+        result.metrics_calculated = refresh_derived_data(db, result.company_ids)
+        db.commit()
+        for touched_company_id in result.company_ids:
+            invalidate_company_sync(touched_company_id)
+        enqueue_benchmarks(result.company_ids)
+    except Exception as e:
+        db.rollback()
+        if isinstance(e, FileFormatError):
+            error = str(e)
+        else:
+            logger.exception("Upload processing failed: %s", filename)
+            error = "Ошибка обработки файла"
+        self.update_state(state=FAILED, meta={**meta, "error": error})
+        raise Ignore()
+    finally:
+        db.close()
+        if os.path.exists(path):
+            os.remove(path)
+
+    return {"result": result.model_dump(mode="json")}
+
+
+def enqueue_upload(
+    path: str,
+    filename: str,
+    file_type: str,
+    user_id: UUID,
+    company_id: Optional[UUID] = None,
+    companies_by_inn: Optional[Mapping[str, UUID]] = None,
+) -> str:
+    """
+    Постановка загрузки в очередь
+
+    Владелец задачи хранится в отдельном ключе Redis, а не в meta: meta
+    перезаписывается при STARTED/FAILURE. Ключ и состояние QUEUED
+    записываются до отправки в брокер, чтобы статус был доступен
+    (и проверялся) сразу после ответа API.
+    """
+    job_id = str(uuid.uuid4())
+    get_sync_redis().set(_owner_key(job_id), str(user_id), ex=settings.JOB_RESULT_EXPIRES)
+    celery_app.backend.store_result(job_id, {}, QUEUED)
+    process_upload.apply_async(
+        kwargs={
+            "path": path,
+            "filename": filename,
+            "file_type": file_type,
+            "company_id": str(company_id) if company_id else None,
+            "companies_by_inn": {inn: str(cid) for inn, cid in (companies_by_inn or {}).items()},
+        },
+        task_id=job_id,
+    )
+    return job_id
+
+
+def get_upload_job(job_id: str) -> Optional[Tuple[Optional[str], JobStatus]]:
+    """
+    Статус задачи из result backend
+
+    Returns:
+        (user_id владельца, JobStatus) или None если задача неизвестна
+    """
+    owner = get_sync_redis().get(_owner_key(job_id))
+    if owner is None:
+        return None
+
+    async_result = AsyncResult(job_id, app=celery_app)
+    state = async_result.state
+    if state == states.PENDING:
+        # Неизвестный ID: enqueue_upload всегда записывает QUEUED
+        return None
+
+    info = async_result.info
+    meta: Dict[str, Any] = info if isinstance(info, dict) else {}
+    status = JobStatus(job_id=job_id, status=JOB_STATUSES.get(state, "processing"))
+
+    if state == states.SUCCESS:
+        status.result = UploadResult.model_validate(meta["result"])
+        status.rows_total = status.result.rows_total
+        status.rows_imported = status.result.rows_imported
+        status.rows_failed = status.result.rows_failed
+    else:
+        status.stage = meta.get("stage")
+        status.rows_total = meta.get("rows_total", 0)
+        status.rows_imported = meta.get("rows_imported", 0)
+        status.rows_failed = meta.get("rows_failed", 0)
+        if state == FAILED:
+            status.error = meta.get("error")
+        elif state in (states.FAILURE, states.REVOKED):
+            status.error = "Ошибка обработки файла"
+
+    return owner.decode(), status
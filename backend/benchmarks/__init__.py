@@ -0,0 +1,12 @@
+"""
+Benchmarks (запуск из backend/: python -m benchmarks.<name>)
+
+- micro - горячие функции: подпись Telegram, JWT, валидация, расчет метрик
+- json_serialization - сериализация ответов API
+- load - HTTP нагрузка на запущенный сервер (NFR-1.4)
+- compression - размер ответов и CPU сжатия по маршрутам
+- compare - сравнение JSON результатов двух коммитов
+- generate_dataset - синтетический датасет в БД (до 1M+ строк financial_data)
+
+Все бенчмарки выводят JSON (--output FILE - в файл) с коммитом и окружением.
+"""
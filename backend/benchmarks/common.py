@@ -0,0 +1,79 @@
+"""
+Общие функции бенчмарков: замер CPU времени и вывод результата в JSON
+
+Каждый результат содержит environment (commit, python, платформа), чтобы
+файлы разных коммитов можно было сравнить (python -m benchmarks.compare).
+"""
+
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+
+def measure(fn: Callable[[], object], repeat: int) -> Dict[str, float]:
+    """CPU время одного вызова, мкс (median / p95)"""
+    for _ in range(min(repeat, 20)):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        started = time.process_time()
+        fn()
+        samples.append((time.process_time() - started) * 1e6)
+    samples.sort()
+    return {
+        "median_us": round(statistics.median(samples), 1),
+        "p95_us": round(samples[int(len(samples) * 0.95) - 1], 1),
+    }
+
+
+def latency_summary(samples: List[float]) -> Dict[str, float]:
+    """Перцентили латентности, мс (samples - секунды)"""
+    if not samples:
+        return {"p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0}
+    ordered = sorted(samples)
+
+    def percentile(q: float) -> float:
+        return round(ordered[min(int(len(ordered) * q), len(ordered) - 1)] * 1000, 2)
+
+    return {
+        "p50_ms": percentile(0.50),
+        "p95_ms": percentile(0.95),
+        "p99_ms": percentile(0.99),
+        "max_ms": round(ordered[-1] * 1000, 2),
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True, timeout=5,
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def environment() -> Dict[str, Any]:
+    return {
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": datetime.utcnow().isoformat(timespec="seconds"),
+    }
+
+
+def emit(result: Dict[str, Any], output: Optional[str] = None) -> None:
+    """JSON результат в stdout или в файл"""
+    result = {**result, "environment": environment()}
+    text = json.dumps(result, indent=2, ensure_ascii=False)
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+        print(f"Saved to {output}", file=sys.stderr)
+    else:
+        print(text)
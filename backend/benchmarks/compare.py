@@ -0,0 +1,79 @@
+"""
+Сравнение результатов бенчмарков двух коммитов
+
+Сравниваются все показатели времени (ключи *_us, *_ms) с одинаковым
+путем в обоих файлах; рост больше --threshold процентов - регрессия.
+
+Запуск:
+    python -m benchmarks.compare base.json head.json --threshold 10
+
+Код выхода 1, если есть регрессии (для CI).
+"""
+
+import argparse
+import json
+import sys
+from typing import Any, Dict, Iterator, Tuple
+
+TIME_SUFFIXES = ("_us", "_ms")
+
+
+def _timings(data: Any, path: str = "") -> Iterator[Tuple[str, float]]:
+    """(путь, значение) всех показателей времени, списки - по индексу"""
+    if isinstance(data, dict):
+        for key, value in data.items():
+            if key == "environment":
+                continue
+            child = f"{path}.{key}" if path else key
+            if key.endswith(TIME_SUFFIXES) and isinstance(value, (int, float)):
+                yield child, float(value)
+            else:
+                yield from _timings(value, child)
+    elif isinstance(data, list):
+        for i, value in enumerate(data):
+            yield from _timings(value, f"{path}[{i}]")
+
+
+def compare(base: Dict[str, Any], head: Dict[str, Any], threshold: float) -> Dict[str, Any]:
+    base_timings = dict(_timings(base))
+    changes = []
+    for path, value in _timings(head):
+        before = base_timings.get(path)
+        if before is None or before <= 0:
+            continue
+        change = (value - before) * 100 / before
+        changes.append({
+            "metric": path,
+            "base": before,
+            "head": value,
+            "change_pct": round(change, 1),
+            "regression": change > threshold,
+        })
+    return {
+        "base_commit": base.get("environment", {}).get("commit"),
+        "head_commit": head.get("environment", {}).get("commit"),
+        "threshold_pct": threshold,
+        "regressions": sum(1 for change in changes if change["regression"]),
+        "changes": changes,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("base")
+    parser.add_argument("head")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Допустимый рост, %%")
+    args = parser.parse_args()
+
+    with open(args.base, encoding="utf-8") as f:
+        base = json.load(f)
+    with open(args.head, encoding="utf-8") as f:
+        head = json.load(f)
+
+    result = compare(base, head, args.threshold)
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+    sys.exit(1 if result["regressions"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Response compression benchmark
+
+Для типичных ответов маршрутов (синтетические данные той же формы,
+что отдает API): байты на проводе без сжатия и в каждой доступной
+кодировке (app.core.compression), степень сжатия и CPU время сжатия.
+Ответы меньше COMPRESSION_MIN_SIZE middleware не сжимает - это видно
+в поле compressed.
+
+Запуск (из backend/):
+    python -m benchmarks.compression --repeat 200 --output compression.json
+
+Байты на проводе под нагрузкой - в benchmarks.load (bytes_per_request).
+"""
+
+import argparse
+import random
+import uuid
+from typing import Any, Dict
+
+import numpy as np
+
+from app.core.compression import available_encodings
+from app.core.config import settings
+from app.models.company import CompanySizeEnum, IndustryEnum
+from app.schemas.company import CompanyOverview, CompanyResponse
+from app.schemas.metrics import MetricsTimeseries
+from app.schemas.serialization import dump_json, dump_json_list
+from app.services.metrics_calculator import METRIC_COLUMNS, calculate_metrics_batch
+from benchmarks.common import emit, measure
+from benchmarks.data import month_starts, synthetic_columns, synthetic_inn
+
+
+def _metrics(companies: int, months: int, rng: np.random.Generator) -> Dict[str, np.ndarray]:
+    """Метрики формы (companies, months)"""
+    columns = synthetic_columns(companies, months, rng)
+    flat = calculate_metrics_batch(
+        {name: column.ravel() for name, column in columns.items()},
+        company_ids=np.repeat(np.arange(companies), months),
+    )
+    return {name: flat[name].reshape(companies, months) for name in METRIC_COLUMNS}
+
+
+def timeseries_payload(months: int, rng: np.random.Generator) -> bytes:
+    metrics = _metrics(1, months, rng)
+    timeseries = MetricsTimeseries(
+        company_id=uuid.uuid4(),
+        period_start=month_starts(months),
+        series={name: metrics[name][0].tolist() for name in METRIC_COLUMNS},
+    )
+    return dump_json(MetricsTimeseries, timeseries)
+
+
+def overview_payload(companies: int, rng: np.random.Generator) -> bytes:
+    metrics = _metrics(companies, 13, rng)
+    starts = month_starts(13)
+    industries, sizes = list(IndustryEnum), list(CompanySizeEnum)
+    seeded = random.Random(int(rng.integers(2**32)))
+    overview = []
+    for c in range(companies):
+        overview.append({
+            "id": uuid.uuid4(),
+            "name": f"Company {c}",
+            "inn": synthetic_inn(seeded),
+            "industry": industries[c % len(industries)],
+            "size": sizes[c % len(sizes)],
+            "financial_data_id": uuid.uuid4(),
+            "period_start": starts[-1],
+            "metrics": {name: float(metrics[name][c, -1]) for name in METRIC_COLUMNS},
+            "statuses": {"gross_margin": "good", "ros": "warning", "roa": "good", "roe": "bad"},
+            "mom": {name: float(rng.normal(0, 10)) for name in METRIC_COLUMNS},
+            "yoy": {name: float(rng.normal(0, 25)) for name in METRIC_COLUMNS},
+        })
+    return dump_json_list(CompanyOverview, overview)
+
+
+def companies_payload(companies: int, rng: np.random.Generator) -> bytes:
+    starts = month_starts(companies)
+    seeded = random.Random(int(rng.integers(2**32)))
+    owner_id = uuid.uuid4()
+    return dump_json_list(CompanyResponse, [
+        {
+            "id": uuid.uuid4(),
+            "owner_id": owner_id,
+            "name": f"Company {c}",
+            "inn": synthetic_inn(seeded),
+            "industry": IndustryEnum.TRADE,
+            "size": CompanySizeEnum.SMALL,
+            "created_at": starts[c],
+            "updated_at": starts[c],
+        }
+        for c in range(companies)
+    ])
+
+
+def run(repeat: int, seed: int) -> Dict[str, Any]:
+    rng = np.random.default_rng(seed)
+    payloads = {
+        "GET /companies/{company_id}/metrics/timeseries (12 months)": timeseries_payload(12, rng),
+        "GET /companies/{company_id}/metrics/timeseries (60 months)": timeseries_payload(60, rng),
+        "GET /companies/me/overview (20 companies)": overview_payload(20, rng),
+        "GET /companies/me/overview (100 companies)": overview_payload(100, rng),
+        f"GET /companies/me (page of {settings.DEFAULT_PAGE_SIZE})": companies_payload(
+            settings.DEFAULT_PAGE_SIZE, rng
+        ),
+    }
+
+    results: Dict[str, Any] = {}
+    for route, body in payloads.items():
+        encodings = {}
+        for name, compress in available_encodings().items():
+            compressed = compress(body)
+            encodings[name] = {
+                "bytes": len(compressed),
+                "ratio": round(len(body) / len(compressed), 2),
+                "compress": measure(lambda: compress(body), repeat),
+            }
+        results[route] = {
+            "bytes": len(body),
+            "compressed": len(body) >= settings.COMPRESSION_MIN_SIZE,
+            "encodings": encodings,
+        }
+
+    return {
+        "benchmark": "compression",
+        "repeat": repeat,
+        "min_size": settings.COMPRESSION_MIN_SIZE,
+        "results": results,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="Файл для JSON результата (по умолчанию stdout)")
+    args = parser.parse_args()
+    emit(run(args.repeat, args.seed), args.output)
+
+
+if __name__ == "__main__":
+    main()
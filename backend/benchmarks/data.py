@@ -0,0 +1,140 @@
+"""
+Синтетические данные для бенчмарков
+
+- Финансовые периоды, проходящие валидацию FinancialDataCreate:
+  P&L согласован (gross_profit = revenue - cogs, ...), баланс сходится
+  (активы = обязательства + капитал), выручка с сезонностью и трендом
+- Подписанные данные Telegram Login Widget для /auth/telegram
+
+synthetic_columns генерирует сразу пачку компаний (numpy), на нем
+построены synthetic_periods (JSON для API) и generate_dataset (bulk в БД).
+"""
+
+import hashlib
+import hmac
+import random
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from dateutil.relativedelta import relativedelta
+
+DEFAULT_START = datetime(2021, 1, 1)
+
+
+def synthetic_inn(rng: random.Random) -> str:
+    """ИНН юрлица (10 цифр)"""
+    return str(rng.randrange(10**9, 10**10))
+
+
+def month_starts(months: int, start: datetime = DEFAULT_START) -> List[datetime]:
+    return [start + relativedelta(months=month) for month in range(months)]
+
+
+def synthetic_columns(companies: int, months: int, rng: np.random.Generator) -> Dict[str, np.ndarray]:
+    """
+    Помесячная отчетность пачки компаний: колонки FINANCIAL_COLUMNS,
+    массивы формы (companies, months)
+
+    Выручка: базовый уровень (логнормальный) * тренд * годовая сезонность
+    * шум. Активы растут вместе с выручкой, капитал - балансирующая статья
+    (активы минус обязательства, до 80% активов).
+    """
+    shape = (companies, months)
+
+    def per_company(low: float, high: float) -> np.ndarray:
+        return rng.uniform(low, high, size=(companies, 1))
+
+    def noise(low: float, high: float) -> np.ndarray:
+        return rng.uniform(low, high, size=shape)
+
+    month = np.arange(months)
+    base_revenue = rng.lognormal(15, 1.2, size=(companies, 1))
+    growth = per_company(-0.01, 0.03)
+    season = 1 + per_company(0.0, 0.3) * np.sin(2 * np.pi * month / 12 + per_company(0, 2 * np.pi))
+
+    revenue = np.round(base_revenue * (1 + growth) ** month * season * noise(0.9, 1.1), 2)
+    cogs = np.round(revenue * per_company(0.4, 0.85) * noise(0.95, 1.05), 2)
+    gross_profit = np.round(revenue - cogs, 2)
+    operating_expenses = np.round(revenue * per_company(0.05, 0.25) * noise(0.9, 1.1), 2)
+    ebit = np.round(gross_profit - operating_expenses, 2)
+    net_profit = np.round(np.where(ebit > 0, ebit * 0.8, ebit), 2)
+
+    total_assets = revenue / per_company(0.05, 0.4)
+    current_assets = np.round(total_assets * per_company(0.3, 0.8), 2)
+    non_current_assets = np.round(total_assets - current_assets, 2)
+    liabilities = total_assets * per_company(0.2, 0.8)
+    current_liabilities = np.round(liabilities * noise(0.4, 0.8), 2)
+    non_current_liabilities = np.round(liabilities - current_liabilities, 2)
+    equity = np.round(
+        current_assets + non_current_assets - current_liabilities - non_current_liabilities, 2
+    )
+
+    return {
+        "revenue": revenue,
+        "cogs": cogs,
+        "gross_profit": gross_profit,
+        "operating_expenses": operating_expenses,
+        "ebit": ebit,
+        "net_profit": net_profit,
+        "current_assets": current_assets,
+        "non_current_assets": non_current_assets,
+        "current_liabilities": current_liabilities,
+        "non_current_liabilities": non_current_liabilities,
+        "equity": equity,
+        "cash": np.round(current_assets * 0.2, 2),
+        "receivables": np.round(current_assets * 0.4, 2),
+        "inventory": np.round(current_assets * 0.3, 2),
+    }
+
+
+PL_FIELDS = ("revenue", "cogs", "gross_profit", "operating_expenses", "ebit", "net_profit")
+BALANCE_FIELDS = (
+    "current_assets",
+    "non_current_assets",
+    "current_liabilities",
+    "non_current_liabilities",
+    "equity",
+    "cash",
+    "receivables",
+    "inventory",
+)
+
+
+def synthetic_periods(
+    months: int,
+    rng: random.Random,
+    start: datetime = DEFAULT_START,
+) -> List[Dict[str, Any]]:
+    """Помесячная отчетность одной компании (формат FinancialDataCreate без company_id)"""
+    columns = synthetic_columns(1, months, np.random.default_rng(rng.getrandbits(64)))
+    periods = []
+    for i, period_start in enumerate(month_starts(months, start)):
+        values = {name: float(column[0, i]) for name, column in columns.items()}
+        periods.append({
+            "period_start": period_start.isoformat(),
+            "period_end": (period_start + relativedelta(months=1, days=-1)).isoformat(),
+            "period_name": period_start.strftime("%m.%Y"),
+            "pl_data": {name: values[name] for name in PL_FIELDS},
+            "balance_data": {name: values[name] for name in BALANCE_FIELDS},
+        })
+    return periods
+
+
+def telegram_auth_payload(
+    telegram_id: int,
+    bot_token: str,
+    auth_date: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Данные Login Widget, подписанные токеном бота (как их подписывает Telegram)"""
+    payload = {
+        "id": telegram_id,
+        "first_name": f"Bench{telegram_id}",
+        "username": f"bench_{telegram_id}",
+        "auth_date": int(time.time()) if auth_date is None else auth_date,
+    }
+    data_check_string = "\n".join(f"{key}={payload[key]}" for key in sorted(payload))
+    secret_key = hashlib.sha256(bot_token.encode()).digest()
+    payload["hash"] = hmac.new(secret_key, data_check_string.encode(), hashlib.sha256).hexdigest()
+    return payload
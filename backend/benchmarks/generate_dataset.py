@@ -0,0 +1,255 @@
+"""
+Синтетический датасет производственного масштаба
+
+N пользователей, M компаний (отрасли и размеры по весам), K месяцев
+согласованной отчетности на компанию (см. benchmarks.data). Пишется
+пачками компаний через те же bulk пути, что и импорт:
+upsert_financial_data (multi-row INSERT ... ON CONFLICT) и
+rebuild_derived_data (метрики, сравнения, бенчмарки, прогнозы).
+
+Запуск (из backend/, DATABASE_URL - целевая БД, миграции применены):
+    python -m benchmarks.generate_dataset --users 2000 --companies 20000 --months 50
+
+20000 x 50 = 1M строк financial_data. Пересчет производных данных
+заметно дольше самой загрузки; --skip-derived - только financial_data.
+Повторный запуск с тем же --seed
+обновляет те же строки (ON CONFLICT), а не дублирует их.
+Результат - JSON: строки и скорость по этапам.
+"""
+
+import argparse
+import time
+import uuid
+from typing import Any, Dict, List
+
+import numpy as np
+from dateutil.relativedelta import relativedelta
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from app.core.database import SessionLocal
+from app.models.company import Company, CompanySizeEnum, IndustryEnum
+from app.models.user import User
+from app.schemas.financial_data import FinancialDataCreate
+from app.services.financial_data_service import rebuild_derived_data, upsert_financial_data
+from benchmarks.common import emit
+from benchmarks.data import BALANCE_FIELDS, PL_FIELDS, month_starts, synthetic_columns
+
+# Доли отраслей и размеров (примерно как у МСП)
+INDUSTRY_WEIGHTS = {
+    IndustryEnum.TRADE: 0.30,
+    IndustryEnum.SERVICES: 0.22,
+    IndustryEnum.MANUFACTURING: 0.12,
+    IndustryEnum.CONSTRUCTION: 0.11,
+    IndustryEnum.IT: 0.10,
+    IndustryEnum.FINANCE: 0.05,
+    IndustryEnum.OTHER: 0.10,
+}
+SIZE_WEIGHTS = {CompanySizeEnum.SMALL: 0.85, CompanySizeEnum.MEDIUM: 0.15}
+
+# Диапазон telegram_id синтетических пользователей (не пересекается с реальными)
+TELEGRAM_ID_BASE = 9_000_000_000
+
+
+def _deterministic_uuid(kind: str, seed: int, number: int) -> uuid.UUID:
+    """Один и тот же id при повторном запуске с тем же seed"""
+    return uuid.uuid5(uuid.NAMESPACE_OID, f"finreportai-bench:{kind}:{seed}:{number}")
+
+
+def _existing(db: Session, model, ids: List[uuid.UUID]) -> set:
+    return set(db.execute(select(model.id).where(model.id.in_(ids))).scalars())
+
+
+def create_users(db: Session, count: int, seed: int) -> List[uuid.UUID]:
+    ids = [_deterministic_uuid("user", seed, i) for i in range(count)]
+    existing = _existing(db, User, ids)
+    records = [
+        {
+            "id": user_id,
+            "telegram_id": TELEGRAM_ID_BASE + seed * 10_000_000 + i,
+            "telegram_first_name": f"Bench{i}",
+        }
+        for i, user_id in enumerate(ids)
+        if user_id not in existing
+    ]
+    if records:
+        db.execute(insert(User), records)
+    return ids
+
+
+def create_companies(
+    db: Session,
+    user_ids: List[uuid.UUID],
+    count: int,
+    seed: int,
+    rng: np.random.Generator,
+) -> List[uuid.UUID]:
+    ids = [_deterministic_uuid("company", seed, i) for i in range(count)]
+    owners = rng.integers(0, len(user_ids), size=count)
+    # Индексы, а не rng.choice по членам enum: numpy превратил бы их в строки
+    industry_list, size_list = list(INDUSTRY_WEIGHTS), list(SIZE_WEIGHTS)
+    industries = rng.choice(len(industry_list), size=count, p=list(INDUSTRY_WEIGHTS.values()))
+    sizes = rng.choice(len(size_list), size=count, p=list(SIZE_WEIGHTS.values()))
+    inns = rng.integers(10**9, 10**10, size=count)
+
+    existing = _existing(db, Company, ids)
+    records = [
+        {
+            "id": company_id,
+            "owner_id": user_ids[owners[i]],
+            "name": f"Bench company {i}",
+            "inn": str(inns[i]),
+            "industry": industry_list[industries[i]],
+            "size": size_list[sizes[i]],
+        }
+        for i, company_id in enumerate(ids)
+        if company_id not in existing
+    ]
+    for start in range(0, len(records), 5000):
+        db.execute(insert(Company), records[start:start + 5000])
+    return ids
+
+
+def financial_records(
+    company_ids: List[uuid.UUID],
+    months: int,
+    rng: np.random.Generator,
+) -> List[Dict[str, Any]]:
+    """Записи financial_data пачки компаний (формат upsert_financial_data)"""
+    columns = synthetic_columns(len(company_ids), months, rng)
+    values = {name: column.tolist() for name, column in columns.items()}
+    starts = month_starts(months)
+    ends = [start + relativedelta(months=1, days=-1) for start in starts]
+    names = [start.strftime("%m.%Y") for start in starts]
+
+    records = []
+    for c, company_id in enumerate(company_ids):
+        rows = {name: values[name][c] for name in values}
+        for m in range(months):
+            record = {
+                "company_id": company_id,
+                "period_start": starts[m],
+                "period_end": ends[m],
+                "period_name": names[m],
+                "source_filename": None,
+                "source_file_type": None,
+                "upload_notes": "synthetic",
+            }
+            for name, row in rows.items():
+                record[name] = row[m]
+            records.append(record)
+    return records
+
+
+def _validate_sample(records: List[Dict[str, Any]]) -> None:
+    """Проверка первой компании пачки схемой API (балансовое уравнение и т.д.)"""
+    company_id = records[0]["company_id"]
+    for record in records:
+        if record["company_id"] != company_id:
+            break
+        FinancialDataCreate(
+            company_id=record["company_id"],
+            period_start=record["period_start"],
+            period_end=record["period_end"],
+            period_name=record["period_name"],
+            pl_data={name: record[name] for name in PL_FIELDS},
+            balance_data={name: record[name] for name in BALANCE_FIELDS},
+        )
+
+
+def generate(
+    db: Session,
+    users: int,
+    companies: int,
+    months: int,
+    seed: int = 1,
+    batch_companies: int = 500,
+    derived: bool = True,
+) -> Dict[str, Any]:
+    """
+    Записать датасет; каждая пачка компаний коммитится отдельно
+
+    Returns:
+        Статистика по этапам (строки, секунды, строк/с)
+    """
+    rng = np.random.default_rng(seed)
+    phases: Dict[str, Dict[str, float]] = {}
+
+    def phase(name: str, rows: int, started: float) -> None:
+        totals = phases.setdefault(name, {"rows": 0, "seconds": 0.0})
+        totals["rows"] += rows
+        totals["seconds"] += time.perf_counter() - started
+
+    started = time.perf_counter()
+    user_ids = create_users(db, users, seed)
+    company_ids = create_companies(db, user_ids, companies, seed, rng)
+    db.commit()
+    phase("users_and_companies", users + companies, started)
+
+    for start in range(0, companies, batch_companies):
+        batch = company_ids[start:start + batch_companies]
+
+        started = time.perf_counter()
+        records = financial_records(batch, months, rng)
+        _validate_sample(records)
+        phase("generate", len(records), started)
+
+        started = time.perf_counter()
+        upsert_financial_data(db, records)
+        db.commit()
+        phase("financial_data", len(records), started)
+
+        if derived:
+            started = time.perf_counter()
+            metrics = rebuild_derived_data(db, batch)
+            db.commit()
+            phase("derived_data", metrics, started)
+
+    for totals in phases.values():
+        totals["seconds"] = round(totals["seconds"], 2)
+        totals["rows_per_s"] = round(totals["rows"] / totals["seconds"]) if totals["seconds"] else None
+
+    return {
+        "benchmark": "generate_dataset",
+        "parameters": {
+            "users": users,
+            "companies": companies,
+            "months": months,
+            "seed": seed,
+            "batch_companies": batch_companies,
+            "derived": derived,
+        },
+        "financial_data_rows": companies * months,
+        "phases": phases,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--companies", type=int, default=20000)
+    parser.add_argument("--months", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--batch-companies", type=int, default=500, help="Компаний в транзакции")
+    parser.add_argument("--skip-derived", action="store_true", help="Без метрик, сравнений и прогнозов")
+    parser.add_argument("--output", help="Файл для JSON результата (по умолчанию stdout)")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        result = generate(
+            db,
+            args.users,
+            args.companies,
+            args.months,
+            seed=args.seed,
+            batch_companies=args.batch_companies,
+            derived=not args.skip_derived,
+        )
+    finally:
+        db.close()
+    emit(result, args.output)
+
+
+if __name__ == "__main__":
+    main()
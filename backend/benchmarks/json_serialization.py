@@ -0,0 +1,141 @@
+"""
+JSON serialization benchmark
+
+Сравнение стандартного пути FastAPI (model_validate -> response_model
+-> dict -> json.dumps) с FastJSONResponse + app.schemas.serialization
+на списках метрик (CalculatedMetricsResponse, ~25 полей).
+
+Запуск (из backend/):
+    python -m benchmarks.json_serialization --rows 1 12 120 --repeat 200
+
+Результат - JSON в stdout: CPU время на запрос (process_time), мкс.
+"""
+
+import argparse
+import uuid
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from typing import Dict, List
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+
+from app.core.responses import FastJSONResponse, json_response, orjson
+from app.schemas.metrics import CalculatedMetricsResponse
+from app.schemas.serialization import dump_json_list
+from benchmarks.common import emit, measure
+
+
+def make_rows(count: int) -> List[SimpleNamespace]:
+    """Объекты с атрибутами как у CalculatedMetrics (from_attributes)"""
+    company_id = uuid.uuid4()
+    start = datetime(2020, 1, 1)
+    rows = []
+    for i in range(count):
+        rows.append(SimpleNamespace(
+            id=uuid.uuid4(),
+            company_id=company_id,
+            financial_data_id=uuid.uuid4(),
+            revenue=1_000_000.0 + i * 1234.5678,
+            revenue_forecast=1_010_000.0 + i * 1200.25,
+            gross_margin=35.123456 + i % 7,
+            ros=12.345678,
+            total_assets=5_000_000.0 + i,
+            roa=8.765432,
+            roe=15.432109,
+            current_ratio=1.87654,
+            quick_ratio=1.23456,
+            cash_ratio=0.34567,
+            autonomy_ratio=0.56789,
+            asset_turnover=1.98765,
+            net_working_capital=750_000.0 + i,
+            working_capital_ratio=0.45678,
+            gross_margin_status="good",
+            ros_status="good",
+            roa_status="warning",
+            roe_status="good",
+            liquidity_status="good",
+            created_at=start + timedelta(days=30 * i),
+            updated_at=start + timedelta(days=30 * i),
+        ))
+    return rows
+
+
+def build_app(rows: List[SimpleNamespace]) -> FastAPI:
+    app = FastAPI()
+
+    @app.get(
+        "/baseline",
+        response_model=List[CalculatedMetricsResponse],
+        response_class=JSONResponse,
+    )
+    def baseline():
+        return [CalculatedMetricsResponse.model_validate(r) for r in rows]
+
+    @app.get(
+        "/fast",
+        response_model=List[CalculatedMetricsResponse],
+        response_class=FastJSONResponse,
+    )
+    def fast():
+        return json_response(dump_json_list(CalculatedMetricsResponse, rows))
+
+    return app
+
+
+def run(row_counts: List[int], repeat: int) -> Dict[str, object]:
+    results = []
+    for count in row_counts:
+        rows = make_rows(count)
+        client = TestClient(build_app(rows))
+        assert client.get("/baseline").json() == client.get("/fast").json()
+
+        def serialize_baseline():
+            models = [CalculatedMetricsResponse.model_validate(r) for r in rows]
+            return JSONResponse(
+                [m.model_dump(mode="json") for m in models]
+            ).body
+
+        def serialize_fast():
+            return FastJSONResponse(dump_json_list(CalculatedMetricsResponse, rows)).body
+
+        serialize = {
+            "baseline": measure(serialize_baseline, repeat),
+            "fast": measure(serialize_fast, repeat),
+        }
+        request = {
+            "baseline": measure(lambda: client.get("/baseline"), repeat),
+            "fast": measure(lambda: client.get("/fast"), repeat),
+        }
+        results.append({
+            "rows": count,
+            "serialize": serialize,
+            "request": request,
+            "serialize_speedup": round(
+                serialize["baseline"]["median_us"] / max(serialize["fast"]["median_us"], 0.1), 2
+            ),
+            "request_speedup": round(
+                request["baseline"]["median_us"] / max(request["fast"]["median_us"], 0.1), 2
+            ),
+        })
+
+    return {
+        "benchmark": "json_serialization",
+        "orjson": orjson is not None,
+        "repeat": repeat,
+        "results": results,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1, 12, 120])
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--output", help="Файл для JSON результата (по умолчанию stdout)")
+    args = parser.parse_args()
+    emit(run(args.rows, args.repeat), args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+"""
+HTTP load scenario (NFR-1.4: 100 одновременных пользователей)
+
+Виртуальные пользователи входят через /auth/telegram (данные подписаны
+тем же TELEGRAM_BOT_TOKEN, что у сервера), при первом запуске создают
+компании с синтетической отчетностью (/financial-data/bulk), затем до
+конца теста случайно (по весам SCENARIO) запрашивают дашборд и метрики.
+Пользователи и компании детерминированы (--seed): повторный запуск
+переиспользует данные и измеряет только чтение.
+
+Запуск против локального стека (docker-compose up):
+    python -m benchmarks.load --base-url http://localhost:8000 \\
+        --users 100 --duration 60 --output load.json
+
+Результат - JSON: запросы, статусы, RPS, перцентили латентности и
+байты на проводе (тело после сжатия, bytes_per_request) по шаблону
+маршрута. Клиент передает --accept-encoding (по умолчанию gzip).
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+from benchmarks.common import emit, latency_summary
+from benchmarks.data import synthetic_inn, synthetic_periods, telegram_auth_payload
+
+API = "/api/v1"
+
+# (шаблон маршрута, вес)
+SCENARIO: List[Tuple[str, float]] = [
+    ("POST /auth/telegram", 0.5),
+    ("GET /companies/me", 2),
+    ("GET /companies/me/overview", 1),
+    ("GET /companies/{company_id}/metrics/latest", 3),
+    ("GET /companies/{company_id}/metrics/summary", 2),
+    ("GET /companies/{company_id}/metrics/timeseries", 2),
+    ("GET /companies/{company_id}/metrics/changes", 1),
+    ("GET /companies/{company_id}/metrics/benchmarks", 1),
+    ("GET /companies/{company_id}/metrics/forecast", 1),
+]
+
+# Значения IndustryEnum / CompanySizeEnum (клиент не импортирует приложение)
+INDUSTRIES = ["trade", "manufacturing", "services", "it", "construction", "finance", "other"]
+SIZES = ["small", "medium"]
+
+
+class Stats:
+    """Латентности и статусы по шаблонам маршрутов"""
+
+    def __init__(self) -> None:
+        self.latencies: Dict[str, List[float]] = {}
+        self.statuses: Dict[str, Dict[str, int]] = {}
+        self.bytes: Dict[str, int] = {}
+
+    def record(self, name: str, elapsed: float, status: int, wire_bytes: int = 0) -> None:
+        self.latencies.setdefault(name, []).append(elapsed)
+        self.bytes[name] = self.bytes.get(name, 0) + wire_bytes
+        statuses = self.statuses.setdefault(name, {})
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+
+    def summary(self, duration: float) -> Dict[str, Any]:
+        result = {}
+        for name in sorted(self.latencies):
+            samples = self.latencies[name]
+            errors = sum(n for status, n in self.statuses[name].items() if int(status) >= 500)
+            result[name] = {
+                "requests": len(samples),
+                "errors": errors,
+                "statuses": self.statuses[name],
+                "rps": round(len(samples) / duration, 2),
+                "bytes_per_request": round(self.bytes.get(name, 0) / len(samples)),
+                **latency_summary(samples),
+            }
+        return result
+
+
+class VirtualUser:
+    def __init__(self, client: httpx.AsyncClient, telegram_id: int, bot_token: str, stats: Stats):
+        self.client = client
+        self.telegram_id = telegram_id
+        self.bot_token = bot_token
+        self.stats = stats
+        self.rng = random.Random(telegram_id)
+        self.headers: Dict[str, str] = {}
+        self.company_ids: List[str] = []
+        self.last_auth_date = 0
+
+    async def request(self, name: str, method: str, path: str, **kwargs) -> httpx.Response:
+        started = time.perf_counter()
+        response = await self.client.request(method, API + path, headers=self.headers, **kwargs)
+        self.stats.record(
+            name, time.perf_counter() - started, response.status_code, response.num_bytes_downloaded
+        )
+        return response
+
+    async def login(self, stats: Optional[Stats] = None) -> None:
+        # Сервер принимает данные виджета один раз (защита от replay), а
+        # auth_date - целые секунды: второй вход в ту же секунду ждет следующей
+        auth_date = int(time.time())
+        if auth_date <= self.last_auth_date:
+            auth_date = self.last_auth_date + 1
+            await asyncio.sleep(max(auth_date - time.time(), 0))
+        self.last_auth_date = auth_date
+        payload = telegram_auth_payload(self.telegram_id, self.bot_token, auth_date)
+        started = time.perf_counter()
+        response = await self.client.post(f"{API}/auth/telegram", json=payload)
+        (stats or self.stats).record(
+            "POST /auth/telegram",
+            time.perf_counter() - started,
+            response.status_code,
+            response.num_bytes_downloaded,
+        )
+        response.raise_for_status()
+        self.headers = {"Authorization": f"Bearer {response.json()['token']['access_token']}"}
+
+    async def setup(self, companies: int, months: int, setup_stats: Stats) -> None:
+        """Вход и создание недостающих компаний с отчетностью"""
+        await self.login(setup_stats)
+        response = await self.client.get(f"{API}/companies/me", headers=self.headers)
+        response.raise_for_status()
+        self.company_ids = [company["id"] for company in response.json()]
+
+        while len(self.company_ids) < companies:
+            response = await self.client.post(f"{API}/companies", headers=self.headers, json={
+                "name": f"Bench {self.telegram_id}-{len(self.company_ids)}",
+                "inn": synthetic_inn(self.rng),
+                "industry": self.rng.choice(INDUSTRIES),
+                "size": self.rng.choice(SIZES),
+            })
+            response.raise_for_status()
+            company_id = response.json()["id"]
+            periods = [
+                {"company_id": company_id, **period}
+                for period in synthetic_periods(months, self.rng)
+            ]
+            started = time.perf_counter()
+            response = await self.client.post(
+                f"{API}/financial-data/bulk", headers=self.headers, json=periods
+            )
+            setup_stats.record(
+                "POST /financial-data/bulk",
+                time.perf_counter() - started,
+                response.status_code,
+                response.num_bytes_downloaded,
+            )
+            response.raise_for_status()
+            self.company_ids.append(company_id)
+
+    async def step(self, name: str) -> None:
+        if name == "POST /auth/telegram":
+            await self.login()
+            return
+        method, template = name.split(" ", 1)
+        company_id = self.rng.choice(self.company_ids) if self.company_ids else None
+        if "{company_id}" in template and company_id is None:
+            return
+        await self.request(name, method, template.replace("{company_id}", str(company_id)))
+
+    async def run(self, deadline: float, think_time: float) -> None:
+        names = [name for name, _ in SCENARIO]
+        weights = [weight for _, weight in SCENARIO]
+        while time.monotonic() < deadline:
+            await self.step(self.rng.choices(names, weights)[0])
+            if think_time:
+                await asyncio.sleep(think_time)
+
+
+async def run_load(
+    base_url: str,
+    users: int,
+    duration: float,
+    companies: int = 2,
+    months: int = 24,
+    seed: int = 1,
+    think_time: float = 0.0,
+    bot_token: Optional[str] = None,
+    transport: Optional[httpx.AsyncBaseTransport] = None,
+    accept_encoding: str = "gzip",
+) -> Dict[str, Any]:
+    """
+    Args:
+        transport: httpx транспорт (например, ASGITransport для запуска
+            против приложения в том же процессе)
+    """
+    bot_token = bot_token or os.environ["TELEGRAM_BOT_TOKEN"]
+    limits = httpx.Limits(max_connections=users, max_keepalive_connections=users)
+    async with httpx.AsyncClient(
+        base_url=base_url,
+        limits=limits,
+        timeout=30.0,
+        transport=transport,
+        headers={"Accept-Encoding": accept_encoding},
+    ) as client:
+        stats = Stats()
+        setup_stats = Stats()
+        virtual_users = [
+            VirtualUser(client, 7_000_000_000 + seed * 100_000 + i, bot_token, stats)
+            for i in range(users)
+        ]
+
+        setup_started = time.perf_counter()
+        await asyncio.gather(*(user.setup(companies, months, setup_stats) for user in virtual_users))
+        setup_time = time.perf_counter() - setup_started
+
+        started = time.perf_counter()
+        deadline = time.monotonic() + duration
+        await asyncio.gather(*(user.run(deadline, think_time) for user in virtual_users))
+        elapsed = time.perf_counter() - started
+
+    all_samples = [sample for samples in stats.latencies.values() for sample in samples]
+    return {
+        "benchmark": "load",
+        "parameters": {
+            "base_url": base_url,
+            "users": users,
+            "duration_s": duration,
+            "companies_per_user": companies,
+            "months": months,
+            "seed": seed,
+            "think_time_s": think_time,
+            "accept_encoding": accept_encoding,
+        },
+        "setup": {"duration_s": round(setup_time, 2), "requests": setup_stats.summary(setup_time)},
+        "total": {
+            "requests": len(all_samples),
+            "rps": round(len(all_samples) / elapsed, 2),
+            "bytes": sum(stats.bytes.values()),
+            **latency_summary(all_samples),
+        },
+        "results": stats.summary(elapsed),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--duration", type=float, default=60, help="Секунд нагрузки")
+    parser.add_argument("--companies", type=int, default=2, help="Компаний на пользователя")
+    parser.add_argument("--months", type=int, default=24, help="Месяцев отчетности на компанию")
+    parser.add_argument("--seed", type=int, default=1, help="Набор пользователей")
+    parser.add_argument("--think-time", type=float, default=0.0, help="Пауза между запросами, сек")
+    parser.add_argument("--bot-token", help="По умолчанию TELEGRAM_BOT_TOKEN из окружения")
+    parser.add_argument("--accept-encoding", default="gzip", help="identity - без сжатия")
+    parser.add_argument("--output", help="Файл для JSON результата (по умолчанию stdout)")
+    args = parser.parse_args()
+
+    result = asyncio.run(run_load(
+        args.base_url,
+        args.users,
+        args.duration,
+        companies=args.companies,
+        months=args.months,
+        seed=args.seed,
+        think_time=args.think_time,
+        bot_token=args.bot_token,
+        accept_encoding=args.accept_encoding,
+    ))
+    emit(result, args.output)
+
+
+if __name__ == "__main__":
+    main()
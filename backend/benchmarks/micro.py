@@ -0,0 +1,90 @@
+"""
+Micro-benchmarks горячих путей
+
+- verify_telegram_auth - проверка подписи Login Widget
+- verify_token - декодирование JWT (без кеша и с попаданием в token_cache)
+- FinancialDataCreate - Pydantic валидация одного периода
+- MetricsCalculator.calculate_all - расчет метрик одного периода
+- calculate_metrics_batch - векторизованный расчет (на строку)
+
+Запуск (из backend/, нужны переменные окружения приложения):
+    python -m benchmarks.micro --repeat 2000 --output micro.json
+
+Результат - JSON: CPU время на вызов (process_time), мкс.
+"""
+
+import argparse
+import random
+import uuid
+from types import SimpleNamespace
+from typing import Any, Dict
+
+from app.api.v1.auth import verify_telegram_auth
+from app.core.config import settings
+from app.core.security import create_access_token, token_cache, verify_token
+from app.schemas.auth import TelegramAuthData
+from app.schemas.financial_data import FinancialDataCreate
+from app.services.metrics_calculator import (
+    FINANCIAL_COLUMNS,
+    MetricsCalculator,
+    calculate_metrics_batch,
+)
+from benchmarks.common import emit, measure
+from benchmarks.data import synthetic_periods, telegram_auth_payload
+
+BATCH_ROWS = 10000
+
+
+def run(repeat: int) -> Dict[str, Any]:
+    rng = random.Random(42)
+    results: Dict[str, Any] = {}
+
+    auth_data = TelegramAuthData(**telegram_auth_payload(123456789, settings.TELEGRAM_BOT_TOKEN))
+    assert verify_telegram_auth(auth_data)
+    results["verify_telegram_auth"] = measure(lambda: verify_telegram_auth(auth_data), repeat)
+
+    token = create_access_token({"sub": str(uuid.uuid4()), "telegram_id": 123456789})
+
+    def verify_cold():
+        token_cache.clear()
+        return verify_token(token)
+
+    results["verify_token_cold"] = measure(verify_cold, repeat)
+    results["verify_token_cached"] = measure(lambda: verify_token(token), repeat)
+
+    period = {"company_id": str(uuid.uuid4()), **synthetic_periods(1, rng)[0]}
+    results["financial_data_create"] = measure(lambda: FinancialDataCreate(**period), repeat)
+
+    periods = synthetic_periods(2, rng)
+    current, previous = (
+        SimpleNamespace(**p["pl_data"], **p["balance_data"]) for p in reversed(periods)
+    )
+    results["calculate_all"] = measure(
+        lambda: MetricsCalculator(current, previous).calculate_all(), repeat
+    )
+
+    rows = synthetic_periods(BATCH_ROWS, rng)
+    columns = {
+        name: [row["pl_data"].get(name, row["balance_data"].get(name)) for row in rows]
+        for name in FINANCIAL_COLUMNS
+    }
+    batch = measure(lambda: calculate_metrics_batch(columns), max(repeat // 100, 5))
+    results["calculate_metrics_batch"] = {
+        **batch,
+        "rows": BATCH_ROWS,
+        "per_row_us": round(batch["median_us"] / BATCH_ROWS, 3),
+    }
+
+    return {"benchmark": "micro", "repeat": repeat, "results": results}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=2000)
+    parser.add_argument("--output", help="Файл для JSON результата (по умолчанию stdout)")
+    args = parser.parse_args()
+    emit(run(args.repeat), args.output)
+
+
+if __name__ == "__main__":
+    main()
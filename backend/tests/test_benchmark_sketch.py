@@ -0,0 +1,95 @@
+"""Tests for app.services.benchmark_service.QuantileSketch"""
+
+import numpy as np
+import pytest
+
+from app.services.benchmark_service import SKETCH_RELATIVE_ACCURACY, QuantileSketch
+
+
+@pytest.fixture
+def values() -> np.ndarray:
+    rng = np.random.default_rng(7)
+    return np.concatenate([
+        rng.lognormal(10, 2, 4000),
+        -rng.lognormal(3, 1, 500),
+        np.zeros(100),
+    ])
+
+
+def _sketch(values) -> QuantileSketch:
+    sketch = QuantileSketch()
+    sketch.add(values)
+    return sketch
+
+
+@pytest.mark.parametrize("q", [0.0, 0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99, 1.0])
+def test_quantile_within_relative_accuracy(values, q):
+    ordered = np.sort(values)
+    expected = ordered[int(q * (len(ordered) - 1))]
+
+    actual = _sketch(values).quantile(q)
+
+    assert actual == pytest.approx(expected, rel=SKETCH_RELATIVE_ACCURACY, abs=1e-9)
+
+
+def test_count_and_zeros(values):
+    sketch = _sketch(values)
+
+    assert sketch.count == len(values)
+    assert sketch.zero_count == 100
+    assert sketch.to_dict()["count"] == len(values)
+
+
+def test_nan_is_ignored():
+    sketch = _sketch([1.0, float("nan"), 2.0])
+
+    assert sketch.count == 2
+
+
+def test_remove_equals_sketch_of_remaining(values):
+    sketch = _sketch(values)
+    sketch.add(values[:700], weight=-1)
+
+    assert sketch.to_dict() == _sketch(values[700:]).to_dict()
+
+
+def test_remove_everything_leaves_empty_sketch(values):
+    sketch = _sketch(values)
+    sketch.add(values, weight=-1)
+
+    assert sketch.count == 0
+    assert sketch.positive == {} and sketch.negative == {}
+    assert sketch.quantile(0.5) is None
+    assert sketch.percentile_of(1.0) is None
+
+
+def test_merge_equals_sketch_of_union(values):
+    merged = _sketch(values[:1234]).merge(_sketch(values[1234:]))
+
+    assert merged.to_dict() == _sketch(values).to_dict()
+
+
+def test_roundtrip_through_stored_dict(values):
+    stored = _sketch(values).to_dict()
+
+    restored = QuantileSketch(stored["positive"], stored["negative"], stored["zero_count"])
+
+    assert restored.to_dict() == stored
+    assert restored.quantile(0.5) == _sketch(values).quantile(0.5)
+
+
+def test_percentile_of():
+    sketch = _sketch(np.arange(1, 101, dtype=float))
+
+    assert sketch.percentile_of(0.5) == 0.0
+    assert sketch.percentile_of(1000.0) == 100.0
+    assert sketch.percentile_of(50.0) == pytest.approx(49.5, abs=1.0)
+
+
+def test_percentile_of_negative_and_zero(values):
+    sketch = _sketch(values)
+    negative_share = 500 / len(values) * 100
+    zero_share = 100 / len(values) * 100
+
+    assert sketch.percentile_of(0.0) == pytest.approx(negative_share + zero_share / 2)
+    assert sketch.percentile_of(-1e9) == 0.0
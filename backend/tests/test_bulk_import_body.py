@@ -0,0 +1,78 @@
+"""Tests for app.api.v1.financial_data._read_items"""
+
+import asyncio
+import json
+from typing import Dict, List, Tuple
+
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from app.api.v1.financial_data import _read_items
+from app.core.config import settings
+
+
+def make_request(chunks: List[bytes], headers: Dict[str, str]) -> Request:
+    """Request с телом из нескольких частей (как при chunked передаче)"""
+    messages = [
+        {"type": "http.request", "body": chunk, "more_body": index < len(chunks) - 1}
+        for index, chunk in enumerate(chunks)
+    ]
+
+    async def receive():
+        return messages.pop(0)
+
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "path": "/api/v1/financial-data/bulk",
+        "headers": [(name.lower().encode(), value.encode()) for name, value in headers.items()],
+    }
+    return Request(scope, receive)
+
+
+def read(chunks: List[bytes], headers: Dict[str, str]) -> List[Tuple[int, object]]:
+    return asyncio.run(_read_items(make_request(chunks, headers)))
+
+
+@pytest.fixture
+def small_limit(monkeypatch):
+    monkeypatch.setattr(settings, "BULK_IMPORT_MAX_BYTES", 64)
+
+
+def test_json_rows_numbered_from_one():
+    body = json.dumps([{"a": 1}, {"a": 2}]).encode()
+
+    items = read([body], {"content-type": "application/json"})
+
+    assert [index for index, _ in items] == [1, 2]
+
+
+def test_ndjson_rows_numbered_from_one():
+    items = read([b'{"a": 1}\n{"a"', b': 2}\n'], {"content-type": "application/x-ndjson"})
+
+    assert items == [(1, b'{"a": 1}'), (2, b'{"a": 2}')]
+
+
+def test_content_length_over_limit(small_limit):
+    with pytest.raises(HTTPException) as error:
+        read([b"[]"], {"content-type": "application/json", "content-length": "65"})
+
+    assert error.value.status_code == 413
+
+
+@pytest.mark.parametrize("content_type", ["application/json", "application/x-ndjson"])
+def test_streamed_body_over_limit(small_limit, content_type):
+    # Без Content-Length размер проверяется по мере чтения
+    chunks = [b'[{"a": 1},'] + [b'{"a": 1},'] * 10 + [b'{"a": 1}]']
+
+    with pytest.raises(HTTPException) as error:
+        read(chunks, {"content-type": content_type})
+
+    assert error.value.status_code == 413
+
+
+def test_body_within_limit(small_limit):
+    items = read([b'[{"a": 1}]'], {"content-type": "application/json"})
+
+    assert items == [(1, {"a": 1})]
@@ -0,0 +1,72 @@
+"""Tests for app.api.pagination cursors"""
+
+import base64
+import json
+from datetime import datetime
+from types import SimpleNamespace
+from uuid import UUID, uuid4
+
+import pytest
+from fastapi import HTTPException
+
+from app.api.pagination import NEXT_CURSOR_HEADER, PageParams, decode_cursor, encode_cursor, split_page
+
+
+def _raw_cursor(payload) -> str:
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+def test_cursor_roundtrip():
+    key = (datetime(2024, 10, 1, 12, 30, 15, 123456), uuid4())
+
+    cursor = encode_cursor(key)
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == key
+
+
+@pytest.mark.parametrize("cursor", [
+    "not base64 !",
+    "é",
+    base64.urlsafe_b64encode(b"\xff\xfe").decode(),
+    _raw_cursor("just a string"),
+    _raw_cursor(None),
+    _raw_cursor([1, 2]),
+    _raw_cursor(["2024-10-01T00:00:00"]),
+    _raw_cursor(["2024-10-01T00:00:00", str(uuid4()), "extra"]),
+    _raw_cursor(["not a date", str(uuid4())]),
+    _raw_cursor(["2024-10-01T00:00:00", "not-a-uuid"]),
+    _raw_cursor({"a": 1, "b": 2}),
+])
+def test_malformed_cursor_raises_value_error(cursor):
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        decode_cursor(cursor)
+
+
+def test_page_params_rejects_malformed_cursor_with_400():
+    with pytest.raises(HTTPException) as exc_info:
+        PageParams(cursor="garbage", limit=10)
+
+    assert exc_info.value.status_code == 400
+
+
+def test_page_params_decodes_cursor():
+    key = (datetime(2024, 1, 1), UUID("12345678-1234-5678-1234-567812345678"))
+
+    page = PageParams(cursor=encode_cursor(key), limit=10)
+
+    assert page.after == key
+    assert PageParams(cursor=None, limit=10).after is None
+
+
+def test_split_page_sets_next_cursor_only_when_more_rows():
+    page = PageParams(cursor=None, limit=2)
+    rows = [SimpleNamespace(created_at=datetime(2024, 1, 3 - i), id=uuid4()) for i in range(3)]
+
+    first, headers = split_page(rows, page, ("created_at", "id"))
+    assert first == rows[:2]
+    assert decode_cursor(headers[NEXT_CURSOR_HEADER]) == (rows[1].created_at, rows[1].id)
+
+    last, headers = split_page(rows[:2], page, ("created_at", "id"))
+    assert last == rows[:2]
+    assert headers == {}
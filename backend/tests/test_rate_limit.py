@@ -0,0 +1,178 @@
+"""Tests for app.core.rate_limit.RateLimiter"""
+
+import asyncio
+from typing import Any, List, Optional
+
+import pytest
+import redis
+
+from app.core import rate_limit
+from app.core.rate_limit import RateLimiter
+
+
+class FakeClock:
+    """Замена модуля time: monotonic() и time() управляются тестом"""
+
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def time(self) -> float:
+        return self.now
+
+
+class FakePipeline:
+    def __init__(self, client: "FakeRedis"):
+        self.client = client
+
+    async def __aenter__(self) -> "FakePipeline":
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        return None
+
+    def eval(self, script: str, numkeys: int, *args: Any) -> None:
+        self.client.calls.append(args)
+
+    async def execute(self) -> List[int]:
+        if self.client.error is not None:
+            raise self.client.error
+        return list(self.client.counts)
+
+
+class FakeRedis:
+    """Redis, отвечающий заданными оценками скользящего окна"""
+
+    def __init__(self):
+        self.counts: List[int] = []
+        self.calls: List[Any] = []
+        self.error: Optional[Exception] = None
+
+    def pipeline(self, transaction: bool = True) -> FakePipeline:
+        return FakePipeline(self)
+
+
+@pytest.fixture
+def clock(monkeypatch) -> FakeClock:
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limit, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def fake_redis(monkeypatch) -> FakeRedis:
+    client = FakeRedis()
+    monkeypatch.setattr(rate_limit, "get_redis", lambda: client)
+    return client
+
+
+def test_allows_up_to_limit_then_rejects(clock):
+    limiter = RateLimiter(limit=5, window=60)
+
+    assert all(limiter.hit("user:1") == 0 for _ in range(5))
+    retry_after = limiter.hit("user:1")
+
+    assert retry_after == pytest.approx(60 / 5)
+    assert limiter.allowed == 5
+    assert limiter.rejected == 1
+
+
+def test_keys_are_independent(clock):
+    limiter = RateLimiter(limit=1, window=60)
+
+    assert limiter.hit("user:1") == 0
+    assert limiter.hit("user:2") == 0
+    assert limiter.hit("user:1") > 0
+
+
+def test_tokens_refill_over_time(clock):
+    limiter = RateLimiter(limit=60, window=60)
+    for _ in range(60):
+        limiter.hit("ip:1")
+    assert limiter.hit("ip:1") > 0
+
+    clock.now += 1.0  # 1 токен в секунду
+    assert limiter.hit("ip:1") == 0
+    assert limiter.hit("ip:1") > 0
+
+    clock.now += 3600  # пополнение не превышает емкость
+    assert all(limiter.hit("ip:1") == 0 for _ in range(60))
+    assert limiter.hit("ip:1") > 0
+
+
+def test_retry_after_is_at_least_one_token_interval(clock):
+    limiter = RateLimiter(limit=10, window=20)
+    for _ in range(10):
+        limiter.hit("ip:1")
+
+    clock.now += 1.5  # 0.75 токена
+    assert limiter.hit("ip:1") == pytest.approx(2.0)
+    assert limiter.rejected == 1
+
+
+def test_sync_sends_pending_counts(clock, fake_redis):
+    limiter = RateLimiter(limit=10, window=60)
+    for _ in range(3):
+        limiter.hit("user:1")
+    limiter.hit("user:2")
+    fake_redis.counts = [3, 1]
+
+    asyncio.run(limiter.sync())
+
+    current = int(clock.now // 60)
+    sent = {args[0]: args[2] for args in fake_redis.calls}
+    assert sent == {f"ratelimit:user:1:{current}": 3, f"ratelimit:user:2:{current}": 1}
+    assert limiter.stats()["blocked"] == 0
+
+    # Уже отправленные запросы повторно не отправляются
+    fake_redis.calls.clear()
+    asyncio.run(limiter.sync())
+    assert fake_redis.calls == []
+
+
+def test_sync_blocks_and_unblocks_global_overflow(clock, fake_redis):
+    limiter = RateLimiter(limit=10, window=60)
+    limiter.hit("user:1")
+    fake_redis.counts = [10]  # лимит исчерпан другими инстансами
+
+    asyncio.run(limiter.sync())
+    assert limiter.stats()["blocked"] == 1
+    assert limiter.hit("user:1") > 0
+
+    # Заблокированный ключ сверяется и без новых запросов
+    fake_redis.calls.clear()
+    fake_redis.counts = [4]
+    asyncio.run(limiter.sync())
+    assert len(fake_redis.calls) == 1
+    assert limiter.stats()["blocked"] == 0
+    assert limiter.hit("user:1") == 0
+
+
+def test_sync_failure_keeps_pending_and_local_limit(clock, fake_redis):
+    limiter = RateLimiter(limit=10, window=60)
+    for _ in range(4):
+        limiter.hit("user:1")
+    fake_redis.error = redis.ConnectionError("down")
+
+    asyncio.run(limiter.sync())
+    assert limiter.sync_errors == 1
+    assert limiter.hit("user:1") == 0
+
+    fake_redis.error = None
+    fake_redis.counts = [5]
+    fake_redis.calls.clear()
+    asyncio.run(limiter.sync())
+    assert fake_redis.calls[0][2] == 5
+
+
+def test_idle_keys_are_pruned_when_full(clock):
+    limiter = RateLimiter(limit=10, window=60, max_keys=2)
+    limiter._buckets["ip:old"] = [10.0, clock.now, 0, False]
+    limiter._buckets["ip:busy"] = [10.0, clock.now, 3, False]
+
+    clock.now += 61
+    limiter.hit("ip:new")
+
+    assert set(limiter._buckets) == {"ip:busy", "ip:new"}
@@ -0,0 +1,102 @@
+"""Tests for app.tasks.uploads.get_upload_job"""
+
+from typing import Any, Dict, Optional
+
+import pytest
+from celery import states
+
+from app.tasks import uploads
+from app.tasks.uploads import FAILED, PROGRESS, QUEUED, get_upload_job
+
+OWNER = "8f14e45f-ceea-467f-a0e6-3b8f4a2a5c11"
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data: Dict[str, bytes] = {}
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.data.get(key)
+
+
+class FakeAsyncResult:
+    """AsyncResult с заданными state/info"""
+
+    results: Dict[str, Any] = {}
+
+    def __init__(self, job_id: str, app: Any = None):
+        self.state, self.info = self.results.get(job_id, (states.PENDING, None))
+
+
+@pytest.fixture
+def backend(monkeypatch):
+    redis = FakeRedis()
+    FakeAsyncResult.results = {}
+    monkeypatch.setattr(uploads, "get_sync_redis", lambda: redis)
+    monkeypatch.setattr(uploads, "AsyncResult", FakeAsyncResult)
+
+    def add(job_id: str, state: str, info: Any) -> None:
+        redis.data[f"job-owner:{job_id}"] = OWNER.encode()
+        FakeAsyncResult.results[job_id] = (state, info)
+
+    return add
+
+
+def test_unknown_job(backend):
+    assert get_upload_job("missing") is None
+
+
+def test_queued_job(backend):
+    backend("job", QUEUED, {})
+
+    owner, status = get_upload_job("job")
+
+    assert owner == OWNER
+    assert status.status == "queued"
+
+
+def test_started_job_keeps_owner(backend):
+    # task_track_started заменяет meta на {pid, hostname}
+    backend("job", states.STARTED, {"pid": 42, "hostname": "worker@host"})
+
+    owner, status = get_upload_job("job")
+
+    assert owner == OWNER
+    assert status.status == "processing"
+    assert status.rows_total == 0
+
+
+def test_progress_job(backend):
+    backend("job", PROGRESS, {"stage": "parsing", "rows_total": 10, "rows_imported": 7, "rows_failed": 1})
+
+    owner, status = get_upload_job("job")
+
+    assert owner == OWNER
+    assert (status.stage, status.rows_imported, status.rows_failed) == ("parsing", 7, 1)
+
+
+def test_failed_job(backend):
+    backend("job", FAILED, {"stage": "parsing", "error": "Неверный формат"})
+
+    owner, status = get_upload_job("job")
+
+    assert owner == OWNER
+    assert status.status == "failed"
+    assert status.error == "Неверный формат"
+
+
+def test_failure_job_keeps_owner(backend):
+    # При необработанном исключении info - само исключение, meta нет
+    backend("job", states.FAILURE, RuntimeError("boom"))
+
+    owner, status = get_upload_job("job")
+
+    assert owner == OWNER
+    assert status.status == "failed"
+    assert status.error == "Ошибка обработки файла"
+
+
+def test_expired_result(backend):
+    backend("job", states.PENDING, None)
+
+    assert get_upload_job("job") is None